@@ -0,0 +1,105 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+
+class CourseCounts:
+    """Число студентов по курсам в памяти
+
+    Заполняется одним запросом GROUP BY, после чего добавление
+    и удаление студентов только меняют счетчики: число студентов курса
+    не требует выборки и подсчета его списка.
+
+    Изменения счетчиков, в отличие от индекса имен, нельзя безопасно
+    повторить поверх выборки: неизвестно, учла ли она уже их строки.
+    Поэтому запись студентов (writing) и подсчет из БД (loading)
+    не идут одновременно: подсчет ждет начатые записи, а новые записи -
+    конец подсчета. Счетчик generation растет при каждой загрузке
+    и сбросе (invalidate): подсчет, начатый до них, не применяется.
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._gate = threading.Condition()
+        self._writers = 0
+        self._loading = False
+        self.generation = 0
+        self.loaded = False
+
+    @contextmanager
+    def writing(self):
+        """Запись в таблицу students вместе с учетом ее в счетчиках"""
+        with self._gate:
+            while self._loading:
+                self._gate.wait()
+            self._writers += 1
+        try:
+            yield
+        finally:
+            with self._gate:
+                self._writers -= 1
+                if not self._writers:
+                    self._gate.notify_all()
+
+    @contextmanager
+    def loading(self):
+        """Подсчет из БД: начинается после завершения записей; отдает generation для load"""
+        with self._gate:
+            while self._writers or self._loading:
+                self._gate.wait()
+            self._loading = True
+            generation = self.generation
+        try:
+            yield generation
+        finally:
+            with self._gate:
+                self._loading = False
+                self._gate.notify_all()
+
+    def load(self, rows, generation=None):
+        """Заполнение из пар (курс, число студентов)
+
+        generation - значение из loading; если счетчики с тех пор
+        перезагружены или сброшены, строки не применяются и возвращается False.
+        """
+        counts = Counter()
+        for course_number, count in rows:
+            counts[int(course_number)] += count
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._counts = +counts
+            self.generation += 1
+            self.loaded = True
+            return True
+
+    def invalidate(self):
+        """Сброс: счетчики будут заново подсчитаны из БД при следующем запросе"""
+        with self._lock:
+            self._counts = Counter()
+            self.generation += 1
+            self.loaded = False
+
+    def add(self, course_number, count=1):
+        """Учет добавленных студентов курса; False, если счетчики не загружены"""
+        with self._lock:
+            if not self.loaded:
+                return False
+            self._counts[int(course_number)] += count
+            return True
+
+    def remove(self, course_number, count=1):
+        """Учет удаленных студентов курса; False, если счетчики не загружены"""
+        course = int(course_number)
+        with self._lock:
+            if not self.loaded:
+                return False
+            self._counts[course] -= count
+            if self._counts[course] <= 0:
+                del self._counts[course]
+            return True
+
+    def get(self, course_number):
+        """Число студентов курса"""
+        return self._counts.get(int(course_number), 0)
@@ -0,0 +1,123 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from backends import MySQLBackend
+from main import UniversityDB, DEFAULT_FIND_LIMIT, DEFAULT_POOL_SIZE
+
+
+class AsyncUniversityDB:
+    """Асинхронный интерфейс к UniversityDB для asyncio-сервисов
+
+    Блокирующие методы UniversityDB выполняются в отдельном пуле потоков,
+    поэтому не останавливают цикл событий. Число одновременных запросов
+    ограничено max_in_flight (по умолчанию - размер пула соединений).
+    Отмена задачи сразу освобождает слот; запрос, еще стоящий в очереди
+    пула потоков, отменяется, а уже запущенный дорабатывает в фоне.
+
+    В качестве db можно передать любой объект с теми же методами,
+    например заглушку в тестах.
+    """
+
+    def __init__(self, db, max_in_flight=None):
+        if max_in_flight is None:
+            pool = getattr(db, 'pool', None)
+            max_in_flight = pool.size if pool is not None else DEFAULT_POOL_SIZE
+        self.db = db
+        self.max_in_flight = max_in_flight
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='university-db')
+
+    @classmethod
+    async def connect(cls, backend, pool_size=DEFAULT_POOL_SIZE, **db_options):
+        """Создание и подключение UniversityDB к хранилищу backend без блокировки цикла событий"""
+        db = UniversityDB(**db_options)
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            connected = await loop.run_in_executor(
+                executor, functools.partial(db.connect, backend, pool_size=pool_size)
+            )
+        if not connected:
+            raise ConnectionError(f"Не удалось подключиться: {backend.name}")
+        # Хранилище может ограничить размер пула (SQLite - одно соединение на запись)
+        return cls(db, max_in_flight=db.pool.size)
+
+    @classmethod
+    async def connect_to_db(cls, host, user, password, pool_size=DEFAULT_POOL_SIZE, **db_options):
+        """Подключение к базе данных study на сервере MySQL"""
+        return await cls.connect(MySQLBackend(host, user, password), pool_size, **db_options)
+
+    async def _run(self, method, *args, **kwargs):
+        """Выполнение блокирующего метода в пуле потоков с ограничением параллелизма"""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    async def get_student(self, student_id):
+        """Получение студента по ID"""
+        return await self._run(self.db.get_student, student_id)
+
+    async def get_students_by_course(self, course_number):
+        """Получение всех студентов по номеру курса"""
+        return await self._run(self.db.get_students_by_course, course_number)
+
+    async def get_disciplines_by_course(self, course_number):
+        """Получение всех занятий по номеру курса"""
+        return await self._run(self.db.get_disciplines_by_course, course_number)
+
+    async def get_all_disciplines(self):
+        """Получение полного расписания"""
+        return await self._run(self.db.get_all_disciplines)
+
+    async def add_student(self, name, course_number):
+        """Добавление нового студента"""
+        return await self._run(self.db.add_student, name, course_number)
+
+    async def add_discipline(self, discipline_name, day_of_week, lesson_number, course_number):
+        """Добавление нового занятия"""
+        return await self._run(self.db.add_discipline, discipline_name, day_of_week, lesson_number, course_number)
+
+    async def delete_student(self, student_id):
+        """Удаление студента по ID"""
+        return await self._run(self.db.delete_student, student_id)
+
+    async def delete_discipline(self, discipline_id):
+        """Удаление занятия по ID"""
+        return await self._run(self.db.delete_discipline, discipline_id)
+
+    async def add_students(self, rows):
+        """Массовое добавление студентов"""
+        return await self._run(self.db.add_students, rows)
+
+    async def add_disciplines(self, rows):
+        """Массовое добавление занятий"""
+        return await self._run(self.db.add_disciplines, rows)
+
+    async def delete_students(self, student_ids):
+        """Массовое удаление студентов по ID"""
+        return await self._run(self.db.delete_students, student_ids)
+
+    async def delete_disciplines(self, discipline_ids):
+        """Массовое удаление занятий по ID"""
+        return await self._run(self.db.delete_disciplines, discipline_ids)
+
+    async def find_students(self, text, limit=DEFAULT_FIND_LIMIT):
+        """Поиск студентов по имени"""
+        return await self._run(self.db.find_students, text, limit)
+
+    async def get_course_stats(self, course_number):
+        """Сводка по курсу: студенты и занятия по дням"""
+        return await self._run(self.db.get_course_stats, course_number)
+
+    async def close(self):
+        """Ожидание запущенных запросов и закрытие соединений"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, functools.partial(self._executor.shutdown, wait=True, cancel_futures=True))
+        if hasattr(self.db, 'close_connection'):
+            self.db.close_connection()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
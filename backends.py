@@ -0,0 +1,412 @@
+import re
+import sqlite3
+
+try:
+    import mysql.connector
+    from mysql.connector import Error as MySQLError
+except ImportError:
+    # MySQL-драйвер нужен только для MySQLBackend
+    mysql = None
+
+    class MySQLError(Exception):
+        pass
+
+
+class PoolError(Exception):
+    """Нет свободного соединения в пуле"""
+
+
+# Все ошибки, которые методы UniversityDB обрабатывают как ошибки БД
+Error = (MySQLError, sqlite3.Error, PoolError)
+
+# Код ошибки MySQL "Duplicate key name" - индекс уже существует
+ER_DUP_KEYNAME = 1061
+# Код ошибки MySQL "Unknown database"
+ER_BAD_DB_ERROR = 1049
+
+
+class Backend:
+    """Интерфейс хранилища для UniversityDB
+
+    Бэкенд открывает соединения и знает особенности своего диалекта SQL:
+    DDL таблиц, миграции схемы, распознавание ошибок. Соединения, которые
+    он возвращает, поддерживают подмножество API mysql.connector,
+    используемое UniversityDB: cursor(dictionary=..., buffered=...),
+    start_transaction, commit, rollback, close, ping, consume_results,
+    in_transaction.
+
+    Соединения работают в режиме автофиксации: чтение не открывает
+    транзакцию, которую потом пришлось бы откатывать; запись из нескольких
+    запросов начинается явно через start_transaction.
+    """
+
+    name = None
+
+    # Максимальный размер пула (None - без ограничений)
+    max_pool_size = None
+
+    # Несколько соединений могут писать одновременно (иначе писатели ждут друг друга)
+    concurrent_writes = True
+
+    # Неудачный executemany не оставляет вставленной части пачки
+    atomic_executemany = True
+
+    # Наибольшее число параметров в одном запросе
+    max_query_params = 65535
+
+    # prepared_cursor готовит запросы на сервере (иначе это обычный курсор)
+    server_prepared_statements = False
+
+    # Суффикс SELECT для блокировки читаемых строк до конца транзакции
+    for_update = ""
+
+    # Команды создания таблиц
+    create_table_statements = ()
+
+    # Вставка студента или обновление имени и курса при совпадении id
+    upsert_student = None
+
+    # Запись значения в app_metadata с заменой прежнего
+    upsert_metadata = None
+
+    # Миграции схемы: (версия, описание, список SQL-команд)
+    migrations = ()
+
+    @property
+    def schema_version(self):
+        """Версия схемы после всех миграций"""
+        return max((version for version, _, _ in self.migrations), default=0)
+
+    def bootstrap(self):
+        """Первое соединение: создает базу данных при необходимости"""
+        return self.connect()
+
+    def connect(self):
+        """Новое соединение с базой данных"""
+        raise NotImplementedError
+
+    def prepared_cursor(self, conn):
+        """Курсор для многократного выполнения одного запроса
+
+        По умолчанию - обычный курсор: sqlite3 и так кэширует
+        скомпилированные запросы соединения (cached_statements).
+        """
+        return conn.cursor()
+
+    def insert_id_step(self, conn):
+        """Шаг между ID строк одного многострочного INSERT"""
+        return 1
+
+    def first_insert_id(self, cursor, count, step=1):
+        """ID первой строки, вставленной многострочным INSERT из count строк
+
+        Строки одного INSERT получают ID подряд с шагом step (insert_id_step).
+        """
+        raise NotImplementedError
+
+    def is_duplicate_key(self, error):
+        """Нарушение уникальности первичного ключа"""
+        raise NotImplementedError
+
+    def is_duplicate_index(self, error):
+        """Индекс уже существует (повтор прерванной миграции)"""
+        return False
+
+    def describe(self):
+        """Описание бэкенда для сообщений"""
+        return self.name
+
+
+class MySQLBackend(Backend):
+    """Хранилище на сервере MySQL (mysql.connector)"""
+
+    name = 'mysql'
+    for_update = " FOR UPDATE"
+    server_prepared_statements = True
+
+    upsert_student = (
+        "INSERT INTO students (id, name, course_number) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE name = VALUES(name), course_number = VALUES(course_number)"
+    )
+
+    upsert_metadata = (
+        "INSERT INTO app_metadata (name, value) VALUES (%s, %s) "
+        "ON DUPLICATE KEY UPDATE value = VALUES(value)"
+    )
+
+    create_table_statements = (
+        """
+        CREATE TABLE IF NOT EXISTS students (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            course_number INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS disciplines (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            discipline_name VARCHAR(100) NOT NULL,
+            day_of_week VARCHAR(20) NOT NULL,
+            lesson_number INT NOT NULL,
+            course_number INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        # Таблица версий схемы для миграций
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            description VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        # Состояние прошлого запуска для быстрого старта
+        """
+        CREATE TABLE IF NOT EXISTS app_metadata (
+            name VARCHAR(64) PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+        """,
+    )
+
+    migrations = (
+        (1, "Индексы для выборок по курсу", [
+            # WHERE course_number = %s ORDER BY name - без полного сканирования и filesort
+            "CREATE INDEX idx_students_course_name ON students (course_number, name)",
+            # Слот расписания: курс, день, пара
+            "CREATE INDEX idx_disciplines_course_slot ON disciplines (course_number, day_of_week, lesson_number)",
+        ]),
+        (2, "Автоинкремент ID студентов", [
+            # ID выдает сервер: без SELECT MAX(id) и гонок между клиентами,
+            # явные ID из CSV при этом по-прежнему принимаются
+            "ALTER TABLE students MODIFY id INT NOT NULL AUTO_INCREMENT",
+        ]),
+    )
+
+    def __init__(self, host='localhost', user='root', password='', database='study'):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+
+    def bootstrap(self):
+        """Первое соединение: сразу с базой, а если ее еще нет - создает ее
+
+        В обычном случае это одно соединение без дополнительных запросов;
+        отдельное временное соединение для CREATE DATABASE не нужно.
+        """
+        self._require_driver()
+        try:
+            return self.connect()
+        except MySQLError as e:
+            if getattr(e, 'errno', None) != ER_BAD_DB_ERROR:
+                raise
+
+        conn = mysql.connector.connect(host=self.host, user=self.user, password=self.password,
+                                       autocommit=True)
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
+        print(f"✅ База данных '{self.database}' создана или уже существует")
+        cursor.close()
+        conn.database = self.database
+        return conn
+
+    def connect(self):
+        self._require_driver()
+        return mysql.connector.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            autocommit=True
+        )
+
+    def prepared_cursor(self, conn):
+        # Бинарный протокол COM_STMT_PREPARE / COM_STMT_EXECUTE: курсор
+        # готовит запрос заново, только если меняется его текст
+        return conn.cursor(prepared=True)
+
+    def insert_id_step(self, conn):
+        # Многострочный INSERT ... VALUES - "simple insert": число строк известно
+        # заранее, и InnoDB выделяет ему весь блок ID сразу при любом
+        # innodb_autoinc_lock_mode (режим 2 перемешивает ID только у INSERT ... SELECT
+        # и LOAD DATA). Поэтому ID строк идут подряд, но с шагом
+        # auto_increment_increment, который в репликации master-master больше 1
+        cursor = conn.cursor()
+        cursor.execute("SELECT @@SESSION.auto_increment_increment")
+        step = int(cursor.fetchone()[0])
+        cursor.close()
+        return step
+
+    def first_insert_id(self, cursor, count, step=1):
+        # LAST_INSERT_ID() многострочного INSERT - ID его первой строки
+        return cursor.lastrowid
+
+    def _require_driver(self):
+        if mysql is None:
+            raise MySQLError("Не установлен пакет mysql-connector-python")
+
+    def is_duplicate_key(self, error):
+        return "Duplicate entry" in str(error)
+
+    def is_duplicate_index(self, error):
+        return getattr(error, 'errno', None) == ER_DUP_KEYNAME
+
+    def describe(self):
+        return f"MySQL {self.user}@{self.host}/{self.database}"
+
+
+# Плейсхолдеры %s вне строковых литералов
+_PLACEHOLDER = re.compile(r"('(?:[^']|'')*')|%s")
+
+
+def _to_qmark(query):
+    """Перевод плейсхолдеров %s (стиль mysql.connector) в ? (стиль sqlite3)"""
+    return _PLACEHOLDER.sub(lambda m: m.group(1) or '?', query)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteCursor(sqlite3.Cursor):
+    """Курсор sqlite3, принимающий запросы с плейсхолдерами %s"""
+
+    def execute(self, query, params=()):
+        return super().execute(_to_qmark(query), params)
+
+    def executemany(self, query, seq_of_params):
+        return super().executemany(_to_qmark(query), seq_of_params)
+
+
+class SQLiteConnection(sqlite3.Connection):
+    """Соединение sqlite3 с интерфейсом, совместимым с mysql.connector"""
+
+    def cursor(self, dictionary=False, buffered=True):
+        # Курсор sqlite3 и так читает строки по мере выборки
+        cursor = super().cursor(SQLiteCursor)
+        if dictionary:
+            cursor.row_factory = _dict_row
+        return cursor
+
+    def start_transaction(self):
+        # Блокировка записи сразу: иначе транзакция, начатая чтением, не сможет
+        # перейти к записи, если другой писатель успел зафиксировать изменения
+        self.execute("BEGIN IMMEDIATE")
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self.execute("SELECT 1")
+
+    def consume_results(self):
+        pass
+
+    def is_connected(self):
+        try:
+            self.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+
+class SQLiteBackend(Backend):
+    """Встроенное хранилище SQLite: файл или ':memory:'
+
+    Не требует сервера; база ':memory:' живет, пока открыто ее
+    единственное соединение, поэтому пул для нее состоит из одного соединения.
+    """
+
+    name = 'sqlite'
+    # Писатель в SQLite один: параллельная загрузка только ждала бы блокировку
+    concurrent_writes = False
+    # executemany в sqlite3 - цикл по строкам, а не один многострочный INSERT
+    atomic_executemany = False
+    # SQLITE_MAX_VARIABLE_NUMBER в сборках до 3.32
+    max_query_params = 999
+
+    upsert_student = (
+        "INSERT INTO students (id, name, course_number) VALUES (%s, %s, %s) "
+        "ON CONFLICT(id) DO UPDATE SET name = excluded.name, course_number = excluded.course_number"
+    )
+
+    upsert_metadata = (
+        "INSERT INTO app_metadata (name, value) VALUES (%s, %s) "
+        "ON CONFLICT(name) DO UPDATE SET value = excluded.value"
+    )
+
+    create_table_statements = (
+        """
+        CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            course_number INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS disciplines (
+            id INTEGER PRIMARY KEY,
+            discipline_name VARCHAR(100) NOT NULL,
+            day_of_week VARCHAR(20) NOT NULL,
+            lesson_number INT NOT NULL,
+            course_number INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            description VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS app_metadata (
+            name VARCHAR(64) PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+        """,
+    )
+
+    migrations = (
+        (1, "Индексы для выборок по курсу", [
+            "CREATE INDEX IF NOT EXISTS idx_students_course_name ON students (course_number, name)",
+            "CREATE INDEX IF NOT EXISTS idx_disciplines_course_slot ON disciplines (course_number, day_of_week, lesson_number)",
+        ]),
+        # INTEGER PRIMARY KEY в SQLite и так выдает ID автоматически
+        (2, "Автоинкремент ID студентов", []),
+    )
+
+    def __init__(self, path=':memory:', timeout=30):
+        self.path = path
+        self.timeout = timeout
+        if path == ':memory:':
+            self.max_pool_size = 1
+
+    def connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            factory=SQLiteConnection,
+            check_same_thread=False
+        )
+        if self.path != ':memory:':
+            # Читатели не блокируют писателя при работе нескольких соединений
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def first_insert_id(self, cursor, count, step=1):
+        # lastrowid - ID последней вставленной строки
+        return cursor.lastrowid - (count - 1) * step
+
+    def is_duplicate_key(self, error):
+        return isinstance(error, sqlite3.IntegrityError) and "UNIQUE" in str(error)
+
+    def describe(self):
+        return f"SQLite {self.path}"
+
+
+BACKENDS = {
+    'mysql': MySQLBackend,
+    'sqlite': SQLiteBackend,
+}
@@ -0,0 +1,334 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timezone
+
+from backends import MySQLBackend, SQLiteBackend
+from main import LRUCache, UniversityDB
+from timetable import COURSES, DAYS_OF_WEEK, LESSONS
+
+FIRST_NAMES = ['Bennie', 'Octavia', 'Elta', 'Destin', 'Shaniya', 'Abbie', 'Michelle', 'Kassandra',
+               'Mallie', 'Billy', 'Shana', 'Trevor', 'Modesta', 'Santina', 'Stanley', 'Terrell',
+               'Иван', 'Мария', 'Алексей', 'Ольга', 'Дмитрий', 'Анна', 'Сергей', 'Елена']
+LAST_NAMES = ['Hodkiewicz', 'Huels', 'Okuneva', 'Murazik', 'Hane', 'Ratke', 'Lubowitz', 'Emmerich',
+              'Kautzer', 'Haag', 'Schuster', 'Kilback', 'Ritchie', 'Larson', 'Mohr', 'Oberbrunner',
+              'Иванов', 'Петрова', 'Смирнов', 'Кузнецова', 'Попов', 'Соколова', 'Лебедев', 'Козлова']
+DISCIPLINE_NAMES = ['Высшая математика', 'Физика', 'Программирование', 'Базы данных', 'История',
+                    'Философия', 'Английский язык', 'Алгоритмы', 'Сети', 'Операционные системы']
+# Всего слотов (курс, день, пара) в расписании: больше занятий не поместится
+TOTAL_SLOTS = COURSES * len(DAYS_OF_WEEK) * LESSONS
+# Строк в выборке, память которой измеряется tracemalloc (он замедляет выделения в разы)
+MEMORY_SAMPLE_ROWS = 100_000
+
+
+def generate_students(count, seed=0):
+    """Синтетические студенты: кортежи (id, имя, курс)"""
+    rng = random.Random(seed)
+    for student_id in range(1, count + 1):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        yield student_id, name, rng.randint(1, 8)
+
+
+def random_slot(rng):
+    """Случайный слот расписания: (день, пара, курс)"""
+    return rng.choice(DAYS_OF_WEEK), rng.randint(1, LESSONS), rng.randint(1, COURSES)
+
+
+def generate_disciplines(count, seed=0):
+    """Синтетические занятия в разные слоты: кортежи (название, день, пара, курс)
+
+    Занятий не больше TOTAL_SLOTS - по одному на каждый свободный слот.
+    """
+    rng = random.Random(seed + 1)
+    slots = [(day, lesson, course)
+             for course in range(1, COURSES + 1)
+             for day in DAYS_OF_WEEK
+             for lesson in range(1, LESSONS + 1)]
+    for day, lesson, course in rng.sample(slots, min(count, TOTAL_SLOTS)):
+        yield rng.choice(DISCIPLINE_NAMES), day, lesson, course
+
+
+def write_students_csv(path, count, seed=0, delimiter=';'):
+    """Запись синтетического списка студентов в CSV в формате students.csv"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for student_id, name, course_number in generate_students(count, seed):
+            f.write(f"{student_id}{delimiter}{name}{delimiter}{course_number}\n")
+
+
+def load_disciplines(db, count, seed=0, batch_size=5000):
+    """Загрузка синтетического расписания пачками через add_disciplines
+
+    Занятия проходят ту же проверку слотов, что и в REPL, и попадают
+    в расписание в памяти. Возвращает число добавленных занятий.
+    """
+    loaded = 0
+    rows = generate_disciplines(count, seed)
+    while True:
+        batch = [row for _, row in zip(range(batch_size), rows)]
+        if not batch:
+            break
+        ids = db.add_disciplines(batch)
+        loaded += sum(1 for discipline_id in ids or () if discipline_id is not None)
+    return loaded
+
+
+@contextmanager
+def uncached(db):
+    """Кэш UniversityDB отключен на время сравнения: каждый вызов доходит до БД"""
+    cache = db.cache
+    db.cache = LRUCache(max_size=0)
+    try:
+        yield
+    finally:
+        db.cache = cache
+
+
+def percentile(sorted_values, fraction):
+    """Перцентиль по методу ближайшего ранга"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies):
+    """Сводка задержек (в миллисекундах) для JSON-отчета"""
+    values = sorted(latencies)
+    total = sum(values)
+    return {
+        'count': len(values),
+        'mean_ms': total / len(values) * 1000 if values else 0.0,
+        'p50_ms': percentile(values, 0.50) * 1000,
+        'p95_ms': percentile(values, 0.95) * 1000,
+        'p99_ms': percentile(values, 0.99) * 1000,
+        'max_ms': values[-1] * 1000 if values else 0.0,
+        'ops_per_sec': len(values) / total if total > 0 else 0.0,
+    }
+
+
+def measure(operation, args_list):
+    """Замер задержки каждого вызова operation(*args) из args_list"""
+    latencies = []
+    for args in args_list:
+        started = time.perf_counter()
+        operation(*args)
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+def run_benchmark(db, students, disciplines, samples, seed=0):
+    """Набор замеров основных операций; возвращает словарь результатов"""
+    rng = random.Random(seed + 2)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'students.csv')
+        write_students_csv(csv_path, students, seed)
+        started = time.perf_counter()
+        db.import_students_from_csv(csv_path, bulk=True)
+        elapsed = time.perf_counter() - started
+        results['import_students_from_csv'] = {
+            'rows': students,
+            'seconds': elapsed,
+            'rows_per_sec': students / elapsed if elapsed > 0 else 0.0,
+        }
+
+    disciplines = load_disciplines(db, disciplines, seed)
+    results['load_disciplines'] = {'rows': disciplines, 'slots': TOTAL_SLOTS}
+
+    results['get_student'] = measure(
+        db.get_student, [(rng.randint(1, students),) for _ in range(samples)])
+    results['get_students_by_course'] = measure(
+        db.get_students_by_course, [(rng.randint(1, 8),) for _ in range(max(1, samples // 10))])
+    results['get_disciplines_by_course'] = measure(
+        db.get_disciplines_by_course, [(rng.randint(1, 8),) for _ in range(samples)])
+    results['get_all_disciplines'] = measure(
+        db.get_all_disciplines, [() for _ in range(max(1, samples // 100))])
+
+    results['prepared_statements'] = compare_prepared(db, students, samples, rng)
+    results['row_formats'] = compare_row_formats(db)
+
+    # Смешанная нагрузка: добавления и удаления студентов и занятий.
+    # Отклоненные добавления (слот занят) не доходят до БД и считаются отдельно
+    latencies = []
+    rejected_latencies = []
+    for _ in range(samples):
+        day, lesson, course = random_slot(rng)
+        action = rng.random()
+        started = time.perf_counter()
+        if action < 0.4:
+            done = db.add_student(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", course)
+        elif action < 0.6:
+            done = db.delete_student(rng.randint(1, students))
+        elif action < 0.9:
+            done = db.add_discipline(rng.choice(DISCIPLINE_NAMES), day, lesson, course)
+        else:
+            done = db.delete_discipline(rng.randint(1, max(1, disciplines)))
+        elapsed = time.perf_counter() - started
+        (latencies if done else rejected_latencies).append(elapsed)
+    results['mixed_put_delete'] = summarize(latencies)
+    results['mixed_rejected_put'] = summarize(rejected_latencies)
+
+    return results
+
+
+def compare_prepared(db, students, samples, rng):
+    """Поиск студентов по ID с подготовленными запросами и без них
+
+    Оба прогона используют одни и те же ID; кэш отключается при любом
+    --cache-size, иначе сравнивались бы попадания в кэш. Разница есть
+    только на MySQL: на остальных бэкендах prepared_cursor - обычный
+    курсор, и speedup около 1 - шум (в отчете server_prepared=false).
+    """
+    args_list = [(rng.randint(1, students),) for _ in range(samples)]
+    enabled = db.statements.enabled
+    results = {}
+    try:
+        with uncached(db):
+            for mode, prepared in (('plain', False), ('prepared', True)):
+                db.statements.enabled = prepared
+                measure(db.get_student, args_list[:max(1, samples // 10)])  # прогрев
+                results[mode] = measure(db.get_student, args_list)
+    finally:
+        db.statements.enabled = enabled
+    plain = results['plain']['ops_per_sec']
+    results['speedup'] = results['prepared']['ops_per_sec'] / plain if plain else 0.0
+    results['server_prepared'] = db.backend.server_prepared_statements
+    if not db.backend.server_prepared_statements:
+        results['note'] = (f"{db.backend.name}: подготовленные запросы не используются, "
+                           f"оба прогона выполняют одно и то же; сравнение имеет смысл только на MySQL")
+    return results
+
+
+def compare_row_formats(db, repeats=3, sample_rows=MEMORY_SAMPLE_ROWS):
+    """Память и скорость выборки всех студентов по курсам: записи против словарей
+
+    Память измеряется tracemalloc на выборке не больше sample_rows строк
+    (первые страницы каждого курса) и пересчитывается на все строки;
+    скорость - строк в секунду при повторных выборках без трассировки.
+    Кэш отключается: иначе повторные выборки вернули бы уже созданные строки.
+    """
+    dict_rows = db.dict_rows
+    results = {}
+    try:
+        with uncached(db):
+            for mode, as_dict in (('record', False), ('dict', True)):
+                db.dict_rows = as_dict
+                started = time.perf_counter()
+                rows = 0
+                for _ in range(repeats):
+                    for course in range(1, 9):
+                        rows += len(db.get_students_by_course(course))
+                elapsed = time.perf_counter() - started
+
+                per_course = -(-sample_rows // COURSES)
+                tracemalloc.start()
+                retained = [db.get_students_by_course(course, limit=per_course)
+                            for course in range(1, COURSES + 1)]
+                size, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                sampled = sum(len(course_rows) for course_rows in retained)
+                del retained
+
+                total = rows // repeats
+                bytes_per_row = size / sampled if sampled else 0.0
+                results[mode] = {
+                    'rows': total,
+                    'sample_rows': sampled,
+                    'bytes': round(bytes_per_row * total),
+                    'bytes_per_row': bytes_per_row,
+                    'rows_per_sec': rows / elapsed if elapsed > 0 else 0.0,
+                }
+    finally:
+        db.dict_rows = dict_rows
+    if results['record']['bytes']:
+        results['memory_ratio'] = results['dict']['bytes'] / results['record']['bytes']
+    return results
+
+
+def git_revision():
+    """Текущий коммит, чтобы сравнивать отчеты между версиями"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест университетской базы данных")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default='sqlite')
+    parser.add_argument('--sqlite-path', default=':memory:')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--students', type=int, default=10_000, help="число студентов (1k - 10M)")
+    parser.add_argument('--disciplines', type=int, default=TOTAL_SLOTS,
+                        help=f"число занятий (не больше {TOTAL_SLOTS} - по одному на слот)")
+    parser.add_argument('--samples', type=int, default=1_000, help="число замеров на операцию")
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help="размер кэша UniversityDB (0 - замерять обращения к БД)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='-', help="файл JSON-отчета ('-' - stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.backend == 'sqlite':
+        backend = SQLiteBackend(args.sqlite_path)
+    else:
+        backend = MySQLBackend(args.host, args.user, args.password)
+
+    db = UniversityDB(cache_size=args.cache_size)
+    # Сообщения UniversityDB о каждой операции исказили бы замеры
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+        if not db.connect(backend) or not db.create_tables():
+            connected = False
+        else:
+            connected = True
+            results = run_benchmark(db, args.students, args.disciplines, args.samples, args.seed)
+        db.close_connection()
+
+    if not connected:
+        print(f"❌ Не удалось подготовить базу данных ({backend.describe()})", file=sys.stderr)
+        return 1
+
+    report = {
+        'meta': {
+            'backend': backend.describe(),
+            'students': args.students,
+            'disciplines': args.disciplines,
+            'samples': args.samples,
+            'cache_size': args.cache_size,
+            'seed': args.seed,
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+        },
+        'results': results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"✅ Отчет записан в {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import csv
+import json
+import struct
+from array import array
+from datetime import date, datetime
+
+# Буфер файла при экспорте: крупные записи вместо множества мелких
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+# Формат columnar: сигнатура, версия, затем блоки по столбцам
+COLUMNAR_MAGIC = b'UDBC'
+COLUMNAR_VERSION = 1
+COLUMN_INT = b'i'
+COLUMN_STR = b's'
+
+# Типы элементов array для целых: 1, 2, 4 и 8 байт
+INT_TYPECODES = ('b', 'h', 'i', 'q')
+
+
+def _text(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    return value
+
+
+class CSVExportWriter:
+    """CSV с заголовком"""
+
+    mode = 'w'
+
+    def __init__(self, file, columns):
+        self._writer = csv.writer(file)
+        self._writer.writerow(columns)
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        pass
+
+
+class JSONLinesExportWriter:
+    """JSON Lines: один объект на строку"""
+
+    mode = 'w'
+
+    def __init__(self, file, columns):
+        self._file = file
+        self._columns = columns
+
+    def write_rows(self, rows):
+        columns = self._columns
+        self._file.write(''.join(
+            json.dumps(dict(zip(columns, map(_text, row))), ensure_ascii=False) + '\n'
+            for row in rows
+        ))
+
+    def close(self):
+        pass
+
+
+def _int_array(values):
+    """Массив целых с самым узким подходящим типом элементов"""
+    low, high = min(values), max(values)
+    for typecode in INT_TYPECODES:
+        bits = array(typecode).itemsize * 8
+        if -(1 << (bits - 1)) <= low and high < (1 << (bits - 1)):
+            return array(typecode, values)
+    raise OverflowError("значение не помещается в int64")
+
+
+class ColumnarExportWriter:
+    """Компактный бинарный поколоночный формат
+
+    Заголовок: COLUMNAR_MAGIC, версия (1 байт), число столбцов (uint16)
+    и их имена (uint16 длина + UTF-8). Далее блоки: число строк (uint32),
+    затем для каждого столбца тип (1 байт), код типа массива (1 байт),
+    длина данных (uint32) и данные. Для целых это массив самой узкой
+    подходящей ширины, для строк - такой же массив длин и общий буфер
+    UTF-8. Пустые значения записываются пустой строкой.
+    Блок с нулевым числом строк завершает файл.
+    """
+
+    mode = 'wb'
+
+    def __init__(self, file, columns):
+        self._file = file
+        self._columns = columns
+        header = [COLUMNAR_MAGIC, struct.pack('<BH', COLUMNAR_VERSION, len(columns))]
+        for name in columns:
+            encoded = name.encode('utf-8')
+            header.append(struct.pack('<H', len(encoded)) + encoded)
+        file.write(b''.join(header))
+
+    def write_rows(self, rows):
+        if not rows:
+            return
+        parts = [struct.pack('<I', len(rows))]
+        for values in zip(*rows):
+            if all(type(value) is int for value in values):
+                tag, numbers, blob = COLUMN_INT, _int_array(values), b''
+            else:
+                encoded = [b'' if value is None else str(_text(value)).encode('utf-8') for value in values]
+                tag, numbers, blob = COLUMN_STR, _int_array([len(item) for item in encoded]), b''.join(encoded)
+            payload = numbers.tobytes() + blob
+            parts.append(tag + numbers.typecode.encode('ascii') + struct.pack('<I', len(payload)) + payload)
+        self._file.write(b''.join(parts))
+
+    def close(self):
+        self._file.write(struct.pack('<I', 0))
+
+
+EXPORT_FORMATS = {
+    'csv': CSVExportWriter,
+    'jsonl': JSONLinesExportWriter,
+    'col': ColumnarExportWriter,
+}
+
+
+def open_export(path, columns, fmt):
+    """Открытие файла экспорта: возвращает (файл, writer)"""
+    writer_class = EXPORT_FORMATS[fmt]
+    if writer_class.mode == 'wb':
+        file = open(path, 'wb', buffering=EXPORT_BUFFER_SIZE)
+    else:
+        file = open(path, 'w', encoding='utf-8', newline='', buffering=EXPORT_BUFFER_SIZE)
+    try:
+        return file, writer_class(file, columns)
+    except BaseException:
+        file.close()
+        raise
+
+
+def read_columnar(path):
+    """Чтение файла формата col: выдает кортежи строк (для проверки и загрузки)"""
+    with open(path, 'rb') as file:
+        if file.read(4) != COLUMNAR_MAGIC:
+            raise ValueError(f"{path}: не файл формата col")
+        version, column_count = struct.unpack('<BH', file.read(3))
+        if version != COLUMNAR_VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия {version}")
+        for _ in range(column_count):
+            (length,) = struct.unpack('<H', file.read(2))
+            file.read(length)
+
+        while True:
+            (row_count,) = struct.unpack('<I', file.read(4))
+            if row_count == 0:
+                return
+            columns = []
+            for _ in range(column_count):
+                tag = file.read(1)
+                typecode = file.read(1).decode('ascii')
+                (length,) = struct.unpack('<I', file.read(4))
+                payload = file.read(length)
+                numbers = array(typecode)
+                numbers.frombytes(payload[:row_count * numbers.itemsize])
+                if tag == COLUMN_INT:
+                    columns.append(numbers.tolist())
+                else:
+                    data = payload[row_count * numbers.itemsize:]
+                    values = []
+                    offset = 0
+                    for size in numbers:
+                        values.append(data[offset:offset + size].decode('utf-8'))
+                        offset += size
+                    columns.append(values)
+            yield from zip(*columns)
@@ -0,0 +1,204 @@
+import functools
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from rows import Row
+
+# Верхние границы корзин гистограммы задержек, мс
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, float('inf'))
+
+DEFAULT_SLOW_LOG_SIZE = 100
+
+
+def row_bytes(row):
+    """Приблизительный объем строки результата в байтах"""
+    if isinstance(row, (dict, Row)):
+        values = row.values()
+    elif isinstance(row, (tuple, list)):
+        values = row
+    else:
+        # Скалярный результат: ID из add_students/add_disciplines или None
+        values = (row,)
+    size = 0
+    for value in values:
+        if isinstance(value, str):
+            size += len(value.encode('utf-8'))
+        elif isinstance(value, (int, float)):
+            size += 8
+        elif value is not None:
+            size += len(str(value))
+    return size
+
+
+class MethodStats:
+    """Накопленная статистика одного метода"""
+
+    __slots__ = ('calls', 'failures', 'total_seconds', 'max_seconds', 'rows', 'bytes', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.histogram = [0] * len(LATENCY_BUCKETS_MS)
+
+    def percentile_ms(self, fraction):
+        """Оценка перцентиля по гистограмме (верхняя граница корзины)"""
+        threshold = fraction * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.histogram):
+            seen += count
+            if seen >= threshold and count:
+                return min(bound, self.max_seconds * 1000)
+        return self.max_seconds * 1000
+
+    def snapshot(self):
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'total_ms': self.total_seconds * 1000,
+            'mean_ms': self.total_seconds / self.calls * 1000 if self.calls else 0.0,
+            'max_ms': self.max_seconds * 1000,
+            'p50_ms': self.percentile_ms(0.50),
+            'p95_ms': self.percentile_ms(0.95),
+            'p99_ms': self.percentile_ms(0.99),
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'histogram': {
+                ('inf' if bound == float('inf') else f"{bound:g}"): count
+                for bound, count in zip(LATENCY_BUCKETS_MS, self.histogram)
+            },
+        }
+
+
+class Instrumentation:
+    """Сбор статистики вызовов методов UniversityDB
+
+    Для каждого метода считаются вызовы, неудачи (результат False),
+    гистограмма задержек, число строк и объем полученных данных.
+    Вызовы дольше slow_query_ms попадают в журнал медленных запросов
+    (последние slow_log_size записей в памяти и, если задан, файл slow_log_path).
+    """
+
+    def __init__(self, slow_query_ms=None, slow_log_path=None, slow_log_size=DEFAULT_SLOW_LOG_SIZE):
+        self.slow_query_ms = slow_query_ms
+        self.slow_log_path = slow_log_path
+        self.slow_log = deque(maxlen=slow_log_size)
+        self.started_at = time.time()
+        self._methods = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, name, method):
+        """Обертка метода, записывающая статистику каждого вызова"""
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = method(*args, **kwargs)
+            if hasattr(result, '__next__'):
+                return self._wrap_iterator(name, args, result, started)
+            self.record(name, args, time.perf_counter() - started, result)
+            return result
+
+        return wrapper
+
+    def _wrap_iterator(self, name, args, iterator, started):
+        """Потоковые результаты учитываются после полного чтения"""
+        rows = 0
+        size = 0
+        try:
+            for row in iterator:
+                rows += 1
+                size += row_bytes(row)
+                yield row
+        finally:
+            self._store(name, args, time.perf_counter() - started, rows, size, failed=False)
+
+    def record(self, name, args, elapsed, result):
+        """Учет завершенного вызова"""
+        if isinstance(result, list):
+            rows = len(result)
+            size = sum(row_bytes(row) for row in result)
+        elif isinstance(result, (dict, Row)):
+            rows = 1
+            size = row_bytes(result)
+        else:
+            rows = 0
+            size = 0
+        self._store(name, args, elapsed, rows, size, failed=result is False)
+
+    def _store(self, name, args, elapsed, rows, size, failed):
+        bucket = 0
+        elapsed_ms = elapsed * 1000
+        while elapsed_ms > LATENCY_BUCKETS_MS[bucket]:
+            bucket += 1
+
+        with self._lock:
+            stats = self._methods.get(name)
+            if stats is None:
+                stats = self._methods[name] = MethodStats()
+            stats.calls += 1
+            stats.failures += failed
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            stats.rows += rows
+            stats.bytes += size
+            stats.histogram[bucket] += 1
+
+        if self.slow_query_ms is not None and elapsed_ms >= self.slow_query_ms:
+            self._log_slow(name, args, elapsed_ms, rows)
+
+    def _log_slow(self, name, args, elapsed_ms, rows):
+        call_args = ', '.join(repr(arg) for arg in args)
+        entry = {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'method': name,
+            'args': call_args,
+            'elapsed_ms': elapsed_ms,
+            'rows': rows,
+        }
+        with self._lock:
+            self.slow_log.append(entry)
+            if self.slow_log_path:
+                with open(self.slow_log_path, 'a', encoding='utf-8') as log:
+                    log.write(f"{entry['time']}\t{name}({call_args})\t{elapsed_ms:.2f} мс\t{rows} строк\n")
+
+    def snapshot(self):
+        """Копия всей накопленной статистики"""
+        with self._lock:
+            return {
+                'uptime_seconds': time.time() - self.started_at,
+                'slow_query_ms': self.slow_query_ms,
+                'methods': {name: stats.snapshot() for name, stats in sorted(self._methods.items())},
+                'slow_queries': list(self.slow_log),
+            }
+
+    def reset(self):
+        """Обнуление статистики"""
+        with self._lock:
+            self._methods.clear()
+            self.slow_log.clear()
+            self.started_at = time.time()
+
+
+def format_stats(snapshot):
+    """Текстовая таблица статистики для команды STATS"""
+    lines = [
+        f"📊 Статистика за {snapshot['uptime_seconds']:.0f} с",
+        f"{'метод':<28}{'вызовы':>8}{'ошибки':>8}{'ср. мс':>9}{'p95 мс':>9}{'макс мс':>9}{'строк':>9}{'байт':>11}",
+    ]
+    for name, stats in snapshot['methods'].items():
+        lines.append(
+            f"{name:<28}{stats['calls']:>8}{stats['failures']:>8}{stats['mean_ms']:>9.2f}"
+            f"{stats['p95_ms']:>9.2f}{stats['max_ms']:>9.2f}{stats['rows']:>9}{stats['bytes']:>11}"
+        )
+    if snapshot['slow_queries']:
+        lines.append(f"🐢 Медленные запросы (порог {snapshot['slow_query_ms']} мс):")
+        for entry in snapshot['slow_queries'][-10:]:
+            lines.append(f"   {entry['time']} {entry['method']}({entry['args']}) "
+                         f"{entry['elapsed_ms']:.2f} мс, {entry['rows']} строк")
+    return '\n'.join(lines)
@@ -0,0 +1,157 @@
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from benchmark import percentile
+
+# Доли запросов в смеси нагрузки: (имя, вес)
+DEFAULT_MIX = (
+    ('student', 60),
+    ('course_students', 20),
+    ('course_disciplines', 15),
+    ('free_slots', 5),
+)
+
+
+def request_path(kind, rng, max_student_id):
+    """Адрес запроса данного вида со случайными параметрами"""
+    if kind == 'student':
+        return f"/students/{rng.randint(1, max_student_id)}"
+    course = rng.randint(1, 8)
+    if kind == 'course_students':
+        return f"/courses/{course}/students?limit=50"
+    if kind == 'course_disciplines':
+        return f"/courses/{course}/disciplines"
+    return f"/courses/{course}/free"
+
+
+class Client(threading.Thread):
+    """Поток нагрузки: одно keep-alive соединение, запросы подряд до deadline"""
+
+    def __init__(self, host, port, deadline, mix, max_student_id, seed):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.deadline = deadline
+        self.kinds = [kind for kind, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.max_student_id = max_student_id
+        self.rng = random.Random(seed)
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+        self.connects = 0
+
+    def run(self):
+        conn = None
+        while time.perf_counter() < self.deadline:
+            kind = self.rng.choices(self.kinds, self.weights)[0]
+            path = request_path(kind, self.rng, self.max_student_id)
+            if conn is None:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+                self.connects += 1
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = None
+                continue
+            self.latencies.append(time.perf_counter() - started)
+            self.statuses[response.status] += 1
+            if response.will_close:
+                conn.close()
+                conn = None
+        if conn is not None:
+            conn.close()
+
+
+def run_load(url, concurrency, duration, max_student_id, seed=0, mix=DEFAULT_MIX):
+    """Нагрузка в concurrency потоков в течение duration секунд; возвращает сводку"""
+    parts = urlsplit(url)
+    deadline = time.perf_counter() + duration
+    clients = [
+        Client(parts.hostname, parts.port or 80, deadline, mix, max_student_id, seed + i)
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for client in clients for latency in client.latencies)
+    statuses = Counter()
+    for client in clients:
+        statuses.update(client.statuses)
+    return {
+        'requests': len(latencies),
+        'errors': sum(client.errors for client in clients),
+        'connections': sum(client.connects for client in clients),
+        'seconds': elapsed,
+        'requests_per_sec': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'p999_ms': percentile(latencies, 0.999) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест HTTP-сервера (server.py)")
+    parser.add_argument('--url', default='http://127.0.0.1:8080', help="адрес сервера")
+    parser.add_argument('--concurrency', type=int, default=16, help="число одновременных клиентов")
+    parser.add_argument('--duration', type=float, default=10.0, help="длительность теста, секунд")
+    parser.add_argument('--max-student-id', type=int, default=10_000,
+                        help="верхняя граница случайных ID студентов")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='-', help="файл JSON-отчета ('-' - stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_load(args.url, args.concurrency, args.duration, args.max_student_id, args.seed)
+    if not results['requests']:
+        print(f"❌ Сервер {args.url} не ответил ни на один запрос", file=sys.stderr)
+        return 1
+
+    report = {
+        'meta': {
+            'url': args.url,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'max_student_id': args.max_student_id,
+            'seed': args.seed,
+            'mix': dict(DEFAULT_MIX),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+        },
+        'results': results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"✅ Отчет записан в {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
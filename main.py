@@ -1,85 +1,524 @@
-import mysql.connector
-from mysql.connector import Error
+import argparse
 import csv
+import hashlib
 import sys
 import os
+import time
+import queue
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from itertools import islice
+from datetime import datetime
+
+from aggregates import CourseCounts
+from backends import BACKENDS, Error, MySQLBackend, PoolError, SQLiteBackend
+from export import EXPORT_FORMATS, open_export
+from instrumentation import Instrumentation, format_stats
+from name_index import NameIndex
+from render import DEFAULT_MAX_ROWS, OUTPUT_FORMATS, OutputRenderer
+from rows import ROW_TYPES, build_rows
+from timetable import COURSES, DAYS_OF_WEEK, Timetable
+
+
+DEFAULT_BATCH_SIZE = 5000
+CSV_DELIMITERS = '\t,;'
+SNIFF_SAMPLE_SIZE = 64 * 1024
+DEFAULT_POOL_SIZE = 5
+DEFAULT_CHECKOUT_TIMEOUT = 30
+DEFAULT_HEALTH_CHECK_INTERVAL = 30
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_FETCH_SIZE = 1000
+DEFAULT_COMMIT_INTERVAL = 500
+# Строк в одном многострочном запросе массовых операций
+BULK_CHUNK_SIZE = 1000
+
+# Число студентов в ответе FIND по умолчанию
+DEFAULT_FIND_LIMIT = 20
+
+# Параллельный импорт: кусков файла на процесс (мельче куски - ровнее загрузка)
+CHUNKS_PER_WORKER = 4
+# До этого ID повторы ищутся по байтовой карте вместо множества
+DEDUP_BITMAP_LIMIT = 64 * 1024 * 1024
+# Диапазон BIGINT: ID вне него не поместятся ни в одну таблицу
+MAX_STUDENT_ID = 2 ** 63 - 1
+# Самый длинный диапазон ID в одной команде DELETE (9-120 и т. п.)
+MAX_ID_RANGE = 100_000
+
+# Команды, изменяющие данные (группируются в транзакции в режиме --script)
+WRITE_ACTIONS = ('PUT', 'DELETE')
+
+# Ключи сортировки для seek-пагинации (последний столбец - уникальный id)
+STUDENT_PAGE_KEY = ('name', 'id')
+DISCIPLINE_PAGE_KEY = ('course_number', 'day_of_week', 'lesson_number', 'id')
+
+# Столбцы, выгружаемые командой EXPORT
+EXPORT_COLUMNS = {
+    'students': ('id', 'name', 'course_number', 'created_at'),
+    'disciplines': ('id', 'discipline_name', 'day_of_week', 'lesson_number', 'course_number', 'created_at'),
+}
+
+# Методы UniversityDB, для которых собирается статистика (команда STATS)
+INSTRUMENTED_METHODS = (
+    'create_tables', 'import_students_from_csv', 'import_students_parallel',
+    'get_student', 'get_students_by_course', 'get_disciplines_by_course', 'get_all_disciplines',
+    'iter_students_by_course', 'iter_all_disciplines', 'get_free_slots',
+    'add_student', 'add_discipline', 'delete_student', 'delete_discipline',
+    'add_students', 'add_disciplines', 'delete_students', 'delete_disciplines',
+    'find_students', 'get_course_stats', 'export_table',
+)
+
+# Выборка строк в порядке полей StudentRow и DisciplineRow
+SELECT_STUDENTS = f"SELECT {', '.join(ROW_TYPES['students'].__slots__)} FROM students"
+SELECT_DISCIPLINES = f"SELECT {', '.join(ROW_TYPES['disciplines'].__slots__)} FROM disciplines"
+
+# Запросы горячих путей, которые готовятся один раз на соединение
+# ({for_update} подставляет бэкенд)
+HOT_STATEMENTS = {
+    'student_by_id': SELECT_STUDENTS + " WHERE id = %s",
+    'students_by_course': SELECT_STUDENTS + " WHERE course_number = %s ORDER BY name, id",
+    'all_disciplines': SELECT_DISCIPLINES + " ORDER BY course_number, day_of_week, lesson_number, id",
+    'insert_student': "INSERT INTO students (name, course_number) VALUES (%s, %s)",
+    'insert_discipline': "INSERT INTO disciplines (discipline_name, day_of_week, lesson_number, course_number) "
+                         "VALUES (%s, %s, %s, %s)",
+    'student_course': "SELECT course_number FROM students WHERE id = %s{for_update}",
+    'delete_student': "DELETE FROM students WHERE id = %s",
+    'delete_discipline': "DELETE FROM disciplines WHERE id = %s",
+}
+
+# Ключи app_metadata: версия схемы и отпечаток импортированного CSV
+SCHEMA_VERSION_KEY = 'schema_version'
+STUDENTS_CSV_KEY = 'students_csv'
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Маркер отсутствия значения в кэше (None - допустимое значение)
+CACHE_MISS = object()
+
+# Отметка "id уже встречался в CSV" при инкрементальном импорте
+SEEN_IN_CSV = object()
+
+# Отметка "id нет в таблице students" при инкрементальном импорте
+NOT_IN_TABLE = object()
+
+
+class ConnectionPool:
+    """Потокобезопасный пул соединений с базой данных
+
+    Соединения создаются заранее (прогрев) и выдаются через connection().
+    Соединение, простоявшее без дела дольше health_check_interval секунд,
+    перед выдачей проверяется ping-ом и при необходимости пересоздается.
+    on_reset(conn) вызывается, когда соединение закрыто или переподключено:
+    привязанное к его сессии состояние (подготовленные запросы) больше не годится.
+    """
+
+    def __init__(self, connect, size=DEFAULT_POOL_SIZE, prewarm=True, first_connection=None,
+                 checkout_timeout=DEFAULT_CHECKOUT_TIMEOUT, health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL,
+                 on_reset=None):
+        self._connect = connect
+        self._on_reset = on_reset
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+
+        if first_connection is not None:
+            self._created = 1
+            self._idle.put((first_connection, time.monotonic()))
+
+        if prewarm:
+            while self._reserve():
+                self._idle.put((self._open(), time.monotonic()))
+
+    def _reserve(self):
+        """Резерв места под новое соединение; False, если пул заполнен
+
+        Проверка и увеличение счетчика идут под одной блокировкой, иначе
+        параллельные потоки открыли бы больше size соединений.
+        """
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
 
+    def _open(self):
+        """Открытие соединения на зарезервированное место; при ошибке место освобождается"""
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _close(self, conn):
+        if self._on_reset is not None:
+            self._on_reset(conn)
+        try:
+            conn.close()
+        except Error:
+            pass
 
-class UniversityDB:
-    def __init__(self):
-        self.connection = None
+    def _discard(self, conn):
+        """Закрытие соединения и освобождение места в пуле"""
+        with self._lock:
+            self._created -= 1
+        self._close(conn)
 
-    def connect_to_db(self, host, user, password):
-        """Установка соединения с базой данных"""
+    def acquire(self):
+        """Выдача соединения из пула (ждет освобождения, если пул исчерпан)"""
         try:
-            # Сначала пробуем подключиться без указания базы данных
-            temp_conn = mysql.connector.connect(
-                host=host,
-                user=user,
-                password=password
-            )
+            conn, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve():
+                return self._open()
+            try:
+                conn, last_used = self._idle.get(timeout=self.checkout_timeout)
+            except queue.Empty:
+                raise PoolError(f"Нет свободных соединений в пуле за {self.checkout_timeout} с")
+
+        if time.monotonic() - last_used > self.health_check_interval:
+            session = getattr(conn, 'connection_id', None)
+            try:
+                conn.ping(reconnect=True, attempts=1, delay=0)
+            except Error:
+                # Место в пуле переходит к новому соединению
+                self._close(conn)
+                return self._open()
+            # ping мог молча переподключиться: у новой сессии свои подготовленные запросы
+            if self._on_reset is not None and getattr(conn, 'connection_id', None) != session:
+                self._on_reset(conn)
+        return conn
+
+    def release(self, conn):
+        """Возврат соединения в пул
+
+        Соединения работают в режиме автофиксации, поэтому транзакция
+        остается открытой только после прерванной записи: она откатывается,
+        чтобы следующий пользователь соединения не получил ее изменения.
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except Error:
+            self._discard(conn)
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """Контекстный менеджер: соединение из пула на время блока with"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Закрытие всех свободных соединений пула"""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+class LRUCache:
+    """Ограниченный по размеру LRU-кэш с необязательным временем жизни записей
+
+    Счетчик generation увеличивается при каждой инвалидации: результат
+    запроса, начатого до инвалидации, не попадет в кэш (см. put).
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Значение по ключу или CACHE_MISS, если его нет или оно устарело"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return CACHE_MISS
+
+    def put(self, key, value, generation=None):
+        """Сохранение значения; generation - значение счетчика до запроса к БД"""
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, *keys):
+        """Удаление конкретных ключей"""
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def invalidate_kind(self, *kinds):
+        """Удаление всех ключей указанных видов (первый элемент ключа)"""
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._data if key[0] in kinds]:
+                del self._data[key]
+
+    def stats(self):
+        """Счетчики попаданий и промахов"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+            }
+
+
+class StatementRegistry:
+    """Подготовленные запросы горячих путей
+
+    Для каждого соединения и запроса из HOT_STATEMENTS создается один
+    курсор подготовленных запросов: сервер разбирает текст запроса
+    при первом вызове, а дальше получает только параметры.
+    С enabled=False каждый вызов идет через новый обычный курсор.
+    """
+
+    def __init__(self, backend, enabled=True):
+        self.backend = backend
+        self.enabled = enabled
+        self.statements = {
+            name: query.format(for_update=backend.for_update)
+            for name, query in HOT_STATEMENTS.items()
+        }
+        # Курсоры соединения удаляются в forget_connection, когда пул его
+        # закрывает или переподключает (курсоры ссылаются на соединение,
+        # поэтому слабые ссылки на ключи здесь не помогли бы)
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self.prepared = 0
+        self.executions = 0
+
+    @contextmanager
+    def execute(self, conn, name, params=()):
+        """Выполнение запроса name на соединении conn; отдает курсор с результатом"""
+        if not self.enabled:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.statements[name], params)
+                yield cursor
+            finally:
+                cursor.close()
+            return
+
+        cursor = self._cursor(conn, name)
+        try:
+            cursor.execute(self.statements[name], params)
+        except Error:
+            # После ошибки подготовленный запрос мог остаться в неизвестном состоянии
+            self._forget(conn, name)
+            raise
+        self.executions += 1
+        yield cursor
+
+    def _cursor(self, conn, name):
+        with self._lock:
+            cursors = self._cursors.get(conn)
+            if cursors is None:
+                cursors = self._cursors[conn] = {}
+            cursor = cursors.get(name)
+            if cursor is None:
+                cursor = cursors[name] = self.backend.prepared_cursor(conn)
+                self.prepared += 1
+            return cursor
+
+    def _forget(self, conn, name):
+        with self._lock:
+            cursor = self._cursors.get(conn, {}).pop(name, None)
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Error:
+                pass
+
+    def forget_connection(self, conn):
+        """Удаление всех курсоров соединения conn (оно закрыто или переподключено)"""
+        with self._lock:
+            cursors = self._cursors.pop(conn, {})
+        for cursor in cursors.values():
+            try:
+                cursor.close()
+            except Error:
+                pass
+
+    def stats(self):
+        """Число подготовленных курсоров и выполнений через них"""
+        return {'enabled': self.enabled, 'prepared': self.prepared, 'executions': self.executions}
 
-            # Создаем базу данных если ее нет
-            cursor = temp_conn.cursor()
-            cursor.execute("CREATE DATABASE IF NOT EXISTS study")
-            print("✅ База данных 'study' создана или уже существует")
-            cursor.close()
-            temp_conn.close()
-
-            # Теперь подключаемся к конкретной базе данных
-            self.connection = mysql.connector.connect(
-                host=host,
-                user=user,
-                password=password,
-                database='study'
-            )
 
-            if self.connection.is_connected():
-                print("✅ Успешное подключение к базе данных study")
-                return True
+class UniversityDB:
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE, cache_ttl=None, prepared_statements=True, dict_rows=False):
+        # Строки результатов - StudentRow/DisciplineRow или, с dict_rows=True, словари
+        self.dict_rows = dict_rows
+        self.backend = None
+        self.pool = None
+        self.statements = None
+        self.prepared_statements = prepared_statements
+        self.cache = LRUCache(cache_size, cache_ttl)
+        self._local = threading.local()
+        self.timetable = Timetable()
+        self._timetable_lock = threading.Lock()
+        self.name_index = NameIndex()
+        self._name_index_lock = threading.Lock()
+        self.student_counts = CourseCounts()
+        self._student_counts_lock = threading.Lock()
+        self.instrumentation = None
+        self.last_import_stats = None
+
+    def connect(self, backend, pool_size=DEFAULT_POOL_SIZE, prewarm=True):
+        """Подключение к хранилищу backend и создание пула соединений"""
+        try:
+            if backend.max_pool_size is not None:
+                pool_size = min(pool_size, backend.max_pool_size)
+
+            self.backend = backend
+            self.statements = StatementRegistry(backend, self.prepared_statements)
+            self.pool = ConnectionPool(
+                backend.connect,
+                size=pool_size,
+                prewarm=prewarm,
+                first_connection=backend.bootstrap(),
+                on_reset=self.statements.forget_connection
+            )
+            print(f"✅ Успешное подключение: {backend.describe()} (пул: {pool_size} соединений)")
+            return True
 
         except Error as e:
-            print(f"❌ Ошибка подключения к MySQL: {e}")
+            print(f"❌ Ошибка подключения ({backend.name}): {e}")
             return False
 
+    def connect_to_db(self, host, user, password, pool_size=DEFAULT_POOL_SIZE, prewarm=True):
+        """Установка соединения с базой данных study на сервере MySQL"""
+        return self.connect(MySQLBackend(host, user, password), pool_size, prewarm)
+
     def create_tables(self):
         """Создание таблиц students и disciplines"""
         try:
-            cursor = self.connection.cursor()
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
 
-            # Создание таблицы students
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS students (
-                    id INT PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL,
-                    course_number INT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Создание таблицы disciplines
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS disciplines (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    discipline_name VARCHAR(100) NOT NULL,
-                    day_of_week VARCHAR(20) NOT NULL,
-                    lesson_number INT NOT NULL,
-                    course_number INT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+                for statement in self.backend.create_table_statements:
+                    cursor.execute(statement)
 
-            self.connection.commit()
-            print("✅ Таблицы 'students' и 'disciplines' созданы успешно")
-            cursor.close()
-            return True
+                conn.commit()
+                print("✅ Таблицы 'students' и 'disciplines' созданы успешно")
+
+                self._apply_migrations(conn, cursor)
+                cursor.execute(self.backend.upsert_metadata,
+                               (SCHEMA_VERSION_KEY, str(self.backend.schema_version)))
+                conn.commit()
+                cursor.close()
+                return True
 
         except Error as e:
             print(f"❌ Ошибка при создании таблиц: {e}")
             return False
 
-    def import_students_from_csv(self, csv_file_path='students.csv'):
-        """Импорт данных о студентах из CSV файла"""
+    def _apply_migrations(self, conn, cursor):
+        """Применение миграций схемы, которых еще нет в schema_version
+
+        Так существующие базы получают новые индексы автоматически,
+        без ручного ALTER TABLE.
+        """
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        current_version = cursor.fetchone()[0]
+
+        for version, description, statements in self.backend.migrations:
+            if version <= current_version:
+                continue
+
+            for statement in statements:
+                try:
+                    cursor.execute(statement)
+                except Error as e:
+                    # Индекс мог остаться от прерванной миграции
+                    if not self.backend.is_duplicate_index(e):
+                        raise
+
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            conn.commit()
+            print(f"✅ Применена миграция схемы {version}: {description}")
+
+    def load_metadata(self):
+        """Состояние прошлого запуска из app_metadata одним запросом
+
+        Для новой базы (таблицы еще нет) возвращает пустой словарь.
+        """
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT name, value FROM app_metadata")
+                metadata = dict(cursor.fetchall())
+                cursor.close()
+                return metadata
+        except Error:
+            return {}
+
+    def save_metadata(self, name, value):
+        """Запись значения в app_metadata"""
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(self.backend.upsert_metadata, (name, value))
+                conn.commit()
+                cursor.close()
+                return True
+        except Error as e:
+            print(f"❌ Ошибка при сохранении метаданных: {e}")
+            return False
+
+    def import_students_from_csv(self, csv_file_path='students.csv', bulk=False, batch_size=DEFAULT_BATCH_SIZE,
+                                 incremental=False):
+        """Импорт данных о студентах из CSV файла
+
+        Разделитель определяется один раз по началу файла, после чего файл
+        читается за один проход конвейером генераторов (разбор -> проверка ->
+        пачки), поэтому расход памяти не зависит от размера файла.
+        В пакетном режиме (bulk=True) строки отправляются на сервер пачками
+        по batch_size штук через executemany вместо отдельного запроса на строку.
+
+        В инкрементальном режиме (incremental=True) таблица не очищается:
+        CSV сравнивается с ее текущим содержимым построчно, и применяются
+        только вставки, изменения и удаления. Все изменения фиксируются одной
+        транзакцией, так что читатели не видят наполовину загруженную таблицу.
+        """
         try:
             if not os.path.exists(csv_file_path):
                 print(f"⚠️ Файл {csv_file_path} не найден")
@@ -88,154 +527,703 @@ class UniversityDB:
                 print("1[TAB]Bennie Hodkiewicz[TAB]1")
                 return False
 
-            cursor = self.connection.cursor()
-
-            # Очистка таблицы перед импортом
-            cursor.execute("DELETE FROM students")
-
+            started = time.perf_counter()
+            fingerprint = csv_fingerprint(csv_file_path)
             imported_count = 0
-            with open(csv_file_path, 'r', encoding='utf-8') as file:
-                # Пробуем разные разделители
-                for delimiter in ['\t', ',', ';']:
-                    file.seek(0)
-                    try:
-                        csv_reader = csv.reader(file, delimiter=delimiter)
-                        for row_num, row in enumerate(csv_reader, 1):
-                            if len(row) >= 3:
-                                try:
-                                    student_id = int(row[0].strip())
-                                    name = row[1].strip()
-                                    course_number = int(row[2].strip())
-
-                                    cursor.execute(
-                                        "INSERT INTO students (id, name, course_number) VALUES (%s, %s, %s)",
-                                        (student_id, name, course_number)
-                                    )
-                                    imported_count += 1
-
-                                except (ValueError, Error):
-                                    continue
-                        break
-                    except:
-                        continue
-
-            self.connection.commit()
-            print(f"✅ Импортировано {imported_count} студентов")
-            cursor.close()
+            changes = None
+            rejected = Counter()
+            # Индекс имен и счетчики курсов строятся из вставленных строк
+            # и заменяют текущие после фиксации
+            names = NameIndex()
+            courses = Counter()
+            renamed, removed = [], []
+            with self.student_counts.writing(), self.pool.connection() as conn, \
+                    open(csv_file_path, 'r', encoding='utf-8', newline='') as file:
+                # Очистка и загрузка - одна транзакция
+                conn.start_transaction()
+                cursor = conn.cursor()
+                delimiter = detect_delimiter(file)
+                students = validate_student_rows(parse_csv_rows(file, delimiter), rejected)
+
+                if incremental:
+                    changes = self._apply_students_diff(conn, students, batch_size, rejected,
+                                                        renamed, removed, courses)
+                    imported_count = changes['inserted'] + changes['updated'] + changes['unchanged']
+                else:
+                    # Очистка таблицы перед импортом
+                    cursor.execute("DELETE FROM students")
+
+                    for batch in batched(students, batch_size if bulk else 1):
+                        inserted = self._insert_students_batch(cursor, batch, rejected)
+                        names.extend((student_id, name) for student_id, name, _ in inserted)
+                        courses.update(course for _, _, course in inserted)
+                        imported_count += len(inserted)
+
+                cursor.execute(self.backend.upsert_metadata, (STUDENTS_CSV_KEY, fingerprint))
+                conn.commit()
+                cursor.close()
+
+                self.cache.invalidate_kind('student', 'students')
+                if incremental:
+                    self._students_changed(added=renamed, removed=removed, courses=courses)
+                else:
+                    self.name_index.replace(names)
+                    self.student_counts.load(courses.items())
+            elapsed = time.perf_counter() - started
+            rate = imported_count / elapsed if elapsed > 0 else 0.0
+            self.last_import_stats = {
+                'rows': imported_count,
+                'seconds': elapsed,
+                'rows_per_second': rate,
+                'batch_size': batch_size if bulk or incremental else 1,
+                'delimiter': delimiter,
+                'rejected': dict(rejected),
+                'changes': changes,
+            }
+            if incremental:
+                print(f"✅ Синхронизировано {imported_count} студентов: добавлено {changes['inserted']}, "
+                      f"изменено {changes['updated']}, удалено {changes['deleted']}, "
+                      f"без изменений {changes['unchanged']}")
+            else:
+                print(f"✅ Импортировано {imported_count} студентов")
+            if rejected:
+                print(f"⚠️ Отклонено строк: {sum(rejected.values())}")
+                for reason, count in rejected.most_common():
+                    print(f"   {reason}: {count}")
+            if bulk or incremental:
+                print(f"⏱️ {elapsed:.2f} с, {rate:.0f} строк/с (размер пачки {batch_size})")
             return True
 
         except Error as e:
             print(f"❌ Ошибка при импорте данных: {e}")
             return False
 
+    def _apply_students_diff(self, conn, students, batch_size, rejected, renamed, removed, courses):
+        """Применение разницы между потоком строк CSV и таблицей students
+
+        Текущее содержимое таблицы читается в словарь id -> (имя, курс).
+        Новые и измененные строки записываются пачками одним upsert-запросом,
+        строки, которых нет в CSV, удаляются пачками по id (не больше
+        max_query_params id в одном запросе).
+        Повторный id внутри CSV отклоняется. В renamed добавляются пары
+        (id, имя) новых и измененных строк, в removed - удаленные id,
+        в courses - изменение числа студентов по курсам.
+        """
+        current = {}
+        cursor = conn.cursor(buffered=False)
+        cursor.execute("SELECT id, name, course_number FROM students")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for student_id, name, course_number in rows:
+                current[student_id] = (name, course_number)
+        cursor.close()
+
+        changes = Counter(inserted=0, updated=0, deleted=0, unchanged=0)
+        cursor = conn.cursor()
+
+        def changed_rows():
+            for student_id, name, course_number in students:
+                previous = current.get(student_id, NOT_IN_TABLE)
+                if previous is SEEN_IN_CSV:
+                    rejected['дубликат ID'] += 1
+                    continue
+                current[student_id] = SEEN_IN_CSV
+                if previous is NOT_IN_TABLE:
+                    changes['inserted'] += 1
+                elif previous != (name, course_number):
+                    changes['updated'] += 1
+                    courses[previous[1]] -= 1
+                else:
+                    changes['unchanged'] += 1
+                    continue
+                renamed.append((student_id, name))
+                courses[course_number] += 1
+                yield student_id, name, course_number
+
+        for batch in batched(changed_rows(), batch_size):
+            cursor.executemany(self.backend.upsert_student, batch)
+
+        for student_id, value in current.items():
+            if value is not SEEN_IN_CSV:
+                removed.append(student_id)
+                courses[value[1]] -= 1
+        for batch in batched(removed, min(batch_size, self.backend.max_query_params)):
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f"DELETE FROM students WHERE id IN ({placeholders})", batch)
+            changes['deleted'] += len(batch)
+
+        cursor.close()
+        return dict(changes)
+
+    def import_students_parallel(self, csv_file_path='students.csv', workers=None,
+                                 batch_size=DEFAULT_BATCH_SIZE):
+        """Параллельный импорт студентов из CSV в нескольких процессах
+
+        Файл делится на куски по границам строк. Сначала процессы разбирают
+        и проверяют свои куски и возвращают ID строк; повторные ID ищутся
+        по всему файлу в порядке строк, так что, как и при обычном импорте,
+        остается первое вхождение. Затем процессы снова читают свои куски
+        и загружают их пачками через собственные соединения.
+
+        В отличие от обычного импорта таблица очищается отдельной транзакцией,
+        а куски фиксируются по мере загрузки: если импорт прерван ошибкой БД
+        или аварийным завершением процесса, уже зафиксированные куски остаются
+        в таблице, и выводится их число строк. Если бэкенд не допускает
+        одновременной записи (SQLite), выполняется обычный пакетный импорт.
+        """
+        workers = workers or os.cpu_count() or 1
+        if not self.backend.concurrent_writes:
+            print(f"⚠️ {self.backend.describe()} не поддерживает одновременную запись, "
+                  f"импорт выполняется в одном процессе")
+            return self.import_students_from_csv(csv_file_path, bulk=True, batch_size=batch_size)
+        if not os.path.exists(csv_file_path):
+            return self.import_students_from_csv(csv_file_path)
+
+        cleared = False
+        names = NameIndex()
+        courses = Counter()
+        with self.student_counts.writing():
+            try:
+                started = time.perf_counter()
+                fingerprint = csv_fingerprint(csv_file_path)
+                with open(csv_file_path, 'r', encoding='utf-8', newline='') as file:
+                    delimiter = detect_delimiter(file)
+                chunks = csv_chunk_ranges(csv_file_path, workers * CHUNKS_PER_WORKER)
+                rejected = Counter()
+
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    scans = [executor.submit(scan_csv_chunk, csv_file_path, start, end, delimiter)
+                             for start, end in chunks]
+                    chunk_ids = []
+                    for future in scans:
+                        ids, chunk_rejected = future.result()
+                        chunk_ids.append(ids)
+                        rejected.update(chunk_rejected)
+                    duplicates = find_duplicate_rows(chunk_ids)
+                    rejected['дубликат ID'] += sum(len(skip) for skip in duplicates)
+                    scanned = time.perf_counter() - started
+                    print(f"🔎 Разобрано {sum(len(ids) for ids in chunk_ids)} строк в {len(chunks)} кусках "
+                          f"за {scanned:.2f} с ({workers} процессов)")
+                    del chunk_ids
+
+                    with self.pool.connection() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute("DELETE FROM students")
+                        conn.commit()
+                        cursor.close()
+                    cleared = True
+
+                    loads = {
+                        executor.submit(load_csv_chunk, self.backend, csv_file_path, start, end,
+                                        delimiter, skip, batch_size): number
+                        for number, ((start, end), skip) in enumerate(zip(chunks, duplicates), 1)
+                    }
+                    imported_count = 0
+                    for future in as_completed(loads):
+                        inserted, chunk_rejected, seconds, pid = future.result()
+                        imported_count += len(inserted)
+                        rejected.update(chunk_rejected)
+                        names.extend((student_id, name) for student_id, name, _ in inserted)
+                        courses.update(course for _, _, course in inserted)
+                        print(f"   кусок {loads[future]}/{len(chunks)} (процесс {pid}): "
+                              f"{len(inserted)} строк за {seconds:.2f} с")
+
+                with self.pool.connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(self.backend.upsert_metadata, (STUDENTS_CSV_KEY, fingerprint))
+                    conn.commit()
+                    cursor.close()
+
+                self.name_index.replace(names)
+                self.student_counts.load(courses.items())
+                names = None
+                elapsed = time.perf_counter() - started
+                rate = imported_count / elapsed if elapsed > 0 else 0.0
+                self.last_import_stats = {
+                    'rows': imported_count,
+                    'seconds': elapsed,
+                    'rows_per_second': rate,
+                    'batch_size': batch_size,
+                    'delimiter': delimiter,
+                    'rejected': dict(rejected),
+                    'workers': workers,
+                    'chunks': len(chunks),
+                }
+                print(f"✅ Импортировано {imported_count} студентов")
+                if rejected:
+                    print(f"⚠️ Отклонено строк: {sum(rejected.values())}")
+                    for reason, count in rejected.most_common():
+                        print(f"   {reason}: {count}")
+                print(f"⏱️ {elapsed:.2f} с, {rate:.0f} строк/с ({workers} процессов, размер пачки {batch_size})")
+                return True
+
+            except BrokenProcessPool:
+                print("❌ Процесс импорта аварийно завершился, импорт прерван")
+                self._report_committed_students(cleared)
+                return False
+            except Error as e:
+                print(f"❌ Ошибка при импорте данных: {e}")
+                self._report_committed_students(cleared)
+                return False
+            except OSError as e:
+                print(f"❌ Ошибка при параллельном импорте: {e}")
+                self._report_committed_students(cleared)
+                return False
+
+            finally:
+                if cleared:
+                    # Воркеры пишут в таблицу мимо кэша и индексов - и при успехе, и при сбое
+                    self.cache.invalidate_kind('student', 'students')
+                    if names is not None:
+                        # Импорт прерван: загруженные куски неизвестны, индексы перестроятся из БД
+                        self.name_index.invalidate()
+                        self.student_counts.invalidate()
+
+    def _report_committed_students(self, cleared):
+        """Сообщение о строках, зафиксированных прерванным параллельным импортом"""
+        if not cleared:
+            print("⚠️ Таблица students не изменена")
+            return
+        try:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM students")
+                committed = cursor.fetchone()[0]
+                cursor.close()
+            print(f"⚠️ Таблица students очищена, зафиксировано строк до сбоя: {committed}")
+        except Error as e:
+            print(f"⚠️ Таблица students очищена, число зафиксированных строк неизвестно: {e}")
+
+    def _insert_students_batch(self, cursor, batch, rejected):
+        """Вставка пачки студентов; список вставленных строк (см. insert_students_batch)"""
+        return insert_students_batch(self.backend, cursor, batch, rejected)
+
     def get_student(self, student_id):
-        """Получение студента по ID"""
+        """Получение студента по ID: строка, None - не найден, False - ошибка БД"""
+        key = ('student', cache_key(student_id))
+        student = self.cache.get(key)
+        if student is not CACHE_MISS:
+            return student
+
+        generation = self.cache.generation
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT * FROM students WHERE id = %s",
-                (student_id,)
-            )
-            student = cursor.fetchone()
-            cursor.close()
+            with self._connection() as conn, \
+                    self.statements.execute(conn, 'student_by_id', (student_id,)) as cursor:
+                rows = self._build_rows('students', cursor.fetchall())
+            student = rows[0] if rows else None
+            self.cache.put(key, student, generation)
             return student
         except Error as e:
             print(f"❌ Ошибка при получении студента: {e}")
-            return None
+            return False
 
     def get_disciplines_by_course(self, course_number):
-        """Получение всех занятий по номеру курса"""
+        """Получение всех занятий по номеру курса в хронологическом порядке
+
+        Ответ берется из расписания в памяти, без обращения к БД.
+        Возвращает None, если расписание не удалось загрузить.
+        """
+        if not self._ensure_timetable():
+            return None
+        return self.timetable.disciplines_by_course(course_number)
+
+    def get_free_slots(self, course_number):
+        """Свободные слоты курса: список пар (день, номер пары) или None при ошибке"""
+        if not self._ensure_timetable():
+            return None
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT * FROM disciplines WHERE course_number = %s ORDER BY day_of_week, lesson_number",
-                (course_number,)
-            )
-            disciplines = cursor.fetchall()
-            cursor.close()
-            return disciplines
-        except Error as e:
-            print(f"❌ Ошибка при получении дисциплин: {e}")
+            return self.timetable.free_slots(course_number)
+        except ValueError as e:
+            print(f"❌ Ошибка: {e}")
+            return None
+
+    def _ensure_timetable(self):
+        """Однократная загрузка расписания из таблицы disciplines"""
+        if self.timetable.loaded:
+            return True
+        with self._timetable_lock:
+            if self.timetable.loaded:
+                return True
+            try:
+                with self._connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(SELECT_DISCIPLINES)
+                    conflicts = self.timetable.load(self._build_rows('disciplines', cursor.fetchall()))
+                    cursor.close()
+                if conflicts:
+                    print(f"⚠️ В расписании {conflicts} занятий в уже занятых слотах")
+                return True
+            except Error as e:
+                print(f"❌ Ошибка при загрузке расписания: {e}")
+                return False
+
+    def find_students(self, text, limit=DEFAULT_FIND_LIMIT):
+        """Поиск студентов по имени: сначала по префиксу имени или его слова,
+        затем нечеткий по триграммам
+
+        ID ищутся в индексе имен в памяти (name_index.py), из БД читаются
+        только найденные строки, в порядке релевантности.
+        Возвращает None при ошибке БД.
+        """
+        if not self._ensure_name_index():
+            return None
+        ids = self.name_index.search(text, int(limit))
+        if not ids:
             return []
+        students = {}
+        try:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                for chunk in batched(ids, min(BULK_CHUNK_SIZE, self.backend.max_query_params)):
+                    placeholders = ', '.join(['%s'] * len(chunk))
+                    cursor.execute(SELECT_STUDENTS + f" WHERE id IN ({placeholders})", chunk)
+                    students.update((row[0], row) for row in cursor.fetchall())
+                cursor.close()
+            return self._build_rows('students', [students[i] for i in ids if i in students])
+        except Error as e:
+            print(f"❌ Ошибка при поиске студентов: {e}")
+            return None
 
-    def get_students_by_course(self, course_number):
-        """Получение всех студентов по номеру курса"""
+    def _ensure_name_index(self):
+        """Однократное построение индекса имен из таблицы students"""
+        if self.name_index.loaded:
+            return True
+        with self._name_index_lock:
+            if self.name_index.loaded:
+                return True
+            try:
+                # Повтор, если индекс сброшен (откат транзакции) во время загрузки
+                while not self.name_index.loaded:
+                    generation = self.name_index.begin_load()
+                    with self._connection() as conn:
+                        cursor = conn.cursor(buffered=False)
+                        cursor.execute("SELECT id, name FROM students")
+                        batches = iter(lambda: cursor.fetchmany(DEFAULT_FETCH_SIZE), [])
+                        self.name_index.load((row for batch in batches for row in batch), generation)
+                        cursor.close()
+                return True
+            except Error as e:
+                print(f"❌ Ошибка при построении индекса имен: {e}")
+                return False
+
+    def get_course_stats(self, course_number):
+        """Сводка по курсу: число студентов, занятий и занятий по дням недели
+
+        Значения берутся из счетчиков в памяти, которые обновляются при
+        добавлении и удалении, без выборки списков курса. Возвращает
+        словарь или None при ошибке.
+        """
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT * FROM students WHERE course_number = %s ORDER BY name",
-                (course_number,)
+            course = int(course_number)
+        except (TypeError, ValueError):
+            print(f"❌ Ошибка: некорректный номер курса '{course_number}'")
+            return None
+        if not self._ensure_timetable() or not self._ensure_student_counts():
+            return None
+        lessons_by_day = self.timetable.lessons_by_day(course)
+        return {
+            'course_number': course,
+            'students': self.student_counts.get(course),
+            'lessons': sum(lessons_by_day.values()),
+            'lessons_by_day': lessons_by_day,
+        }
+
+    def _ensure_student_counts(self):
+        """Однократный подсчет студентов по курсам"""
+        if self.student_counts.loaded:
+            return True
+        with self._student_counts_lock:
+            if self.student_counts.loaded:
+                return True
+            try:
+                # Повтор, если счетчики сброшены (откат транзакции) во время подсчета
+                while not self.student_counts.loaded:
+                    with self.student_counts.loading() as generation, self._connection() as conn:
+                        cursor = conn.cursor()
+                        # Покрывается индексом (course_number, name)
+                        cursor.execute("SELECT course_number, COUNT(*) FROM students GROUP BY course_number")
+                        self.student_counts.load(cursor.fetchall(), generation)
+                        cursor.close()
+                return True
+            except Error as e:
+                print(f"❌ Ошибка при подсчете студентов по курсам: {e}")
+                return False
+
+    def get_students_by_course(self, course_number, after=None, limit=None):
+        """Получение студентов по номеру курса в алфавитном порядке
+
+        Для постраничного вывода: after - ключ (имя, id) последней строки
+        предыдущей страницы, limit - размер страницы. Используется
+        seek-пагинация по индексу (course_number, name), поэтому дальние
+        страницы стоят столько же, сколько первая. Возвращает None при ошибке БД.
+        """
+        if after is not None or limit is not None:
+            return self._fetch_page(
+                'students',
+                SELECT_STUDENTS + " WHERE course_number = %s",
+                (course_number,),
+                STUDENT_PAGE_KEY,
+                after,
+                limit,
+                "❌ Ошибка при получении студентов"
             )
-            students = cursor.fetchall()
-            cursor.close()
+
+        key = ('students', cache_key(course_number))
+        students = self.cache.get(key)
+        if students is not CACHE_MISS:
+            return students
+
+        generation = self.cache.generation
+        try:
+            with self._connection() as conn, \
+                    self.statements.execute(conn, 'students_by_course', (course_number,)) as cursor:
+                students = self._build_rows('students', cursor.fetchall())
+            self.cache.put(key, students, generation)
             return students
         except Error as e:
             print(f"❌ Ошибка при получении студентов: {e}")
-            return []
+            return None
 
-    def get_all_disciplines(self):
-        """Получение полного расписания"""
-        try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT * FROM disciplines ORDER BY course_number, day_of_week, lesson_number"
+    def get_all_disciplines(self, after=None, limit=None):
+        """Получение полного расписания
+
+        Для постраничного вывода: after - ключ (курс, день, пара, id)
+        последней строки предыдущей страницы, limit - размер страницы.
+        Возвращает None при ошибке БД.
+        """
+        if after is not None or limit is not None:
+            return self._fetch_page(
+                'disciplines',
+                SELECT_DISCIPLINES + " WHERE 1 = 1",
+                (),
+                DISCIPLINE_PAGE_KEY,
+                after,
+                limit,
+                "❌ Ошибка при получении расписания"
             )
-            disciplines = cursor.fetchall()
-            cursor.close()
+
+        key = ('all_disciplines',)
+        disciplines = self.cache.get(key)
+        if disciplines is not CACHE_MISS:
+            return disciplines
+
+        generation = self.cache.generation
+        try:
+            with self._connection() as conn, \
+                    self.statements.execute(conn, 'all_disciplines') as cursor:
+                disciplines = self._build_rows('disciplines', cursor.fetchall())
+            self.cache.put(key, disciplines, generation)
             return disciplines
         except Error as e:
             print(f"❌ Ошибка при получении расписания: {e}")
-            return []
+            return None
+
+    def _fetch_page(self, table, query, params, key_columns, after, limit, error_message):
+        """Одна страница результата при seek-пагинации
+
+        К запросу (он должен заканчиваться условием WHERE) добавляется
+        условие "строка после after" и сортировка по key_columns.
+        Возвращает None при ошибке БД.
+        """
+        params = list(params)
+        if after is not None:
+            condition, after_params = keyset_condition(key_columns, after)
+            query += f" AND {condition}"
+            params.extend(after_params)
+        query += " ORDER BY " + ", ".join(key_columns)
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(int(limit))
+
+        try:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, tuple(params))
+                rows = self._build_rows(table, cursor.fetchall())
+                cursor.close()
+                return rows
+        except Error as e:
+            print(f"{error_message}: {e}")
+            return None
+
+    def iter_students_by_course(self, course_number, chunk_size=DEFAULT_FETCH_SIZE, limit=None):
+        """Потоковое получение студентов курса
+
+        Строки читаются небуферизованным курсором порциями по chunk_size,
+        поэтому расход памяти не зависит от размера курса.
+        limit - не больше limit первых строк.
+        """
+        cached = self.cache.get(('students', cache_key(course_number)))
+        if cached is not CACHE_MISS:
+            return islice(cached, limit)
+        return self._iter_query(
+            'students',
+            SELECT_STUDENTS + " WHERE course_number = %s ORDER BY name, id",
+            (course_number,),
+            chunk_size,
+            "❌ Ошибка при получении студентов",
+            limit
+        )
+
+    def iter_all_disciplines(self, chunk_size=DEFAULT_FETCH_SIZE, limit=None):
+        """Потоковое получение полного расписания порциями по chunk_size строк"""
+        cached = self.cache.get(('all_disciplines',))
+        if cached is not CACHE_MISS:
+            return islice(cached, limit)
+        return self._iter_query(
+            'disciplines',
+            SELECT_DISCIPLINES + " ORDER BY course_number, day_of_week, lesson_number, id",
+            (),
+            chunk_size,
+            "❌ Ошибка при получении расписания",
+            limit
+        )
+
+    def _iter_query(self, table, query, params, chunk_size, error_message, limit=None):
+        """Генератор строк запроса через небуферизованный курсор
+
+        Соединение занято, пока генератор не исчерпан или не закрыт;
+        непрочитанный остаток результата дочитывается перед возвратом в пул.
+        Если нужны только первые строки, limit ограничивает запрос (LIMIT),
+        чтобы при раннем закрытии не дочитывать весь результат.
+        """
+        if limit is not None:
+            query += " LIMIT %s"
+            params = tuple(params) + (int(limit),)
+        try:
+            with self._connection() as conn:
+                cursor = conn.cursor(buffered=False)
+                try:
+                    cursor.execute(query, params)
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        yield from self._build_rows(table, rows)
+                finally:
+                    conn.consume_results()
+                    cursor.close()
+        except Error as e:
+            print(f"{error_message}: {e}")
+
+    def export_table(self, table, path, fmt='csv', chunk_size=DEFAULT_FETCH_SIZE):
+        """Экспорт таблицы students или disciplines в файл
+
+        Строки читаются небуферизованным курсором кортежами порциями по
+        chunk_size и сразу пишутся в файл, поэтому память не зависит от
+        размера таблицы. Форматы: csv, jsonl, col (см. export.py).
+        Возвращает число выгруженных строк или None при ошибке.
+        """
+        if table not in EXPORT_COLUMNS:
+            print(f"❌ Неизвестная таблица '{table}' (доступны: {', '.join(EXPORT_COLUMNS)})")
+            return None
+        if fmt not in EXPORT_FORMATS:
+            print(f"❌ Неизвестный формат '{fmt}' (доступны: {', '.join(EXPORT_FORMATS)})")
+            return None
+
+        columns = EXPORT_COLUMNS[table]
+        exported = 0
+        try:
+            with self._connection() as conn:
+                cursor = conn.cursor(buffered=False)
+                try:
+                    cursor.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id")
+                    file, writer = open_export(path, columns, fmt)
+                    with file:
+                        while True:
+                            rows = cursor.fetchmany(chunk_size)
+                            if not rows:
+                                break
+                            writer.write_rows(rows)
+                            exported += len(rows)
+                        writer.close()
+                finally:
+                    conn.consume_results()
+                    cursor.close()
+            return exported
+        except (Error, OSError) as e:
+            print(f"❌ Ошибка при экспорте {table}: {e}")
+            return None
 
     def add_student(self, name, course_number):
         """Добавление нового студента"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT MAX(id) as max_id FROM students")
-            result = cursor.fetchone()
-            new_id = (result[0] or 0) + 1
-
-            cursor.execute(
-                "INSERT INTO students (id, name, course_number) VALUES (%s, %s, %s)",
-                (new_id, name, int(course_number))
-            )
-            self.connection.commit()
-            print(f"✅ Студент '{name}' добавлен (ID: {new_id})")
-            cursor.close()
-            return True
+            course = int(course_number)
+        except (TypeError, ValueError):
+            course = None
+        if course is None or not 1 <= course <= COURSES:
+            print(f"❌ Ошибка: некорректный номер курса '{course_number}' (допустимо 1-{COURSES})")
+            return False
+        try:
+            with self.student_counts.writing(), self._connection() as conn, \
+                    self.statements.execute(conn, 'insert_student', (name, course)) as cursor:
+                self._commit(conn)
+                new_id = cursor.lastrowid
+                self._invalidate(('student', new_id), ('students', course))
+                self._students_changed(added=[(new_id, name)], courses={course: 1})
+                print(f"✅ Студент '{name}' добавлен (ID: {new_id})")
+                return True
         except Error as e:
             print(f"❌ Ошибка при добавлении студента: {e}")
             return False
 
     def add_discipline(self, discipline_name, day_of_week, lesson_number, course_number):
-        """Добавление нового занятия"""
+        """Добавление нового занятия
+
+        Слот (курс, день, пара) проверяется по расписанию в памяти:
+        занятие в уже занятый слот не добавляется.
+        """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(
-                "INSERT INTO disciplines (discipline_name, day_of_week, lesson_number, course_number) VALUES (%s, %s, %s, %s)",
-                (discipline_name, day_of_week, int(lesson_number), int(course_number))
-            )
-            self.connection.commit()
-            discipline_id = cursor.lastrowid
-            print(f"✅ Дисциплина '{discipline_name}' добавлена (ID: {discipline_id})")
-            cursor.close()
-            return True
+            index = self.timetable.reserve(course_number, day_of_week, lesson_number) \
+                if self._ensure_timetable() else None
+        except ValueError as e:
+            print(f"❌ Ошибка: {e}")
+            return False
+
+        if index is None:
+            if self.timetable.loaded:
+                occupant = self.timetable.occupant(course_number, day_of_week, lesson_number)
+                print(f"❌ Слот занят: курс {course_number}, {day_of_week}, пара {lesson_number} - "
+                      f"'{occupant['discipline_name'] if occupant else '...'}'")
+            return False
+
+        try:
+            params = (discipline_name, day_of_week, int(lesson_number), int(course_number))
+            with self._connection() as conn, \
+                    self.statements.execute(conn, 'insert_discipline', params) as cursor:
+                self._commit(conn)
+                discipline_id = cursor.lastrowid
+                self.timetable.fill(index, self._build_rows('disciplines', [(
+                    discipline_id, discipline_name, day_of_week, int(lesson_number), int(course_number),
+                    datetime.now().replace(microsecond=0),
+                )])[0])
+                self._invalidate(('all_disciplines',))
+                print(f"✅ Дисциплина '{discipline_name}' добавлена (ID: {discipline_id})")
+                return True
         except Error as e:
+            self.timetable.release(index)
             print(f"❌ Ошибка при добавлении дисциплины: {e}")
             return False
 
     def delete_student(self, student_id):
         """Удаление студента по ID"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM students WHERE id = %s", (student_id,))
-            self.connection.commit()
-            if cursor.rowcount > 0:
-                print(f"✅ Студент с ID {student_id} удален")
-            else:
-                print(f"⚠️ Студент с ID {student_id} не найден")
-            cursor.close()
-            return True
+            with self.student_counts.writing(), self._connection(write=True) as conn:
+                # Курс нужен, чтобы сбросить в кэше только его список студентов и счетчик
+                with self.statements.execute(conn, 'student_course', (student_id,)) as cursor:
+                    rows = cursor.fetchall()
+                with self.statements.execute(conn, 'delete_student', (student_id,)) as cursor:
+                    deleted = cursor.rowcount
+                self._commit(conn)
+                if deleted > 0:
+                    self._invalidate(('student', cache_key(student_id)), ('students', rows[0][0]))
+                    self._students_changed(removed=[cache_key(student_id)], courses={rows[0][0]: -1})
+                    print(f"✅ Студент с ID {student_id} удален")
+                else:
+                    print(f"⚠️ Студент с ID {student_id} не найден")
+                return True
         except Error as e:
             print(f"❌ Ошибка при удалении студента: {e}")
             return False
@@ -243,26 +1231,726 @@ class UniversityDB:
     def delete_discipline(self, discipline_id):
         """Удаление занятия по ID"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM disciplines WHERE id = %s", (discipline_id,))
-            self.connection.commit()
-            if cursor.rowcount > 0:
-                print(f"✅ Занятие с ID {discipline_id} удалено")
-            else:
-                print(f"⚠️ Занятие с ID {discipline_id} не найдено")
-            cursor.close()
-            return True
+            with self._connection() as conn, \
+                    self.statements.execute(conn, 'delete_discipline', (discipline_id,)) as cursor:
+                self._commit(conn)
+                if cursor.rowcount > 0:
+                    self.timetable.remove(discipline_id)
+                    self._invalidate(('all_disciplines',))
+                    print(f"✅ Занятие с ID {discipline_id} удалено")
+                else:
+                    print(f"⚠️ Занятие с ID {discipline_id} не найдено")
+                return True
         except Error as e:
             print(f"❌ Ошибка при удалении занятия: {e}")
             return False
 
+    def add_students(self, rows):
+        """Массовое добавление студентов: rows - пары (имя, курс)
+
+        Строки вставляются многострочными INSERT по BULK_CHUNK_SIZE штук
+        в одной транзакции. Возвращает список новых ID в порядке rows
+        (None для строки с некорректным курсом) или None при ошибке БД.
+        """
+        results = []
+        valid = []
+        for name, course_number in rows:
+            try:
+                course = int(course_number)
+            except (TypeError, ValueError):
+                results.append(None)
+                continue
+            if not 1 <= course <= COURSES:
+                results.append(None)
+                continue
+            valid.append((name, course))
+            results.append(len(valid) - 1)
+
+        with self.student_counts.writing():
+            try:
+                ids = self._insert_many(
+                    "INSERT INTO students (name, course_number) VALUES ", "(%s, %s)", valid
+                ) if valid else []
+            except Error as e:
+                print(f"❌ Ошибка при добавлении студентов: {e}")
+                return None
+
+            self._invalidate(*[('student', student_id) for student_id in ids],
+                             *{('students', course) for _, course in valid})
+            self._students_changed(added=[(student_id, name) for student_id, (name, _) in zip(ids, valid)],
+                                   courses=Counter(course for _, course in valid))
+        results = [None if index is None else ids[index] for index in results]
+        print(f"✅ Добавлено студентов: {len(ids)}"
+              + (f", отклонено: {len(results) - len(ids)}" if len(results) > len(ids) else ""))
+        return results
+
+    def add_disciplines(self, rows):
+        """Массовое добавление занятий: rows - кортежи (название, день, пара, курс)
+
+        Слоты проверяются по расписанию в памяти так же, как в add_discipline;
+        занятие в занятый (в том числе предыдущей строкой rows) или
+        некорректный слот не добавляется. Возвращает список новых ID
+        в порядке rows (None для отклоненных) или None при ошибке БД.
+        """
+        if not self._ensure_timetable():
+            return None
+
+        results = []
+        valid = []
+        reserved = []
+        for discipline_name, day_of_week, lesson_number, course_number in rows:
+            try:
+                index = self.timetable.reserve(course_number, day_of_week, lesson_number)
+            except ValueError:
+                index = None
+            if index is None:
+                results.append(None)
+                continue
+            reserved.append(index)
+            valid.append((discipline_name, day_of_week, int(lesson_number), int(course_number)))
+            results.append(len(valid) - 1)
+
+        try:
+            ids = self._insert_many(
+                "INSERT INTO disciplines (discipline_name, day_of_week, lesson_number, course_number) VALUES ",
+                "(%s, %s, %s, %s)",
+                valid
+            ) if valid else []
+        except Error as e:
+            for index in reserved:
+                self.timetable.release(index)
+            print(f"❌ Ошибка при добавлении занятий: {e}")
+            return None
+
+        created_at = datetime.now().replace(microsecond=0)
+        new_rows = self._build_rows('disciplines', [
+            (discipline_id,) + row + (created_at,) for discipline_id, row in zip(ids, valid)
+        ])
+        for index, row in zip(reserved, new_rows):
+            self.timetable.fill(index, row)
+        if ids:
+            self._invalidate(('all_disciplines',))
+
+        results = [None if index is None else ids[index] for index in results]
+        print(f"✅ Добавлено занятий: {len(ids)}"
+              + (f", отклонено (слот занят или некорректен): {len(results) - len(ids)}"
+                 if len(results) > len(ids) else ""))
+        return results
+
+    def _insert_many(self, prefix, row_placeholder, rows):
+        """Вставка rows многострочными INSERT одной транзакцией; список новых ID
+
+        ID строк вычисляются по ID первой строки каждого INSERT и шагу
+        автоинкремента (см. Backend.insert_id_step), без повторного чтения.
+        """
+        chunk_size = min(BULK_CHUNK_SIZE, self.backend.max_query_params // len(rows[0]))
+        ids = []
+        with self._connection(write=True) as conn:
+            step = self.backend.insert_id_step(conn)
+            cursor = conn.cursor()
+            for chunk in batched(rows, chunk_size):
+                cursor.execute(
+                    prefix + ", ".join([row_placeholder] * len(chunk)),
+                    [value for row in chunk for value in row]
+                )
+                first_id = self.backend.first_insert_id(cursor, len(chunk), step)
+                ids.extend(range(first_id, first_id + len(chunk) * step, step))
+            self._commit(conn)
+            cursor.close()
+        return ids
+
+    def delete_students(self, student_ids):
+        """Массовое удаление студентов по ID
+
+        Удаление идет многострочными запросами WHERE id IN (...) в одной
+        транзакции. Возвращает словарь ID -> был ли студент удален
+        (False - не найден) или None при ошибке БД.
+        """
+        with self.student_counts.writing():
+            try:
+                student_ids = [int(student_id) for student_id in student_ids]
+                found = self._delete_many('students', student_ids, ", course_number")
+            except ValueError as e:
+                print(f"❌ Ошибка: {e}")
+                return None
+            except Error as e:
+                print(f"❌ Ошибка при удалении студентов: {e}")
+                return None
+
+            self._invalidate(*[('student', student_id) for student_id in found],
+                             *{('students', course) for course in found.values()})
+            self._students_changed(removed=found, courses={
+                course: -count for course, count in Counter(found.values()).items()
+            })
+        return report_bulk_delete(student_ids, found, "Удалено студентов")
+
+    def delete_disciplines(self, discipline_ids):
+        """Массовое удаление занятий по ID
+
+        Возвращает словарь ID -> было ли занятие удалено или None при ошибке БД.
+        """
+        try:
+            discipline_ids = [int(discipline_id) for discipline_id in discipline_ids]
+            found = self._delete_many('disciplines', discipline_ids)
+        except ValueError as e:
+            print(f"❌ Ошибка: {e}")
+            return None
+        except Error as e:
+            print(f"❌ Ошибка при удалении занятий: {e}")
+            return None
+
+        for discipline_id in found:
+            self.timetable.remove(discipline_id)
+        if found:
+            self._invalidate(('all_disciplines',))
+        return report_bulk_delete(discipline_ids, found, "Удалено занятий")
+
+    def _delete_many(self, table, ids, extra_columns=""):
+        """Удаление строк table по ids одной транзакцией
+
+        Возвращает словарь найденных ID -> значение первого из extra_columns
+        (None, если дополнительных столбцов нет).
+        """
+        found = {}
+        unique_ids = list(dict.fromkeys(ids))
+        chunk_size = min(BULK_CHUNK_SIZE, self.backend.max_query_params)
+        with self._connection(write=True) as conn:
+            cursor = conn.cursor()
+            for chunk in batched(unique_ids, chunk_size):
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(
+                    f"SELECT id{extra_columns} FROM {table} WHERE id IN ({placeholders})"
+                    + self.backend.for_update,
+                    chunk
+                )
+                for row in cursor.fetchall():
+                    found[row[0]] = row[1] if len(row) > 1 else None
+                cursor.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", chunk)
+            self._commit(conn)
+            cursor.close()
+        return found
+
+    def _build_rows(self, table, rows):
+        """Строки-кортежи запроса в строки результата (см. rows.py)"""
+        return build_rows(table, rows, self.dict_rows)
+
+    @contextmanager
+    def _connection(self, write=False):
+        """Соединение для операции: закрепленное за текущей транзакцией или из пула
+
+        Соединения пула работают в режиме автофиксации: чтение и запись
+        одним запросом не тратят лишних обращений к серверу на BEGIN
+        и COMMIT/ROLLBACK. Запись из нескольких запросов (write=True)
+        вне общей транзакции начинает свою.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+        else:
+            with self.pool.connection() as conn:
+                if write:
+                    conn.start_transaction()
+                yield conn
+
+    def _commit(self, conn):
+        """Фиксация изменений, если операция не входит в общую транзакцию
+        и открыла свою (одиночный запрос уже зафиксирован автоматически)"""
+        if getattr(self._local, 'conn', None) is None and conn.in_transaction:
+            conn.commit()
+
+    def _invalidate(self, *keys):
+        """Сброс ключей кэша; внутри транзакции они сбрасываются еще раз при ее завершении"""
+        self.cache.invalidate(*keys)
+        if getattr(self._local, 'conn', None) is not None:
+            self._local.pending_keys.update(keys)
+
+    def in_transaction(self):
+        """Открыта ли в текущем потоке общая транзакция"""
+        return getattr(self._local, 'conn', None) is not None
+
+    def _students_changed(self, added=(), removed=(), courses=None):
+        """Учет добавленных (id, имя) и удаленных ID студентов в индексе имен
+        и изменения числа студентов по курсам (словарь курс -> разница) в счетчиках
+
+        Незагруженный индекс изменение пропускает. В общей транзакции индекс
+        может загрузиться до ее фиксации без этих строк - тогда он сбрасывается
+        при фиксации (см. _finish_transaction).
+        """
+        stale = set()
+        for student_id, name in added:
+            if not self.name_index.add(student_id, name):
+                stale.add(self.name_index)
+        for student_id in removed:
+            if not self.name_index.remove(student_id):
+                stale.add(self.name_index)
+        for course, delta in (courses or {}).items():
+            if delta > 0:
+                counted = self.student_counts.add(course, delta)
+            elif delta < 0:
+                counted = self.student_counts.remove(course, -delta)
+            else:
+                continue
+            if not counted:
+                stale.add(self.student_counts)
+        if stale and self.in_transaction():
+            self._local.stale_indexes.update(stale)
+
+    def begin_transaction(self):
+        """Начало общей транзакции: последующие операции потока идут через одно
+        соединение и не фиксируются по отдельности"""
+        if self.in_transaction():
+            return
+        conn = self.pool.acquire()
+        try:
+            conn.start_transaction()
+        except BaseException:
+            self.pool.release(conn)
+            raise
+        self._local.conn = conn
+        self._local.pending_keys = set()
+        self._local.stale_indexes = set()
+
+    def commit_transaction(self):
+        """Фиксация общей транзакции и возврат соединения в пул"""
+        self._finish_transaction(commit=True)
+
+    def rollback_transaction(self):
+        """Откат общей транзакции и возврат соединения в пул"""
+        self._finish_transaction(commit=False)
+
+    def _finish_transaction(self, commit):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        try:
+            if commit:
+                conn.commit()
+            else:
+                conn.rollback()
+        finally:
+            self._local.conn = None
+            self.pool.release(conn)
+            if not commit:
+                # Откаченные занятия и студенты могли попасть в индексы в памяти
+                self.timetable.loaded = False
+                self.name_index.invalidate()
+                self.student_counts.invalidate()
+            else:
+                for index in self._local.stale_indexes:
+                    index.invalidate()
+            # Чтения внутри транзакции могли закэшировать незафиксированные данные
+            self.cache.invalidate(*self._local.pending_keys)
+
+    @contextmanager
+    def transaction(self):
+        """Контекстный менеджер общей транзакции"""
+        self.begin_transaction()
+        try:
+            yield
+        except BaseException:
+            self.rollback_transaction()
+            raise
+        self.commit_transaction()
+
+    def cache_stats(self):
+        """Статистика кэша: попадания, промахи, размер"""
+        return self.cache.stats()
+
+    def enable_instrumentation(self, slow_query_ms=None, slow_log_path=None):
+        """Включение сбора статистики по методам
+
+        Обертки ставятся на экземпляр только при включении, поэтому
+        в выключенном состоянии накладных расходов нет совсем.
+        """
+        self.disable_instrumentation()
+        self.instrumentation = Instrumentation(slow_query_ms, slow_log_path)
+        for name in INSTRUMENTED_METHODS:
+            setattr(self, name, self.instrumentation.wrap(name, getattr(self, name)))
+
+    def disable_instrumentation(self):
+        """Выключение сбора статистики и снятие оберток"""
+        if self.instrumentation is None:
+            return
+        for name in INSTRUMENTED_METHODS:
+            self.__dict__.pop(name, None)
+        self.instrumentation = None
+
+    def stats_snapshot(self):
+        """Снимок статистики по методам и кэшу (None, если сбор выключен)"""
+        if self.instrumentation is None:
+            return None
+        snapshot = self.instrumentation.snapshot()
+        snapshot['cache'] = self.cache.stats()
+        if self.statements is not None:
+            snapshot['statements'] = self.statements.stats()
+        return snapshot
+
     def close_connection(self):
-        """Закрытие соединения с базой данных"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """Закрытие всех соединений пула"""
+        if self.pool:
+            self.pool.close()
+            self.pool = None
             print("🔌 Соединение закрыто")
 
 
+def report_bulk_delete(ids, found, message):
+    """Вывод итога массового удаления; словарь ID -> удален ли"""
+    results = {item_id: item_id in found for item_id in ids}
+    missing = [item_id for item_id, deleted in results.items() if not deleted]
+    print(f"✅ {message}: {len(found)}")
+    if missing:
+        shown = ', '.join(str(item_id) for item_id in missing[:10])
+        print(f"⚠️ Не найдено: {len(missing)} (ID: {shown}{', ...' if len(missing) > 10 else ''})")
+    return results
+
+
+def parse_id_list(tokens):
+    """Список ID из аргументов команды: отдельные числа и диапазоны вида 9-120
+
+    Диапазон разворачивается в список, поэтому его длина ограничена MAX_ID_RANGE.
+    """
+    ids = []
+    for token in tokens:
+        for item in token.split(','):
+            if not item:
+                continue
+            first, dash, last = item.partition('-')
+            try:
+                first = int(first)
+                last = int(last) if dash else first
+            except ValueError:
+                raise ValueError(f"некорректный ID или диапазон: {item}")
+            if last < first:
+                raise ValueError(f"диапазон {item} задан в обратном порядке")
+            if last - first >= MAX_ID_RANGE:
+                raise ValueError(f"диапазон {item} длиннее {MAX_ID_RANGE} ID")
+            ids.extend(range(first, last + 1))
+    return ids
+
+
+def cache_key(value):
+    """Приведение ID или номера курса к int, чтобы '3' и 3 давали один ключ кэша"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def keyset_condition(columns, values):
+    """SQL-условие "строка идет после values" при сортировке по columns
+
+    Условие раскрыто в виде (a > x) OR (a = x AND b > y) OR ..., чтобы
+    MySQL мог использовать диапазонный поиск по индексу.
+    """
+    if len(values) != len(columns):
+        raise ValueError(f"ключ страницы должен содержать {len(columns)} значения: {', '.join(columns)}")
+
+    clauses = []
+    params = []
+    for i, column in enumerate(columns):
+        terms = [f"{prev} = %s" for prev in columns[:i]] + [f"{column} > %s"]
+        clauses.append("(" + " AND ".join(terms) + ")")
+        params.extend(values[:i + 1])
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def page_key(row, columns):
+    """Ключ строки для параметра after следующей страницы"""
+    return tuple(row[column] for column in columns)
+
+
+def render_fetch_limit(output):
+    """Сколько строк запрашивать для вывода в output: на одну больше
+    ограничения, чтобы рендерер увидел, что результат обрезан"""
+    limit = output.row_limit()
+    return None if limit is None else limit + 1
+
+
+def parse_page_args(tokens, key_size):
+    """Разбор хвоста команды: [after <v1,v2,...>] [limit N]
+
+    Значения ключа разделяются запятыми; первое может содержать пробелы
+    (например, имя студента). Возвращает (after, limit).
+    """
+    after = None
+    limit = None
+    lowered = [token.lower() for token in tokens]
+
+    if 'limit' in lowered:
+        i = lowered.index('limit')
+        if i != len(tokens) - 2:
+            raise ValueError("после limit должно идти число")
+        limit = int(tokens[i + 1])
+        if limit <= 0:
+            raise ValueError("limit должен быть положительным")
+        tokens = tokens[:i]
+        lowered = lowered[:i]
+
+    if tokens:
+        if lowered[0] != 'after' or len(tokens) < 2:
+            raise ValueError("ожидается after <ключ> и/или limit <N>")
+        values = ' '.join(tokens[1:]).rsplit(',', key_size - 1)
+        if len(values) != key_size:
+            raise ValueError(f"ключ after должен содержать {key_size} значения через запятую")
+        after = tuple(values[:-1]) + (int(values[-1]),)
+
+    return after, limit
+
+
+def detect_delimiter(file, sample_size=SNIFF_SAMPLE_SIZE):
+    """Определение разделителя CSV по небольшому фрагменту в начале файла"""
+    sample = file.read(sample_size)
+    file.seek(0)
+
+    # Отбрасываем последнюю, возможно обрезанную, строку фрагмента
+    if '\n' in sample:
+        sample = sample[:sample.rindex('\n')]
+
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        # Sniffer не справился - берем самый частый кандидат в первой строке
+        first_line = sample.split('\n', 1)[0]
+        return max(CSV_DELIMITERS, key=first_line.count)
+
+
+def parse_csv_rows(file, delimiter):
+    """Разбор CSV: выдает пары (номер строки, поля), пропуская пустые строки"""
+    for row_num, row in enumerate(csv.reader(file, delimiter=delimiter), 1):
+        if row:
+            yield row_num, row
+
+
+def validate_student_rows(rows, rejected):
+    """Проверка строк студентов: выдает кортежи (id, имя, курс)
+
+    Отклоненные строки не пропадают молча - их количество
+    накапливается в rejected по причинам отказа.
+    """
+    for row_num, row in rows:
+        if len(row) < 3:
+            rejected['неполная строка'] += 1
+            continue
+
+        try:
+            student_id = int(row[0].strip())
+        except ValueError:
+            rejected['некорректный ID'] += 1
+            continue
+
+        name = row[1].strip()
+        if not name:
+            rejected['пустое имя'] += 1
+            continue
+
+        try:
+            course_number = int(row[2].strip())
+        except ValueError:
+            rejected['некорректный номер курса'] += 1
+            continue
+
+        if not (1 <= course_number <= 8):
+            rejected['курс вне диапазона 1-8'] += 1
+            continue
+
+        yield student_id, name, course_number
+
+
+def batched(items, size):
+    """Группировка потока элементов в списки по size штук"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def csv_fingerprint(path, digest=None):
+    """Отпечаток файла: путь, размер, время изменения и SHA-256 содержимого
+
+    Если передан прежний отпечаток того же файла с теми же размером
+    и временем изменения, файл не перечитывается.
+    """
+    stat = os.stat(path)
+    prefix = f"{os.path.abspath(path)}\t{stat.st_size}\t{stat.st_mtime_ns}\t"
+    if digest is not None and digest.startswith(prefix):
+        return digest
+
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            sha256.update(block)
+    return prefix + sha256.hexdigest()
+
+
+def csv_unchanged(path, stored):
+    """Текущий отпечаток файла, если содержимое совпадает с отпечатком stored
+    из app_metadata, иначе None
+
+    Размер и время изменения сравниваются сразу; содержимое хешируется
+    только если время изменения другое (файл могли сохранить без правок).
+    В этом случае возвращенный отпечаток отличается от stored, и его стоит
+    сохранить, чтобы при следующем запуске файл снова не хешировался.
+    """
+    if not stored or not os.path.exists(path):
+        return None
+    stored_path, stored_size = stored.split('\t')[:2]
+    if stored_path != os.path.abspath(path) or int(stored_size) != os.path.getsize(path):
+        return None
+    fingerprint = csv_fingerprint(path, stored)
+    if fingerprint.rsplit('\t', 1)[-1] != stored.rsplit('\t', 1)[-1]:
+        return None
+    return fingerprint
+
+
+def insert_students_batch(backend, cursor, batch, rejected):
+    """Вставка пачки студентов одним многострочным INSERT
+
+    Если пачка отклонена сервером (например, из-за дубликата ID),
+    она повторяется построчно, чтобы не потерять корректные строки.
+    Причины отказа по отдельным строкам учитываются в rejected.
+    Возвращает список вставленных строк.
+    """
+    if len(batch) > 1:
+        # Без точки сохранения строки до ошибки остались бы вставленными
+        # и при построчном повторе считались бы дубликатами
+        savepoint = not backend.atomic_executemany
+        try:
+            if savepoint:
+                cursor.execute("SAVEPOINT students_batch")
+            cursor.executemany(
+                "INSERT INTO students (id, name, course_number) VALUES (%s, %s, %s)",
+                batch
+            )
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT students_batch")
+            return batch
+        except Error:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT students_batch")
+                cursor.execute("RELEASE SAVEPOINT students_batch")
+
+    inserted = []
+    for row in batch:
+        try:
+            cursor.execute(
+                "INSERT INTO students (id, name, course_number) VALUES (%s, %s, %s)",
+                row
+            )
+            inserted.append(row)
+        except Error as e:
+            if backend.is_duplicate_key(e):
+                rejected['дубликат ID'] += 1
+            else:
+                rejected['ошибка БД'] += 1
+    return inserted
+
+
+def csv_chunk_ranges(path, chunks):
+    """Разбиение файла на диапазоны байтов [start, end), начинающиеся с новой строки"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as file:
+        for number in range(1, chunks):
+            target = max(size * number // chunks, bounds[-1])
+            if target == 0:
+                continue
+            # Граница - начало первой строки после байта target - 1
+            file.seek(target - 1)
+            file.readline()
+            bounds.append(min(file.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def read_csv_chunk(path, start, end):
+    """Строки файла из диапазона байтов [start, end)"""
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = end - start
+        for line in file:
+            yield line.decode('utf-8')
+            remaining -= len(line)
+            if remaining <= 0:
+                break
+
+
+def chunk_students(path, start, end, delimiter, rejected):
+    """Проверенные строки студентов из куска файла"""
+    rows = validate_student_rows(parse_csv_rows(read_csv_chunk(path, start, end), delimiter), rejected)
+    for row in rows:
+        if -MAX_STUDENT_ID <= row[0] <= MAX_STUDENT_ID:
+            yield row
+        else:
+            rejected['некорректный ID'] += 1
+
+
+def scan_csv_chunk(path, start, end, delimiter):
+    """Первый проход по куску (в процессе-воркере): ID корректных строк по порядку"""
+    rejected = Counter()
+    ids = array('q', (row[0] for row in chunk_students(path, start, end, delimiter, rejected)))
+    return ids, rejected
+
+
+def find_duplicate_rows(chunk_ids):
+    """Номера строк с повторными ID внутри каждого куска
+
+    Куски просматриваются в порядке файла, первое вхождение ID остается,
+    поэтому результат не зависит от того, какой процесс закончил раньше.
+    """
+    low = min((min(ids) for ids in chunk_ids if ids), default=0)
+    high = max((max(ids) for ids in chunk_ids if ids), default=0)
+    if low >= 0 and high < DEDUP_BITMAP_LIMIT:
+        seen = bytearray(high + 1)
+    else:
+        seen = None
+        seen_ids = set()
+
+    duplicates = []
+    for ids in chunk_ids:
+        skip = set()
+        for index, student_id in enumerate(ids):
+            if seen is not None:
+                if seen[student_id]:
+                    skip.add(index)
+                seen[student_id] = 1
+            elif student_id in seen_ids:
+                skip.add(index)
+            else:
+                seen_ids.add(student_id)
+        duplicates.append(skip)
+    return duplicates
+
+
+def load_csv_chunk(backend, path, start, end, delimiter, skip, batch_size):
+    """Второй проход по куску (в процессе-воркере): загрузка через свое соединение
+
+    Кусок фиксируется одной транзакцией. Возвращает
+    (вставленные строки, причины отказа, секунды, pid).
+    """
+    started = time.perf_counter()
+    rejected = Counter()
+    rows = (
+        row for index, row in enumerate(chunk_students(path, start, end, delimiter, Counter()))
+        if index not in skip
+    )
+    inserted = []
+    conn = backend.connect()
+    try:
+        conn.start_transaction()
+        cursor = conn.cursor()
+        for batch in batched(rows, batch_size):
+            inserted.extend(insert_students_batch(backend, cursor, batch, rejected))
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    return inserted, rejected, time.perf_counter() - started, os.getpid()
+
+
 def get_mysql_credentials():
     """Получение данных для подключения к MySQL"""
     print("🔧 Настройка подключения к MySQL")
@@ -275,23 +1963,6 @@ def get_mysql_credentials():
     return host, user, password
 
 
-def test_mysql_connection(host, user, password):
-    """Тестирование подключения к MySQL"""
-    try:
-        conn = mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password
-        )
-        if conn.is_connected():
-            print("✅ Подключение к MySQL успешно!")
-            conn.close()
-            return True
-    except Error as e:
-        print(f"❌ Ошибка подключения: {e}")
-        return False
-
-
 def create_sample_csv():
     """Создание примера CSV файла"""
     sample_data = """1	Bennie Hodkiewicz	1
@@ -309,29 +1980,438 @@ def create_sample_csv():
     print("✅ Пример файла students.csv создан")
 
 
+def print_help():
+    """Вывод списка команд"""
+    print("\n" + "=" * 60)
+    print("Доступные команды:")
+    print("GET student <id>          - студент по ID")
+    print("GET discipline <курс>     - занятия по курсу")
+    print("GET students <курс>       - студенты по курсу")
+    print("GET disciplines           - все занятия")
+    print("GET students <курс> [after <имя,id>] [limit N]      - студенты постранично")
+    print("GET disciplines [after <курс,день,пара,id>] [limit N] - занятия постранично")
+    print("GET free <курс>           - свободные слоты расписания курса")
+    print("GET cache                 - статистика кэша")
+    print("FIND student <текст> [limit N] - поиск студентов по началу имени или неточный")
+    print("PUT student <имя> <курс>  - добавить студента")
+    print("PUT discipline <название> <день> <пара> <курс> - добавить занятие")
+    print("DELETE student <id>       - удалить студента")
+    print("DELETE discipline <id>    - удалить занятие")
+    print("DELETE students <id|от-до> ...    - удалить студентов одной транзакцией")
+    print("DELETE disciplines <id|от-до> ... - удалить занятия одной транзакцией")
+    print("EXPORT students|disciplines <файл> [csv|jsonl|col] - выгрузка в файл")
+    print("STATS [on [порог_мс] | off | reset] - статистика запросов")
+    print("STATS course <курс>       - число студентов и занятий курса по дням")
+    print(f"GET ... as <формат>       - вывод одной команды в формате {'|'.join(OUTPUT_FORMATS)}")
+    print("FORMAT <формат>           - формат вывода для всех команд")
+    print("MAXROWS <N|off>           - ограничение числа строк в терминале")
+    print("exit                      - выход")
+    print("=" * 60)
+
+
+def student_line(student):
+    return f"🎓 {student['name']} (ID: {student['id']})"
+
+
+def discipline_line(disc):
+    return f"📚 {disc['discipline_name']} - {disc['day_of_week']} пара {disc['lesson_number']} (курс {disc['course_number']})"
+
+
+def execute_command(db, command, output=None):
+    """Выполнение одной команды GET/PUT/DELETE
+
+    Строки результатов GET и FIND выводятся через output (OutputRenderer);
+    формат можно задать для одной команды суффиксом "as <формат>".
+    Возвращает True, если команда распознана и выполнена без ошибок.
+    """
+    output = output or OutputRenderer()
+    parts = command.split()
+    if parts and parts[0].upper() == 'STATS':
+        return execute_stats_command(db, parts[1:])
+    if parts and parts[0].upper() in ('FORMAT', 'MAXROWS'):
+        return execute_output_command(output, parts)
+
+    if len(parts) < 2:
+        print("❌ Неверный формат")
+        return False
+
+    action = parts[0].upper()
+    fmt = None
+    if action in ('GET', 'FIND') and len(parts) >= 4 and parts[-2].lower() == 'as':
+        fmt = parts[-1].lower()
+        if fmt not in OUTPUT_FORMATS:
+            print(f"❌ Неизвестный формат вывода '{fmt}' (доступны: {', '.join(OUTPUT_FORMATS)})")
+            return False
+        parts = parts[:-2]
+
+    if action == 'EXPORT':
+        if len(parts) in (3, 4) and parts[1].lower() in EXPORT_COLUMNS:
+            fmt = parts[3].lower() if len(parts) == 4 else 'csv'
+            started = time.perf_counter()
+            exported = db.export_table(parts[1].lower(), parts[2], fmt)
+            if exported is None:
+                return False
+            elapsed = time.perf_counter() - started
+            rate = exported / elapsed if elapsed > 0 else 0.0
+            print(f"✅ Экспортировано {exported} строк в {parts[2]} ({elapsed:.2f} с, {rate:.0f} строк/с)")
+            return True
+        print("❌ Неверный формат EXPORT команды")
+        print(f"Пример: EXPORT students students.jsonl jsonl (форматы: {', '.join(EXPORT_FORMATS)})")
+        return False
+
+    if action == 'GET':
+
+        if parts[1].lower() == 'student' and len(parts) == 3:
+            student = db.get_student(parts[2])
+            if student is False:
+                return False
+            if student:
+                output.render([student], lambda row: f"🎓 ID: {row['id']}, Имя: {row['name']}, "
+                                                     f"Курс: {row['course_number']}", fmt)
+            else:
+                output.note("❌ Студент не найден", fmt)
+            return True
+
+        elif parts[1].lower() == 'discipline' and len(parts) == 3:
+            disciplines = db.get_disciplines_by_course(parts[2])
+            if disciplines is None:
+                return False
+            output.render(disciplines, lambda disc: f"📚 {disc['discipline_name']} "
+                                                    f"({disc['day_of_week']}, пара {disc['lesson_number']})", fmt)
+            return True
+
+        elif parts[1].lower() == 'students' and len(parts) == 3:
+            output.render(db.iter_students_by_course(parts[2], limit=render_fetch_limit(output)),
+                          student_line, fmt)
+            return True
+
+        elif parts[1].lower() == 'students' and len(parts) > 3:
+            after, limit = parse_page_args(parts[3:], len(STUDENT_PAGE_KEY))
+            students = db.get_students_by_course(parts[2], after=after, limit=limit)
+            if students is None:
+                return False
+            output.render(students, student_line, fmt)
+            if limit and len(students) == limit:
+                next_after = ','.join(map(str, page_key(students[-1], STUDENT_PAGE_KEY)))
+                output.note(f"➡️ Следующая страница: GET students {parts[2]} after {next_after} limit {limit}", fmt)
+            return True
+
+        elif parts[1].lower() == 'disciplines' and len(parts) == 2:
+            output.render(db.iter_all_disciplines(limit=render_fetch_limit(output)), discipline_line, fmt)
+            return True
+
+        elif parts[1].lower() == 'disciplines' and len(parts) > 2:
+            after, limit = parse_page_args(parts[2:], len(DISCIPLINE_PAGE_KEY))
+            disciplines = db.get_all_disciplines(after=after, limit=limit)
+            if disciplines is None:
+                return False
+            output.render(disciplines, discipline_line, fmt)
+            if limit and len(disciplines) == limit:
+                next_after = ','.join(map(str, page_key(disciplines[-1], DISCIPLINE_PAGE_KEY)))
+                output.note(f"➡️ Следующая страница: GET disciplines after {next_after} limit {limit}", fmt)
+            return True
+
+        elif parts[1].lower() == 'free' and len(parts) == 3:
+            slots = db.get_free_slots(parts[2])
+            if slots is None:
+                return False
+            print(f"🗓️ Свободных слотов у курса {parts[2]}: {len(slots)}")
+            for day in DAYS_OF_WEEK:
+                lessons = [str(lesson) for slot_day, lesson in slots if slot_day == day]
+                if lessons:
+                    print(f"   {day}: пары {', '.join(lessons)}")
+            return True
+
+        elif parts[1].lower() == 'cache' and len(parts) == 2:
+            stats = db.cache_stats()
+            print(f"🗃️ Кэш: попаданий {stats['hits']}, промахов {stats['misses']}, "
+                  f"доля попаданий {stats['hit_rate']:.0%}, записей {stats['size']}/{stats['max_size']}")
+            return True
+
+    elif action == 'FIND':
+        limit = DEFAULT_FIND_LIMIT
+        if len(parts) >= 5 and parts[-2].lower() == 'limit':
+            try:
+                limit = int(parts[-1])
+            except ValueError:
+                print("❌ После limit должно идти число")
+                return False
+            parts = parts[:-2]
+
+        if parts[1].lower() == 'student' and len(parts) >= 3:
+            students = db.find_students(' '.join(parts[2:]), limit)
+            if students is None:
+                return False
+            if students:
+                output.render(students, lambda row: f"🎓 {row['name']} (ID: {row['id']}, "
+                                                    f"курс {row['course_number']})", fmt)
+            else:
+                output.note("❌ Студенты не найдены", fmt)
+            return True
+
+    elif action == 'PUT':
+        if parts[1].lower() == 'student' and len(parts) >= 4:
+            name = ' '.join(parts[2:-1])
+            course = parts[-1]
+            return db.add_student(name, course)
+
+        elif parts[1].lower() == 'discipline' and len(parts) >= 6:
+            discipline_name = ' '.join(parts[2:-3])
+            day = parts[-3]
+            lesson = parts[-2]
+            course = parts[-1]
+            return db.add_discipline(discipline_name, day, lesson, course)
+
+    elif action == 'DELETE':
+        if parts[1].lower() == 'student' and len(parts) == 3:
+            return db.delete_student(parts[2])
+
+        elif parts[1].lower() == 'discipline' and len(parts) == 3:
+            return db.delete_discipline(parts[2])
+
+        elif parts[1].lower() in ('students', 'disciplines') and len(parts) >= 3:
+            try:
+                ids = parse_id_list(parts[2:])
+            except ValueError as e:
+                print(f"❌ Ошибка: {e}")
+                return False
+            if parts[1].lower() == 'students':
+                return db.delete_students(ids) is not None
+            return db.delete_disciplines(ids) is not None
+
+    else:
+        print("❌ Неизвестная команда")
+        return False
+
+    print(f"❌ Неверный формат {action} команды")
+    return False
+
+
+def execute_output_command(output, parts):
+    """Команды FORMAT <формат> и MAXROWS <N|off>"""
+    command = parts[0].upper()
+    if len(parts) != 2:
+        print(f"❌ Неверный формат {command} команды")
+        return False
+
+    value = parts[1].lower()
+    if command == 'FORMAT':
+        if value not in OUTPUT_FORMATS:
+            print(f"❌ Неизвестный формат вывода '{value}' (доступны: {', '.join(OUTPUT_FORMATS)})")
+            return False
+        output.fmt = value
+        print(f"✅ Формат вывода: {value}")
+        return True
+
+    if value == 'off':
+        output.max_rows = None
+        print("✅ Ограничение числа строк снято")
+        return True
+    try:
+        output.max_rows = int(value)
+    except ValueError:
+        print("❌ MAXROWS ожидает число строк или off")
+        return False
+    print(f"✅ В терминал выводится не больше {output.max_rows} строк")
+    return True
+
+
+def execute_stats_command(db, args):
+    """Команда STATS [on [порог_мс] | off | reset] и STATS course <курс>"""
+    sub = args[0].lower() if args else ''
+
+    if sub == 'course' and len(args) == 2:
+        stats = db.get_course_stats(args[1])
+        if stats is None:
+            return False
+        print(f"📊 Курс {stats['course_number']}: студентов {stats['students']}, занятий {stats['lessons']}")
+        for day, lessons in stats['lessons_by_day'].items():
+            if lessons:
+                print(f"   {day}: {lessons}")
+        return True
+
+    if sub == 'on' and len(args) <= 2:
+        slow_query_ms = None
+        if len(args) == 2:
+            try:
+                slow_query_ms = float(args[1])
+            except ValueError:
+                print("❌ Порог медленных запросов должен быть числом (мс)")
+                return False
+        db.enable_instrumentation(slow_query_ms=slow_query_ms)
+        print("✅ Сбор статистики включен")
+        return True
+
+    elif sub == 'off' and len(args) == 1:
+        db.disable_instrumentation()
+        print("✅ Сбор статистики выключен")
+        return True
+
+    elif sub == 'reset' and len(args) == 1:
+        if db.instrumentation is not None:
+            db.instrumentation.reset()
+        print("✅ Статистика обнулена")
+        return True
+
+    elif not args:
+        snapshot = db.stats_snapshot()
+        if snapshot is None:
+            print("⚠️ Сбор статистики выключен (включите: STATS on [порог_мс])")
+        else:
+            print(format_stats(snapshot))
+        return True
+
+    print("❌ Неверный формат STATS команды")
+    return False
+
+
+def run_script(db, lines, commit_interval=DEFAULT_COMMIT_INTERVAL, output=None):
+    """Неинтерактивное выполнение команд из файла или stdin
+
+    Подряд идущие PUT/DELETE выполняются в одной транзакции, которая
+    фиксируется каждые commit_interval записей и перед любой командой чтения.
+    Пустые строки и строки, начинающиеся с '#', пропускаются.
+    """
+    stats = Counter()
+    pending_writes = 0
+    started = time.perf_counter()
+
+    try:
+        for line_num, line in enumerate(lines, 1):
+            command = line.strip()
+            if not command or command.startswith('#'):
+                continue
+            if command.lower() == 'exit':
+                break
+
+            is_write = command.split(maxsplit=1)[0].upper() in WRITE_ACTIONS
+            if is_write:
+                db.begin_transaction()
+            elif db.in_transaction():
+                db.commit_transaction()
+                stats['commits'] += 1
+                pending_writes = 0
+
+            try:
+                ok = execute_command(db, command, output)
+            except Exception as e:
+                print(f"❌ Ошибка: {e}")
+                ok = False
+
+            stats['commands'] += 1
+            stats['writes' if is_write else 'reads'] += 1
+            if not ok:
+                stats['failures'] += 1
+                print(f"⚠️ Строка {line_num}: команда не выполнена - {command}")
+
+            if is_write:
+                pending_writes += 1
+                if pending_writes >= commit_interval:
+                    db.commit_transaction()
+                    stats['commits'] += 1
+                    pending_writes = 0
+
+        if db.in_transaction():
+            db.commit_transaction()
+            stats['commits'] += 1
+
+    except BaseException:
+        # Незафиксированный хвост откатывается, уже зафиксированные пачки остаются
+        db.rollback_transaction()
+        raise
+
+    finally:
+        elapsed = time.perf_counter() - started
+        rate = stats['commands'] / elapsed if elapsed > 0 else 0.0
+        print("\n" + "=" * 60)
+        print(f"📊 Выполнено команд: {stats['commands']} "
+              f"(записей: {stats['writes']}, чтений: {stats['reads']})")
+        print(f"   Ошибок: {stats['failures']}, коммитов: {stats['commits']}")
+        print(f"   Время: {elapsed:.2f} с, {rate:.0f} команд/с")
+        print("=" * 60)
+
+    return stats
+
+
+def parse_args(argv=None):
+    """Разбор аргументов командной строки"""
+    parser = argparse.ArgumentParser(description="Университетская база данных")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='mysql',
+                        help="хранилище: сервер MySQL или встроенная SQLite")
+    parser.add_argument('--sqlite-path', default='study.db',
+                        help="файл базы SQLite (':memory:' - в памяти)")
+    parser.add_argument('--host', help="хост MySQL (по умолчанию localhost)")
+    parser.add_argument('--user', help="пользователь MySQL (по умолчанию root)")
+    parser.add_argument('--password', help="пароль MySQL")
+    parser.add_argument('--script', metavar='FILE',
+                        help="выполнить команды из файла ('-' - из stdin) и выйти")
+    parser.add_argument('--commit-interval', type=int, default=DEFAULT_COMMIT_INTERVAL,
+                        help="сколько записей фиксировать одной транзакцией в режиме --script")
+    parser.add_argument('--incremental-import', action='store_true',
+                        help="при запуске применять к таблице только отличия students.csv")
+    parser.add_argument('--reimport', action='store_true',
+                        help="импортировать students.csv, даже если он не изменился")
+    parser.add_argument('--import-workers', type=int, default=1,
+                        help="число процессов для импорта students.csv (0 - по числу ядер)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='text',
+                        help="формат вывода строк результатов")
+    parser.add_argument('--max-rows', type=int, default=DEFAULT_MAX_ROWS,
+                        help="не больше строк на команду при выводе в терминал (0 - без ограничения)")
+    parser.add_argument('--no-pager', action='store_true',
+                        help="не открывать пейджер для длинных результатов")
+    parser.add_argument('--dict-rows', action='store_true',
+                        help="возвращать строки словарями вместо компактных записей")
+    parser.add_argument('--no-prepared', action='store_true',
+                        help="не использовать подготовленные запросы на горячих путях")
+    parser.add_argument('--stats', action='store_true',
+                        help="собирать статистику запросов с запуска (команда STATS)")
+    parser.add_argument('--slow-query-ms', type=float,
+                        help="порог журнала медленных запросов, мс (включает --stats)")
+    parser.add_argument('--slow-log', metavar='FILE',
+                        help="файл журнала медленных запросов")
+    return parser.parse_args(argv)
+
+
 def main():
     """Основная функция"""
+    args = parse_args()
+
     print("🎓 Университетская база данных")
     print("=" * 40)
 
-    # Получаем данные для подключения
-    host, user, password = get_mysql_credentials()
-
-    # Тестируем подключение
-    if not test_mysql_connection(host, user, password):
-        print("\n❌ Не удалось подключиться к MySQL")
-        print("Проверьте:")
-        print("1. Запущен ли MySQL сервер")
-        print("2. Правильность логина и пароля")
+    db = UniversityDB(prepared_statements=not args.no_prepared, dict_rows=args.dict_rows)
+    output = OutputRenderer(args.format, max_rows=args.max_rows or None, pager=not args.no_pager)
+
+    if args.backend == 'sqlite':
+        backend = SQLiteBackend(args.sqlite_path)
+    else:
+        # Получаем данные для подключения: в режиме скрипта или при заданных
+        # аргументах не спрашиваем, чтобы не читать stdin
+        if args.script or args.host or args.user or args.password is not None:
+            host = args.host or 'localhost'
+            user = args.user or 'root'
+            password = args.password or ''
+        else:
+            host, user, password = get_mysql_credentials()
+        backend = MySQLBackend(host, user, password)
+
+    # Подключаемся к базе данных: остальные соединения пула откроются по мере надобности
+    if not db.connect(backend, prewarm=False):
+        if args.backend == 'mysql':
+            print("\n❌ Не удалось подключиться к MySQL")
+            print("Проверьте:")
+            print("1. Запущен ли MySQL сервер")
+            print("2. Правильность логина и пароля")
         return
 
-    # Создаем и подключаем базу данных
-    db = UniversityDB()
-    if not db.connect_to_db(host, user, password):
-        return
+    if args.stats or args.slow_query_ms is not None:
+        db.enable_instrumentation(args.slow_query_ms, args.slow_log)
 
-    # Создаем таблицы
-    if not db.create_tables():
+    # Быстрый старт: схема и students.csv не менялись с прошлого запуска
+    metadata = db.load_metadata()
+    if metadata.get(SCHEMA_VERSION_KEY) == str(backend.schema_version):
+        print(f"⚡ Схема БД актуальна (версия {backend.schema_version})")
+    elif not db.create_tables():
         return
 
     # Создаем пример CSV файла если его нет
@@ -339,20 +2419,31 @@ def main():
         create_sample_csv()
 
     # Импортируем данные
-    db.import_students_from_csv()
+    fingerprint = None if args.reimport else csv_unchanged('students.csv', metadata.get(STUDENTS_CSV_KEY))
+    if fingerprint:
+        print("⚡ students.csv не изменился с прошлого импорта - импорт пропущен")
+        if fingerprint != metadata.get(STUDENTS_CSV_KEY):
+            # Файл сохранили без правок: новое время изменения, чтобы не хешировать его снова
+            db.save_metadata(STUDENTS_CSV_KEY, fingerprint)
+    elif args.import_workers != 1 and not args.incremental_import:
+        db.import_students_parallel(workers=args.import_workers or None)
+    else:
+        db.import_students_from_csv(bulk=True, incremental=args.incremental_import)
+
+    if args.script:
+        # Скрипт выполняется без пейджера и ограничения числа строк
+        script_output = OutputRenderer(args.format, pager=False)
+        try:
+            if args.script == '-':
+                run_script(db, sys.stdin, args.commit_interval, script_output)
+            else:
+                with open(args.script, 'r', encoding='utf-8') as script:
+                    run_script(db, script, args.commit_interval, script_output)
+        finally:
+            db.close_connection()
+        return
 
-    print("\n" + "=" * 60)
-    print("Доступные команды:")
-    print("GET student <id>          - студент по ID")
-    print("GET discipline <курс>     - занятия по курсу")
-    print("GET students <курс>       - студенты по курсу")
-    print("GET disciplines           - все занятия")
-    print("PUT student <имя> <курс>  - добавить студента")
-    print("PUT discipline <название> <день> <пара> <курс> - добавить занятие")
-    print("DELETE student <id>       - удалить студента")
-    print("DELETE discipline <id>    - удалить занятие")
-    print("exit                      - выход")
-    print("=" * 60)
+    print_help()
 
     while True:
         try:
@@ -361,59 +2452,7 @@ def main():
             if command.lower() == 'exit':
                 break
 
-            parts = command.split()
-            if len(parts) < 2:
-                print("❌ Неверный формат")
-                continue
-
-            action = parts[0].upper()
-
-            if action == 'GET':
-                if parts[1].lower() == 'student' and len(parts) == 3:
-                    student = db.get_student(parts[2])
-                    if student:
-                        print(f"🎓 ID: {student['id']}, Имя: {student['name']}, Курс: {student['course_number']}")
-                    else:
-                        print("❌ Студент не найден")
-
-                elif parts[1].lower() == 'discipline' and len(parts) == 3:
-                    disciplines = db.get_disciplines_by_course(parts[2])
-                    for disc in disciplines:
-                        print(f"📚 {disc['discipline_name']} ({disc['day_of_week']}, пара {disc['lesson_number']})")
-
-                elif parts[1].lower() == 'students' and len(parts) == 3:
-                    students = db.get_students_by_course(parts[2])
-                    for student in students:
-                        print(f"🎓 {student['name']} (ID: {student['id']})")
-
-                elif parts[1].lower() == 'disciplines' and len(parts) == 2:
-                    disciplines = db.get_all_disciplines()
-                    for disc in disciplines:
-                        print(
-                            f"📚 {disc['discipline_name']} - {disc['day_of_week']} пара {disc['lesson_number']} (курс {disc['course_number']})")
-
-            elif action == 'PUT':
-                if parts[1].lower() == 'student' and len(parts) >= 4:
-                    name = ' '.join(parts[2:-1])
-                    course = parts[-1]
-                    db.add_student(name, course)
-
-                elif parts[1].lower() == 'discipline' and len(parts) >= 6:
-                    discipline_name = ' '.join(parts[2:-3])
-                    day = parts[-3]
-                    lesson = parts[-2]
-                    course = parts[-1]
-                    db.add_discipline(discipline_name, day, lesson, course)
-
-            elif action == 'DELETE':
-                if parts[1].lower() == 'student' and len(parts) == 3:
-                    db.delete_student(parts[2])
-
-                elif parts[1].lower() == 'discipline' and len(parts) == 3:
-                    db.delete_discipline(parts[2])
-
-            else:
-                print("❌ Неизвестная команда")
+            execute_command(db, command, output)
 
         except KeyboardInterrupt:
             print("\n👋 Выход...")
@@ -425,4 +2464,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,299 @@
+import heapq
+import sys
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+
+# Минимальное сходство слов по триграммам для нечеткого поиска (как в pg_trgm)
+FUZZY_THRESHOLD = 0.3
+
+
+def normalize_name(name):
+    """Ключ поиска: регистр и "ё" не различаются, пробелы схлопываются"""
+    return ' '.join(str(name).casefold().replace('ё', 'е').split())
+
+
+def trigrams(word):
+    """Триграммы слова, как в pg_trgm: слово дополняется "  " слева и " " справа"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _word_suffixes(key):
+    """Хвосты ключа с начала каждого слова: "иван петров" -> "иван петров", "петров" """
+    suffixes = [key]
+    position = key.find(' ')
+    while position != -1:
+        suffixes.append(key[position + 1:])
+        position = key.find(' ', position + 1)
+    return suffixes
+
+
+class NameIndex:
+    """Поисковый индекс имен студентов в памяти
+
+    Префиксный поиск - бинарный поиск (bisect) по отсортированному списку
+    хвостов имен, начинающихся с каждого слова, поэтому "пет" находит
+    и "Петрова Анна", и "Иван Петров". Нечеткий поиск - по триграммам
+    отдельных слов: слово запроса сравнивается со словарем слов имен,
+    которых намного меньше, чем студентов. Одинаковые имена хранятся
+    один раз, со множеством ID.
+
+    Пока индекс загружается (begin_load ... load), добавления и удаления
+    записываются и применяются поверх загруженных строк: они идут по ID,
+    поэтому повтор уже попавшего в выборку изменения ничего не меняет.
+    Счетчик generation растет при каждой замене содержимого и сбросе
+    (invalidate): загрузка, начатая до них, не применяется.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._key_by_id = {}
+        self._suffixes = []
+        self._words = {}
+        self._trigrams = {}
+        self._trigram_counts = {}
+        self._lock = threading.Lock()
+        self._pending = None
+        self.generation = 0
+        self.loaded = False
+
+    def begin_load(self):
+        """Начало загрузки из БД: изменения с этого момента будут применены после load.
+        Возвращает generation для load"""
+        with self._lock:
+            if self._pending is None:
+                self._pending = []
+            return self.generation
+
+    def load(self, rows, generation=None):
+        """Заполнение из пар (id, имя); список хвостов сортируется один раз
+
+        generation - значение begin_load; если индекс с тех пор заменен или
+        сброшен, строки не применяются и возвращается False.
+        """
+        staged = NameIndex()
+        staged.extend(rows)
+        return self.replace(staged, generation)
+
+    def extend(self, rows):
+        """Добавление пар (id, имя) в индекс, который еще не используется
+        для поиска (см. replace): без блокировки и сортировки хвостов"""
+        for student_id, name in rows:
+            key = self._key(name)
+            self._key_by_id[student_id] = key
+            ids = self._ids.get(key)
+            if ids is None:
+                self._ids[key] = {student_id}
+                self._add_words(key)
+            else:
+                ids.add(student_id)
+
+    def replace(self, staged, generation=None):
+        """Замена содержимого индексом staged, заполненным через extend"""
+        suffixes = sorted((suffix, key) for key in staged._ids for suffix in _word_suffixes(key))
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._ids = staged._ids
+            self._key_by_id = staged._key_by_id
+            self._words = staged._words
+            self._trigrams = staged._trigrams
+            self._trigram_counts = staged._trigram_counts
+            self._suffixes = suffixes
+            # Изменения, сделанные во время загрузки, могли не попасть в ее выборку
+            for student_id, key in self._pending or ():
+                if key is None:
+                    self._discard(student_id)
+                else:
+                    self._insert(student_id, key)
+            self._pending = None
+            self.generation += 1
+            self.loaded = True
+            return True
+
+    def invalidate(self):
+        """Сброс: индекс будет заново загружен из БД при следующем поиске"""
+        with self._lock:
+            self._ids = {}
+            self._key_by_id = {}
+            self._suffixes = []
+            self._words = {}
+            self._trigrams = {}
+            self._trigram_counts = {}
+            self._pending = None
+            self.generation += 1
+            self.loaded = False
+
+    @staticmethod
+    def _key(name):
+        # Одна строка-ключ на все одинаковые имена
+        return sys.intern(normalize_name(name))
+
+    def _add_words(self, key):
+        for word in key.split():
+            keys = self._words.get(word)
+            if keys is None:
+                self._words[word] = keys = set()
+                word_trigrams = trigrams(word)
+                self._trigram_counts[word] = len(word_trigrams)
+                for trigram in word_trigrams:
+                    self._trigrams.setdefault(trigram, set()).add(word)
+            keys.add(key)
+
+    def _remove_words(self, key):
+        for word in key.split():
+            keys = self._words.get(word)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if keys:
+                continue
+            del self._words[word]
+            del self._trigram_counts[word]
+            for trigram in trigrams(word):
+                words = self._trigrams.get(trigram)
+                if words is not None:
+                    words.discard(word)
+                    if not words:
+                        del self._trigrams[trigram]
+
+    def add(self, student_id, name):
+        """Добавление студента; False, если индекс не загружен и не загружается"""
+        key = self._key(name)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((student_id, key))
+            if not self.loaded:
+                return self._pending is not None
+            self._insert(student_id, key)
+            return True
+
+    def _insert(self, student_id, key):
+        self._discard(student_id)
+        self._key_by_id[student_id] = key
+        ids = self._ids.get(key)
+        if ids is not None:
+            ids.add(student_id)
+            return
+        self._ids[key] = {student_id}
+        self._add_words(key)
+        for suffix in _word_suffixes(key):
+            insort(self._suffixes, (suffix, key))
+
+    def remove(self, student_id):
+        """Удаление студента; False, если индекс не загружен и не загружается"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((student_id, None))
+            if not self.loaded:
+                return self._pending is not None
+            self._discard(student_id)
+            return True
+
+    def _discard(self, student_id):
+        key = self._key_by_id.pop(student_id, None)
+        if key is None:
+            return False
+        ids = self._ids[key]
+        ids.discard(student_id)
+        if ids:
+            return True
+        # Последний студент с таким именем: имя уходит из индекса целиком
+        del self._ids[key]
+        self._remove_words(key)
+        for suffix in _word_suffixes(key):
+            i = bisect_left(self._suffixes, (suffix, key))
+            if i < len(self._suffixes) and self._suffixes[i] == (suffix, key):
+                del self._suffixes[i]
+        return True
+
+    def search(self, text, limit, fuzzy=True):
+        """ID студентов, чье имя (или слово в нем) начинается с text
+
+        Если совпадений по префиксу меньше limit, список дополняется
+        нечеткими совпадениями в порядке убывания сходства.
+        """
+        query = normalize_name(text)
+        if not query or limit <= 0:
+            return []
+        with self._lock:
+            keys = self._prefix_keys(query, limit)
+            if fuzzy and sum(len(self._ids[key]) for key in keys) < limit:
+                seen = set(keys)
+                # Каждому имени соответствует хотя бы один ID: больше limit новых имен не нужно
+                fuzzy_keys = self._fuzzy_keys(query, limit + len(seen))
+                keys.extend(key for key in fuzzy_keys if key not in seen)
+            result = []
+            for key in keys:
+                result.extend(sorted(self._ids[key]))
+                if len(result) >= limit:
+                    break
+            return result[:limit]
+
+    def _prefix_keys(self, query, limit):
+        keys = {}
+        found = 0
+        suffixes = self._suffixes
+        i = bisect_left(suffixes, (query,))
+        while i < len(suffixes) and found < limit:
+            suffix, key = suffixes[i]
+            if not suffix.startswith(query):
+                break
+            if key not in keys:
+                keys[key] = None
+                found += len(self._ids[key])
+            i += 1
+        return list(keys)
+
+    def _similar_words(self, word):
+        """Слова словаря со сходством с word не ниже FUZZY_THRESHOLD: слово -> сходство"""
+        query_trigrams = trigrams(word)
+        hits = Counter()
+        for trigram in query_trigrams:
+            hits.update(self._trigrams.get(trigram, ()))
+        # Сходство common / |A ∪ B| не больше common / |A|: остальных не проверяем
+        needed = FUZZY_THRESHOLD * len(query_trigrams)
+        counts = self._trigram_counts
+        similar = {}
+        for candidate, common in hits.items():
+            if common < needed:
+                continue
+            similarity = common / (len(query_trigrams) + counts[candidate] - common)
+            if similarity >= FUZZY_THRESHOLD:
+                similar[candidate] = similarity
+        return similar
+
+    def _fuzzy_keys(self, query, count):
+        """Не больше count имен, в которых для каждого слова запроса есть похожее слово"""
+        similar = [self._similar_words(word) for word in query.split()]
+        if not all(similar):
+            return []
+        # Кандидаты - имена с похожими словами для самого редкого слова запроса,
+        # остальные слова проверяются поиском в словарях похожих слов
+        similar.sort(key=lambda words: sum(len(self._words[word]) for word in words))
+        first, rest = similar[0], similar[1:]
+        scores = {}
+        for word, similarity in sorted(first.items(), key=lambda item: -item[1]):
+            # Слова идут по убыванию сходства: если count имен уже набрали больше,
+            # чем может набрать любое имя с этим словом, дальше искать незачем
+            bound = similarity + len(rest)
+            if len(scores) >= count and sum(score > bound for score in scores.values()) >= count:
+                break
+            for key in self._words[word]:
+                if scores.get(key, 0) >= similarity + len(rest):
+                    continue
+                score = similarity
+                for words in rest:
+                    best = max((words.get(key_word, 0) for key_word in key.split()), default=0)
+                    if not best:
+                        break
+                    score += best
+                else:
+                    if score > scores.get(key, 0):
+                        scores[key] = score
+        # Сначала лучшее сходство, при равном - более короткое имя
+        return heapq.nsmallest(count, scores, key=lambda key: (-scores[key], len(key), key))
+
+    def __len__(self):
+        return len(self._key_by_id)
@@ -0,0 +1,206 @@
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+
+# Форматы вывода строк в REPL: text - прежние строки с эмодзи,
+# table - компактная таблица, jsonl и tsv - для обработки программами
+OUTPUT_FORMATS = ('text', 'table', 'jsonl', 'tsv')
+MACHINE_FORMATS = ('jsonl', 'tsv')
+
+# Строк в одной записи в поток вывода
+RENDER_CHUNK_ROWS = 2048
+
+# Ограничение числа строк в интерактивном режиме по умолчанию
+DEFAULT_MAX_ROWS = 1000
+
+DEFAULT_PAGER = 'less -FRX'
+
+# Наибольшая ширина столбца в формате table
+TABLE_MAX_WIDTH = 40
+
+
+def _cell(value):
+    return '' if value is None else str(value)
+
+
+def _fit(value, width):
+    """Значение ячейки, обрезанное до width символов"""
+    text = _cell(value)
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+def _tsv_value(value):
+    return _cell(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+class OutputRenderer:
+    """Вывод результатов команд крупными буферизованными записями
+
+    Строки форматируются порциями по RENDER_CHUNK_ROWS и пишутся в поток
+    одним write на порцию вместо нескольких print на строку. Если вывод
+    идет в терминал, включаются ограничение числа строк (max_rows) и
+    пейджер ($PAGER или less), когда результат не помещается на экран.
+    Сообщения (подсказки, "не найдено") в форматах jsonl и tsv уходят
+    в stderr, чтобы не смешиваться с данными.
+    """
+
+    def __init__(self, fmt='text', max_rows=None, pager=True, out=None):
+        self.fmt = fmt
+        self.max_rows = max_rows
+        self.pager = pager
+        self._out = out
+
+    @property
+    def out(self):
+        # sys.stdout читается при каждом выводе: его могут перенаправить
+        return self._out if self._out is not None else sys.stdout
+
+    def is_interactive(self):
+        try:
+            return self.out.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def row_limit(self):
+        """Сколько строк будет выведено: max_rows в терминале, иначе без ограничения (None)"""
+        return self.max_rows if self.is_interactive() else None
+
+    def note(self, message, fmt=None):
+        """Служебное сообщение вне потока данных"""
+        stream = sys.stderr if (fmt or self.fmt) in MACHINE_FORMATS else self.out
+        stream.write(message + '\n')
+
+    def render(self, rows, text, fmt=None, columns=None):
+        """Вывод строк результата; возвращает число выведенных строк
+
+        text - функция строка -> текст для формата text; columns - порядок
+        столбцов (по умолчанию ключи первой строки). Итератор rows
+        закрывается, если вывод остановлен лимитом или пейджером.
+        """
+        fmt = fmt or self.fmt
+        iterator = iter(rows)
+        limit = self.row_limit()
+        written = 0
+        truncated = False
+        sink = _Sink(self.out, self.pager and self.is_interactive())
+        try:
+            chunk = []
+            format_chunk = None
+            for row in iterator:
+                if limit is not None and written + len(chunk) >= limit:
+                    truncated = True
+                    break
+                chunk.append(row)
+                if len(chunk) >= RENDER_CHUNK_ROWS:
+                    format_chunk = format_chunk or _start(sink, fmt, text, columns, chunk)
+                    sink.write(format_chunk(chunk))
+                    written += len(chunk)
+                    chunk = []
+            if chunk:
+                format_chunk = format_chunk or _start(sink, fmt, text, columns, chunk)
+                sink.write(format_chunk(chunk))
+                written += len(chunk)
+            if truncated:
+                sink.write_note(f"… показаны первые {written} строк (MAXROWS off - без ограничения)\n",
+                                fmt in MACHINE_FORMATS)
+        except BrokenPipeError:
+            # Пейджер закрыт до конца вывода
+            pass
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+            sink.close()
+        return written
+
+
+def _start(sink, fmt, text, columns, sample):
+    """Вывод заголовка формата; возвращает функцию порция строк -> текст"""
+    columns = columns or list(sample[0].keys())
+
+    if fmt == 'jsonl':
+        return lambda chunk: ''.join(
+            json.dumps({column: row[column] for column in columns}, ensure_ascii=False, default=str) + '\n'
+            for row in chunk
+        )
+
+    if fmt == 'tsv':
+        sink.write('\t'.join(columns) + '\n')
+        return lambda chunk: ''.join(
+            '\t'.join(_tsv_value(row[column]) for column in columns) + '\n' for row in chunk
+        )
+
+    if fmt == 'table':
+        # Ширина столбцов - по первой порции (не больше TABLE_MAX_WIDTH), чтобы не держать
+        # весь результат в памяти; более длинные значения следующих порций обрезаются
+        widths = [min(TABLE_MAX_WIDTH, max(len(column), *(len(_cell(row[column])) for row in sample)))
+                  for column in columns]
+        # Последний столбец без выравнивания и обрезки - без хвостовых пробелов
+        line = ''.join('{:<%d}  ' % width for width in widths[:-1]) + '{}\n'
+        sink.write(line.format(*(_fit(column, width) for column, width in zip(columns, widths)))
+                   + '  '.join('-' * width for width in widths) + '\n')
+        return lambda chunk: ''.join(
+            line.format(*(_fit(row[column], width) for column, width in zip(columns[:-1], widths)),
+                        _cell(row[columns[-1]]))
+            for row in chunk
+        )
+
+    return lambda chunk: ''.join(text(row) + '\n' for row in chunk)
+
+
+class _Sink:
+    """Поток вывода, переходящий на пейджер, когда текст не помещается на экран"""
+
+    def __init__(self, out, paged):
+        self._out = out
+        self._pager = None
+        self._held = [] if paged else None
+        self._held_lines = 0
+        self._screen_lines = shutil.get_terminal_size().lines - 1 if paged else 0
+
+    def write(self, text):
+        if self._pager is not None:
+            self._pager.stdin.write(text)
+        elif self._held is not None:
+            self._held.append(text)
+            self._held_lines += text.count('\n')
+            if self._held_lines > self._screen_lines:
+                self._start_pager()
+        else:
+            self._out.write(text)
+
+    def write_note(self, text, to_stderr):
+        if to_stderr:
+            self.close()
+            sys.stderr.write(text)
+        else:
+            self.write(text)
+
+    def _start_pager(self):
+        self._out.flush()
+        command = os.environ.get('PAGER') or DEFAULT_PAGER
+        try:
+            self._pager = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE,
+                                           text=True, encoding='utf-8')
+        except OSError:
+            self._out.write(''.join(self._held))
+            self._held = None
+            return
+        self._pager.stdin.write(''.join(self._held))
+        self._held = None
+
+    def close(self):
+        if self._pager is not None:
+            try:
+                self._pager.stdin.close()
+            except BrokenPipeError:
+                pass
+            self._pager.wait()
+            self._pager = None
+        elif self._held:
+            self._out.write(''.join(self._held))
+        self._held = None
+        self._out.flush()
@@ -0,0 +1,104 @@
+class Row:
+    """Компактная строка результата: значения хранятся в слотах
+
+    Поля доступны как атрибуты (row.name) и, для совместимости с прежними
+    словарями, по ключу (row['name']), через get, keys, values, items
+    и dict(row). Экземпляр без __dict__ занимает в несколько раз меньше
+    памяти, чем словарь с теми же полями.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def values(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.__slots__]
+
+    def as_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            return type(self) is type(other) and self.values() == other.values()
+        if isinstance(other, dict):
+            return self.as_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self):
+        return type(self), tuple(self.values())
+
+
+class StudentRow(Row):
+    """Строка таблицы students"""
+
+    __slots__ = ('id', 'name', 'course_number', 'created_at')
+
+    def __init__(self, id, name, course_number, created_at=None):
+        self.id = id
+        self.name = name
+        self.course_number = course_number
+        self.created_at = created_at
+
+
+class DisciplineRow(Row):
+    """Строка таблицы disciplines"""
+
+    __slots__ = ('id', 'discipline_name', 'day_of_week', 'lesson_number', 'course_number', 'created_at')
+
+    def __init__(self, id, discipline_name, day_of_week, lesson_number, course_number, created_at=None):
+        self.id = id
+        self.discipline_name = discipline_name
+        self.day_of_week = day_of_week
+        self.lesson_number = lesson_number
+        self.course_number = course_number
+        self.created_at = created_at
+
+
+ROW_TYPES = {
+    'students': StudentRow,
+    'disciplines': DisciplineRow,
+}
+
+
+def build_rows(table, rows, as_dict=False):
+    """Строки-кортежи запроса (в порядке столбцов ROW_TYPES[table]) в строки table
+
+    С as_dict=True возвращаются словари, как у курсора dictionary=True.
+    """
+    row_type = ROW_TYPES[table]
+    if as_dict:
+        columns = row_type.__slots__
+        return [dict(zip(columns, row)) for row in rows]
+    return [row_type(*row) for row in rows]
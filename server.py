@@ -0,0 +1,350 @@
+import argparse
+import json
+import os
+import re
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from backends import MySQLBackend, SQLiteBackend
+from main import (DEFAULT_FIND_LIMIT, DISCIPLINE_PAGE_KEY, MAX_STUDENT_ID, SCHEMA_VERSION_KEY,
+                  STUDENT_PAGE_KEY, UniversityDB, page_key, parse_page_args)
+
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 16
+# Простаивающее keep-alive соединение закрывается, чтобы не занимать поток пула
+KEEPALIVE_TIMEOUT = 5
+MAX_BODY_SIZE = 64 * 1024
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTP-сервер, обслуживающий соединения в пуле из workers потоков
+
+    В отличие от ThreadingHTTPServer число потоков ограничено: лишние
+    соединения ждут в очереди пула, а не создают новые потоки.
+    """
+
+    request_queue_size = 128
+
+    def __init__(self, address, handler_class, db, workers=DEFAULT_WORKERS, verbose=False):
+        # Пул создается до bind: при ошибке bind базовый класс вызывает server_close
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http')
+        self.db = db
+        self.verbose = verbose
+        super().__init__(address, handler_class)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+class HTTPError(Exception):
+    """Ответ с кодом ошибки и сообщением"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _row(row):
+    return None if row is None else dict(row)
+
+
+def _rows(rows):
+    """Строки списка для ответа; None (ошибка БД в UniversityDB) - ответ 500"""
+    if rows is None:
+        raise HTTPError(500, "ошибка базы данных")
+    return [dict(row) for row in rows]
+
+
+def _page_args(query, key_size):
+    """Параметры ?after=...&limit=N в формате команд REPL"""
+    tokens = []
+    if 'after' in query:
+        tokens += ['after', query['after'][-1]]
+    if 'limit' in query:
+        tokens += ['limit', query['limit'][-1]]
+    try:
+        return parse_page_args(tokens, key_size)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+
+
+def _path_number(text):
+    """Число из пути (ID или номер курса); вне диапазона BIGINT - ошибка 400"""
+    number = int(text)
+    if number > MAX_STUDENT_ID:
+        raise HTTPError(400, f"число {text} вне допустимого диапазона")
+    return number
+
+
+def _page(rows, key_columns, limit):
+    body = {'items': _rows(rows)}
+    if limit and len(rows) == limit:
+        body['next_after'] = ','.join(map(str, page_key(rows[-1], key_columns)))
+    return body
+
+
+class UniversityRequestHandler(BaseHTTPRequestHandler):
+    """JSON-эндпоинты с теми же операциями, что и команды GET/PUT/DELETE
+
+    GET    /students/{id}
+    GET    /students?q=текст[&limit=N]   - поиск по имени (FIND student)
+    GET    /courses/{n}/students[?after=имя,id&limit=N]
+    GET    /courses/{n}/disciplines
+    GET    /courses/{n}/free
+    GET    /courses/{n}/stats          - число студентов и занятий по дням
+    GET    /disciplines[?after=курс,день,пара,id&limit=N]
+    POST   /students         {"name": ..., "course_number": ...}
+    POST   /disciplines      {"discipline_name", "day_of_week", "lesson_number", "course_number"}
+    DELETE /students/{id}, /disciplines/{id}
+    GET    /stats
+    PUT принимается так же, как POST.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'UniversityDB/1.0'
+    timeout = KEEPALIVE_TIMEOUT
+    # Заголовки и тело уходят отдельными send: без TCP_NODELAY каждый ответ
+    # на keep-alive соединении ждал бы отложенного ACK клиента (~40 мс)
+    disable_nagle_algorithm = True
+
+    routes = [
+        ('GET', re.compile(r'/students/(\d+)'), 'get_student'),
+        ('GET', re.compile(r'/students'), 'find_students'),
+        ('GET', re.compile(r'/courses/(\d+)/students'), 'get_course_students'),
+        ('GET', re.compile(r'/courses/(\d+)/disciplines'), 'get_course_disciplines'),
+        ('GET', re.compile(r'/courses/(\d+)/free'), 'get_free_slots'),
+        ('GET', re.compile(r'/courses/(\d+)/stats'), 'get_course_stats'),
+        ('GET', re.compile(r'/disciplines'), 'get_disciplines'),
+        ('GET', re.compile(r'/stats'), 'get_stats'),
+        ('POST', re.compile(r'/students'), 'add_student'),
+        ('POST', re.compile(r'/disciplines'), 'add_discipline'),
+        ('DELETE', re.compile(r'/students/(\d+)'), 'delete_student'),
+        ('DELETE', re.compile(r'/disciplines/(\d+)'), 'delete_discipline'),
+    ]
+
+    @property
+    def db(self):
+        return self.server.db
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/') or '/'
+        try:
+            allowed = False
+            for route_method, pattern, name in self.routes:
+                match = pattern.fullmatch(path)
+                if match is None:
+                    continue
+                allowed = True
+                if route_method == method:
+                    args = [_path_number(group) for group in match.groups()]
+                    status, body = getattr(self, name)(*args, query=parse_qs(url.query))
+                    break
+            else:
+                raise HTTPError(405 if allowed else 404,
+                                "метод не поддерживается" if allowed else "нет такого адреса")
+        except HTTPError as e:
+            status, body = e.status, {'error': str(e)}
+        except Exception:
+            # Журнал ошибок ведется и без --verbose
+            BaseHTTPRequestHandler.log_message(self, "ошибка при обработке %s %s\n%s",
+                                               method, self.path, traceback.format_exc())
+            status, body = 500, {'error': "внутренняя ошибка сервера"}
+        self._send(status, body)
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            raise HTTPError(400, "некорректный Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(413, "слишком большое тело запроса")
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise HTTPError(400, "тело запроса должно быть JSON-объектом")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "тело запроса должно быть JSON-объектом")
+        return body
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def get_student(self, student_id, query):
+        student = self.db.get_student(student_id)
+        if student is False:
+            raise HTTPError(500, "ошибка базы данных")
+        if student is None:
+            raise HTTPError(404, "студент не найден")
+        return 200, _row(student)
+
+    def find_students(self, query):
+        if not query.get('q', [''])[-1].strip():
+            raise HTTPError(400, "нужен параметр q")
+        try:
+            limit = int(query.get('limit', [DEFAULT_FIND_LIMIT])[-1])
+        except ValueError:
+            raise HTTPError(400, "limit должен быть числом")
+        return 200, {'items': _rows(self.db.find_students(query['q'][-1], limit))}
+
+    def get_course_students(self, course_number, query):
+        after, limit = _page_args(query, len(STUDENT_PAGE_KEY))
+        students = self.db.get_students_by_course(course_number, after=after, limit=limit)
+        return 200, _page(students, STUDENT_PAGE_KEY, limit)
+
+    def get_course_disciplines(self, course_number, query):
+        return 200, {'items': _rows(self.db.get_disciplines_by_course(course_number))}
+
+    def get_free_slots(self, course_number, query):
+        slots = self.db.get_free_slots(course_number)
+        if slots is None:
+            raise HTTPError(400, "некорректный номер курса")
+        return 200, {'items': [{'day_of_week': day, 'lesson_number': lesson} for day, lesson in slots]}
+
+    def get_course_stats(self, course_number, query):
+        stats = self.db.get_course_stats(course_number)
+        if stats is None:
+            raise HTTPError(500, "ошибка базы данных")
+        return 200, stats
+
+    def get_disciplines(self, query):
+        after, limit = _page_args(query, len(DISCIPLINE_PAGE_KEY))
+        disciplines = self.db.get_all_disciplines(after=after, limit=limit)
+        return 200, _page(disciplines, DISCIPLINE_PAGE_KEY, limit)
+
+    def get_stats(self, query):
+        return 200, {'cache': self.db.cache_stats(), 'methods': self.db.stats_snapshot()}
+
+    def add_student(self, query):
+        body = self._read_json()
+        if not body.get('name') or 'course_number' not in body:
+            raise HTTPError(400, "нужны поля name и course_number")
+        ids = self.db.add_students([(body['name'], body['course_number'])])
+        if ids is None:
+            raise HTTPError(500, "ошибка базы данных")
+        if ids[0] is None:
+            raise HTTPError(400, "некорректный номер курса")
+        return 201, {'id': ids[0]}
+
+    def add_discipline(self, query):
+        body = self._read_json()
+        fields = ('discipline_name', 'day_of_week', 'lesson_number', 'course_number')
+        if any(field not in body for field in fields):
+            raise HTTPError(400, f"нужны поля {', '.join(fields)}")
+        ids = self.db.add_disciplines([tuple(body[field] for field in fields)])
+        if ids is None:
+            raise HTTPError(500, "ошибка базы данных")
+        if ids[0] is None:
+            raise HTTPError(409, "слот занят или некорректен")
+        return 201, {'id': ids[0]}
+
+    def delete_student(self, student_id, query):
+        return self._deleted(self.db.delete_students([student_id]), "студент не найден")
+
+    def delete_discipline(self, discipline_id, query):
+        return self._deleted(self.db.delete_disciplines([discipline_id]), "занятие не найдено")
+
+    def _deleted(self, results, not_found):
+        if results is None:
+            raise HTTPError(500, "ошибка базы данных")
+        if not any(results.values()):
+            raise HTTPError(404, not_found)
+        return 200, {'deleted': list(results)}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP/JSON-сервер университетской базы данных")
+    parser.add_argument('--bind', default='127.0.0.1', help="адрес для входящих соединений")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="потоков обработки запросов (и соединений с БД в пуле)")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default='mysql')
+    parser.add_argument('--sqlite-path', default='study.db')
+    parser.add_argument('--db-host', default='localhost')
+    parser.add_argument('--db-user', default='root')
+    parser.add_argument('--db-password', default='')
+    parser.add_argument('--stats', action='store_true', help="собирать статистику запросов (GET /stats)")
+    parser.add_argument('--verbose', action='store_true',
+                        help="журнал запросов и сообщения UniversityDB в stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.backend == 'sqlite':
+        backend = SQLiteBackend(args.sqlite_path)
+    else:
+        backend = MySQLBackend(args.db_host, args.db_user, args.db_password)
+
+    db = UniversityDB()
+    if not db.connect(backend, pool_size=args.workers):
+        return 1
+    if db.load_metadata().get(SCHEMA_VERSION_KEY) != str(backend.schema_version) and not db.create_tables():
+        db.close_connection()
+        return 1
+    if args.stats:
+        db.enable_instrumentation()
+
+    try:
+        server = PooledHTTPServer((args.bind, args.port), UniversityRequestHandler, db,
+                                  workers=args.workers, verbose=args.verbose)
+    except OSError as e:
+        print(f"❌ Не удалось открыть порт {args.port}: {e}")
+        db.close_connection()
+        return 1
+    print(f"🌐 Сервер запущен: http://{args.bind}:{server.server_address[1]} "
+          f"({args.workers} потоков, {backend.describe()})")
+    try:
+        if args.verbose:
+            server.serve_forever()
+        else:
+            # Сообщения UniversityDB о каждой операции не нужны под нагрузкой
+            with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+                server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Остановка сервера...")
+    finally:
+        server.server_close()
+        db.close_connection()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+
+import pytest
+
+# Модули проекта лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import MySQLBackend, SQLiteBackend  # noqa: E402
+from main import UniversityDB  # noqa: E402
+
+# Сервер MySQL для тестов; без драйвера или сервера тесты MySQL пропускаются
+MYSQL_HOST = os.environ.get('TEST_MYSQL_HOST', 'localhost')
+MYSQL_USER = os.environ.get('TEST_MYSQL_USER', 'root')
+MYSQL_PASSWORD = os.environ.get('TEST_MYSQL_PASSWORD', '')
+MYSQL_DATABASE = os.environ.get('TEST_MYSQL_DATABASE', 'study_test')
+
+BACKENDS = ('sqlite', 'mysql')
+TABLES = ('students', 'disciplines', 'schema_version', 'app_metadata')
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        "db(backends=..., pool_size=2, cache_size=0): настройки фикстуры db для теста"
+    )
+
+
+def quiet(function, *args, **kwargs):
+    """Вызов без сообщений UniversityDB в stdout"""
+    with redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+def make_backend(name, tmp_path):
+    """Хранилище name: SQLite-файл в tmp_path или тестовая база MySQL"""
+    if name == 'sqlite':
+        return SQLiteBackend(str(tmp_path / 'study.db'))
+    pytest.importorskip('mysql.connector')
+    return MySQLBackend(MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DATABASE)
+
+
+def drop_tables(db):
+    # Общая тестовая база MySQL: каждый тест начинается с пустой схемы
+    with db.pool.connection() as conn:
+        cursor = conn.cursor()
+        for table in TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.commit()
+        cursor.close()
+
+
+@pytest.fixture(params=BACKENDS)
+def db(request, tmp_path):
+    """UniversityDB с пустыми таблицами на каждом хранилище
+
+    Маркер db(backends=..., pool_size=..., cache_size=...) ограничивает
+    хранилища и меняет настройки; MySQL пропускается без драйвера или сервера.
+    """
+    marker = request.node.get_closest_marker('db')
+    options = dict(marker.kwargs) if marker else {}
+    if request.param not in options.pop('backends', BACKENDS):
+        pytest.skip(f"тест не для {request.param}")
+    pool_size = options.pop('pool_size', 2)
+
+    db = UniversityDB(cache_size=options.pop('cache_size', 0), **options)
+    if not quiet(db.connect, make_backend(request.param, tmp_path), pool_size=pool_size):
+        pytest.skip(f"{request.param}: сервер недоступен")
+    if request.param == 'mysql':
+        drop_tables(db)
+    assert quiet(db.create_tables)
+    yield db
+    quiet(db.close_connection)
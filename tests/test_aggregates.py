@@ -0,0 +1,109 @@
+import io
+import threading
+from contextlib import redirect_stdout
+
+from aggregates import CourseCounts
+from conftest import quiet
+from main import execute_command
+
+
+def test_counts_follow_adds_and_removes():
+    counts = CourseCounts()
+    assert not counts.add(1) and not counts.remove(1)
+
+    assert counts.load([(1, 2), ('3', 1)])
+    assert counts.add(1) and counts.add(2, 3) and counts.remove(3)
+    assert [counts.get(course) for course in (1, 2, 3)] == [3, 3, 0]
+
+
+def test_load_started_before_invalidation_is_dropped():
+    counts = CourseCounts()
+    with counts.loading() as generation:
+        counts.invalidate()
+        assert not counts.load([(1, 5)], generation)
+    assert not counts.loaded and counts.get(1) == 0
+
+
+def test_loading_waits_for_writers():
+    counts = CourseCounts()
+    loaded = threading.Event()
+
+    def load():
+        with counts.loading() as generation:
+            counts.load([(1, 1)], generation)
+        loaded.set()
+
+    with counts.writing():
+        thread = threading.Thread(target=load)
+        thread.start()
+        assert not loaded.wait(0.1)
+    assert loaded.wait(5)
+    thread.join()
+
+
+def students(db, course):
+    return db.get_course_stats(course)['students']
+
+
+def test_add_student_checks_course(db):
+    out = io.StringIO()
+    with redirect_stdout(out):
+        assert not execute_command(db, "PUT student Foo Bar 42")
+        assert not execute_command(db, "PUT student Foo Bar x")
+        assert not db.add_student("Foo", 0)
+    assert out.getvalue().count("❌ Ошибка: некорректный номер курса") == 3
+    assert db.find_students("Foo") == []
+    assert sum(students(db, course) for course in range(1, 9)) == 0
+
+
+def test_insert_during_count_is_counted(db):
+    quiet(db.add_student, "Анна", 1)
+    load = db.student_counts.load
+    writer = threading.Thread(target=quiet, args=(db.add_student, "Борис", 1))
+
+    def load_with_concurrent_insert(rows, generation=None):
+        # Вставка начата во время подсчета: ждет его конца и учитывается в счетчиках
+        writer.start()
+        writer.join(0.1)
+        assert writer.is_alive()
+        return load(rows, generation)
+
+    db.student_counts.load = load_with_concurrent_insert
+    assert students(db, 1) == 1
+    writer.join()
+    assert students(db, 1) == 2
+
+
+def test_import_loads_counts(db, tmp_path):
+    quiet(db.add_students, [("Старый", 1), ("Старый", 2)])
+    assert students(db, 1) == 1
+
+    path = tmp_path / 'students.csv'
+    path.write_text("1;Анна;1\n2;Борис;1\n3;Вера;2\n3;Повтор;4\n", encoding='utf-8')
+    assert quiet(db.import_students_from_csv, str(path), bulk=True)
+    assert db.student_counts.loaded
+    assert [students(db, course) for course in (1, 2, 4)] == [2, 1, 0]
+
+    # Борис переходит на 3 курс, Вера удалена, Глеб добавлен
+    path.write_text("1;Анна;1\n2;Борис;3\n4;Глеб;1\n", encoding='utf-8')
+    assert quiet(db.import_students_from_csv, str(path), incremental=True)
+    assert [students(db, course) for course in (1, 2, 3)] == [2, 0, 1]
+
+
+def test_counts_after_transactions(db):
+    quiet(db.add_student, "Анна", 1)
+    assert students(db, 1) == 1
+
+    db.begin_transaction()
+    quiet(db.add_student, "Борис", 1)
+    db.rollback_transaction()
+    assert students(db, 1) == 1
+
+    db.student_counts.invalidate()
+    db.begin_transaction()
+    # Счетчики не загружены: пропущенное изменение сбрасывает их при фиксации
+    quiet(db.add_student, "Вера", 2)
+    assert students(db, 2) == 1
+    quiet(db.delete_students, [1])
+    db.commit_transaction()
+    assert [students(db, course) for course in (1, 2)] == [0, 1]
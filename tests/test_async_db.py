@@ -0,0 +1,135 @@
+import asyncio
+import io
+import threading
+from contextlib import redirect_stdout
+
+import pytest
+
+from async_db import AsyncUniversityDB
+from backends import SQLiteBackend
+
+
+class BlockingDB:
+    """Заглушка UniversityDB: get_student ждет release и считает одновременные вызовы"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.finished = []
+        self.closed = False
+
+    def get_student(self, student_id):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        self.release.wait(5)
+        with self.lock:
+            self.active -= 1
+        self.finished.append(student_id)
+        return {'id': student_id}
+
+    def close_connection(self):
+        self.closed = True
+
+
+async def wait_for(condition):
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("условие не выполнено")
+
+
+def test_concurrent_calls_on_sqlite(tmp_path):
+    async def scenario():
+        adb = await AsyncUniversityDB.connect(SQLiteBackend(str(tmp_path / 'study.db')), pool_size=4)
+        async with adb:
+            assert adb.db.create_tables()
+            results = await asyncio.gather(*(adb.add_student(f"Студент {i}", 1) for i in range(10)))
+            assert all(results)
+            students = await adb.get_students_by_course(1)
+            assert len(students) == 10
+            assert (await adb.get_student(students[0].id)).name == students[0].name
+        return adb
+
+    with redirect_stdout(io.StringIO()):
+        adb = asyncio.run(scenario())
+    assert adb.db.pool is None
+
+
+def test_in_memory_sqlite_limits_in_flight_to_one_connection():
+    async def scenario():
+        adb = await AsyncUniversityDB.connect(SQLiteBackend(':memory:'), pool_size=4)
+        await adb.close()
+        return adb.max_in_flight
+
+    with redirect_stdout(io.StringIO()):
+        assert asyncio.run(scenario()) == 1
+
+
+def test_connect_failure_raises():
+    async def scenario():
+        await AsyncUniversityDB.connect(SQLiteBackend('/nonexistent/dir/study.db'))
+
+    with pytest.raises(ConnectionError), redirect_stdout(io.StringIO()):
+        asyncio.run(scenario())
+
+
+def test_in_flight_calls_are_limited():
+    fake = BlockingDB()
+
+    async def scenario():
+        adb = AsyncUniversityDB(fake, max_in_flight=2)
+        tasks = [asyncio.create_task(adb.get_student(i)) for i in range(6)]
+        await wait_for(lambda: fake.active == 2)
+        await asyncio.sleep(0.05)
+        assert fake.active == 2
+        fake.release.set()
+        results = await asyncio.gather(*tasks)
+        await adb.close()
+        return results
+
+    assert [row['id'] for row in asyncio.run(scenario())] == list(range(6))
+    assert fake.peak == 2
+
+
+def test_cancelled_call_frees_its_slot():
+    fake = BlockingDB()
+
+    async def scenario():
+        adb = AsyncUniversityDB(fake, max_in_flight=1)
+        running = asyncio.create_task(adb.get_student(1))
+        await wait_for(lambda: fake.active == 1)
+        waiting = asyncio.create_task(adb.get_student(2))
+        await asyncio.sleep(0.01)
+
+        waiting.cancel()
+        running.cancel()
+        await asyncio.gather(running, waiting, return_exceptions=True)
+        assert running.cancelled() and waiting.cancelled()
+        assert not adb._semaphore.locked()
+
+        # Запущенный запрос дорабатывает в фоне, следующий выполняется после него
+        fake.release.set()
+        assert (await adb.get_student(3)) == {'id': 3}
+        await adb.close()
+
+    asyncio.run(scenario())
+    assert fake.finished == [1, 3]
+
+
+def test_close_waits_for_running_calls_and_closes_db():
+    fake = BlockingDB()
+
+    async def scenario():
+        adb = AsyncUniversityDB(fake, max_in_flight=1)
+        task = asyncio.create_task(adb.get_student(1))
+        await wait_for(lambda: fake.active == 1)
+        asyncio.get_running_loop().call_later(0.05, fake.release.set)
+        await adb.close()
+        return await task
+
+    assert asyncio.run(scenario()) == {'id': 1}
+    assert fake.finished == [1] and fake.closed
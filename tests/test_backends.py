@@ -0,0 +1,165 @@
+import pytest
+
+from conftest import quiet
+from main import DISCIPLINE_PAGE_KEY
+
+
+def write_csv(path, rows, delimiter=';'):
+    path.write_text(''.join(f"{delimiter.join(map(str, row))}\n" for row in rows), encoding='utf-8')
+    return str(path)
+
+
+def student_tuples(students):
+    return [(s.id, s.name, s.course_number) for s in students]
+
+
+def test_student_crud(db):
+    assert quiet(db.add_student, "Иван Петров", 2)
+    [student] = db.get_students_by_course(2)
+    assert (student.name, student.course_number) == ("Иван Петров", 2)
+    assert db.get_student(student.id).name == "Иван Петров"
+
+    assert quiet(db.delete_student, student.id)
+    assert db.get_student(student.id) is None
+    assert db.get_students_by_course(2) == []
+
+
+def test_discipline_crud_rejects_taken_slot(db):
+    assert quiet(db.add_discipline, "Математика", "Понедельник", 1, 3)
+    assert not quiet(db.add_discipline, "Физика", "Понедельник", 1, 3)
+    [discipline] = db.get_disciplines_by_course(3)
+    assert discipline.discipline_name == "Математика"
+
+    assert quiet(db.delete_discipline, discipline.id)
+    assert db.get_disciplines_by_course(3) == []
+
+
+def test_bulk_add_and_delete(db):
+    ids = quiet(db.add_students, [("Анна", 1), ("Борис", 1), ("Вера", 'x'), ("Глеб", 42), ("Дина", 0)])
+    assert ids[2:] == [None, None, None] and len(set(ids[:2])) == 2
+    assert sorted(s.id for s in db.get_students_by_course(1)) == sorted(ids[:2])
+
+    quiet(db.delete_students, ids[:2])
+    assert db.get_students_by_course(1) == []
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_import_students(db, tmp_path, bulk):
+    path = write_csv(tmp_path / 'students.csv', [
+        (1, "Bennie Hodkiewicz", 1),
+        (2, "Octavia Huels", 2),
+        (3, "Elta Okuneva", 9),
+        (2, "Повтор", 2),
+    ])
+    assert quiet(db.import_students_from_csv, path, bulk=bulk, batch_size=2)
+    assert db.last_import_stats['rows'] == 2
+    assert student_tuples(db.get_students_by_course(1)) == [(1, "Bennie Hodkiewicz", 1)]
+    assert student_tuples(db.get_students_by_course(2)) == [(2, "Octavia Huels", 2)]
+
+
+def test_incremental_import(db, tmp_path):
+    path = tmp_path / 'students.csv'
+    assert quiet(db.import_students_from_csv, write_csv(path, [(1, "Анна", 1), (2, "Борис", 1)]))
+
+    write_csv(path, [(1, "Анна", 1), (3, "Вера", 1)])
+    assert quiet(db.import_students_from_csv, str(path), incremental=True)
+    assert db.last_import_stats['changes'] == {'inserted': 1, 'updated': 0, 'deleted': 1, 'unchanged': 1}
+    assert student_tuples(db.get_students_by_course(1)) == [(1, "Анна", 1), (3, "Вера", 1)]
+
+
+def test_students_pagination(db):
+    names = [f"Студент {i:02d}" for i in range(7)]
+    quiet(db.add_students, [(name, 4) for name in reversed(names)])
+
+    pages = []
+    after = None
+    while True:
+        page = db.get_students_by_course(4, after=after, limit=3)
+        if not page:
+            break
+        pages.append([s.name for s in page])
+        after = (page[-1].name, page[-1].id)
+    assert pages == [names[0:3], names[3:6], names[6:7]]
+
+
+def test_disciplines_pagination(db):
+    quiet(db.add_disciplines, [(f"Предмет {lesson}", "Среда", lesson, 5) for lesson in range(1, 6)])
+    first = db.get_all_disciplines(limit=2)
+    rest = db.get_all_disciplines(after=tuple(getattr(first[-1], column) for column in DISCIPLINE_PAGE_KEY),
+                                  limit=10)
+    assert [d.lesson_number for d in first + rest] == [1, 2, 3, 4, 5]
+
+
+def test_transaction_rollback(db):
+    quiet(db.add_student, "Остается", 6)
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            quiet(db.add_student, "Откатится", 6)
+            quiet(db.add_discipline, "Откатится", "Вторник", 2, 6)
+            raise RuntimeError("отмена")
+    assert not db.in_transaction()
+    assert [s.name for s in db.get_students_by_course(6)] == ["Остается"]
+    assert db.get_disciplines_by_course(6) == []
+
+
+def test_transaction_commit(db):
+    with db.transaction():
+        quiet(db.add_student, "Анна", 7)
+        quiet(db.add_student, "Борис", 7)
+    assert [s.name for s in db.get_students_by_course(7)] == ["Анна", "Борис"]
+
+
+def test_metadata_round_trip(db):
+    assert quiet(db.save_metadata, 'students_csv', 'отпечаток')
+    assert quiet(db.save_metadata, 'students_csv', 'новый отпечаток')
+    assert db.load_metadata()['students_csv'] == 'новый отпечаток'
+
+
+def test_course_students_follow_changes(db):
+    ids = quiet(db.add_students, [("Анна", 1), ("Борис", 1), ("Вера", 3)])
+    assert [db.get_course_stats(course)['students'] for course in (1, 2, 3)] == [2, 0, 1]
+
+    quiet(db.add_student, "Глеб", 3)
+    quiet(db.delete_student, ids[0])
+    quiet(db.delete_students, [ids[2]])
+    assert [db.get_course_stats(course)['students'] for course in (1, 2, 3)] == [1, 0, 1]
+
+
+def test_reads_do_not_leave_a_transaction_to_roll_back(db, monkeypatch):
+    quiet(db.add_students, [("Анна", 1), ("Борис", 1)])
+    open_on_release = []
+    release = db.pool.release
+
+    def recording_release(conn):
+        open_on_release.append(conn.in_transaction)
+        release(conn)
+
+    monkeypatch.setattr(db.pool, 'release', recording_release)
+    db.get_student(1)
+    db.get_students_by_course(1)
+    list(db.iter_students_by_course(1))
+    quiet(db.add_student, "Вера", 2)
+    quiet(db.delete_student, 1)
+    assert open_on_release and not any(open_on_release)
+
+
+def test_failed_bulk_write_is_rolled_back(db, monkeypatch):
+    quiet(db.add_students, [("Анна", 1)])
+    # Вторая пачка многострочного INSERT падает: первая не должна остаться в таблице
+    monkeypatch.setattr('main.BULK_CHUNK_SIZE', 2)
+    rows = [("Борис", 1), ("Вера", 1), ("Глеб", 1), (None, 1)]
+    assert quiet(db.add_students, rows) is None
+    assert [s.name for s in db.get_students_by_course(1)] == ["Анна"]
+
+
+@pytest.mark.db(backends=('mysql',), pool_size=1)
+def test_bulk_ids_follow_auto_increment_step(db):
+    # Единственное соединение пула: настройка сессии действует на следующий INSERT
+    with db.pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION auto_increment_increment = 3")
+        cursor.close()
+
+    ids = quiet(db.add_students, [("Анна", 1), ("Борис", 2), ("Вера", 3)])
+    assert ids[1] - ids[0] == ids[2] - ids[1] == 3
+    assert [db.get_student(student_id).name for student_id in ids] == ["Анна", "Борис", "Вера"]
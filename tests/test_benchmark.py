@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from benchmark import TOTAL_SLOTS, compare_prepared, compare_row_formats, load_disciplines, parse_args
+from conftest import quiet
+
+
+def test_default_disciplines_fit_the_timetable():
+    assert parse_args([]).disciplines == TOTAL_SLOTS
+
+
+def test_load_disciplines_fills_the_timetable(db):
+    assert quiet(load_disciplines, db, TOTAL_SLOTS + 10, batch_size=100) == TOTAL_SLOTS
+    # Расписание в памяти знает о загруженных занятиях: свободных слотов нет
+    assert quiet(db.add_discipline, "Физика", "Понедельник", 1, 1) is False
+
+
+@pytest.mark.db(cache_size=64)
+def test_comparisons_bypass_the_cache(db):
+    quiet(db.add_students, [(f"Студент {i}", i % 8 + 1) for i in range(40)])
+    cache = db.cache
+
+    compare_prepared(db, 40, 20, random.Random(0))
+    compare_row_formats(db, repeats=2, sample_rows=16)
+
+    assert db.cache is cache
+    assert db.cache_stats()['hits'] == 0 and db.cache_stats()['size'] == 0
+
+
+def test_prepared_comparison_is_marked_as_no_op_without_server_statements(db):
+    quiet(db.add_students, [(f"Студент {i}", 1) for i in range(10)])
+    results = compare_prepared(db, 10, 10, random.Random(0))
+
+    assert results['server_prepared'] is db.backend.server_prepared_statements
+    assert ('note' in results) is not db.backend.server_prepared_statements
@@ -0,0 +1,81 @@
+import pytest
+
+import main
+from conftest import quiet
+from main import CACHE_MISS, LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert cache.get('b') is CACHE_MISS
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['size'] == 2
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(main.time, 'monotonic', lambda: now[0])
+    cache = LRUCache(max_size=10, ttl=5)
+    cache.put('a', 1)
+
+    now[0] += 4.9
+    assert cache.get('a') == 1
+    now[0] += 0.2
+    assert cache.get('a') is CACHE_MISS
+    assert cache.stats()['size'] == 0
+
+
+def test_invalidate_kind_drops_only_that_kind():
+    cache = LRUCache()
+    cache.put(('student', 1), 'a')
+    cache.put(('students', 1), ['a'])
+    cache.invalidate_kind('students')
+    assert cache.get(('student', 1)) == 'a'
+    assert cache.get(('students', 1)) is CACHE_MISS
+
+
+def test_result_read_before_invalidation_is_not_cached():
+    """Запрос начался до записи, а закончился после: его результат устарел"""
+    cache = LRUCache()
+    generation = cache.generation
+    cache.invalidate(('student', 1))
+    cache.put(('student', 1), 'устаревшее значение', generation)
+    assert cache.get(('student', 1)) is CACHE_MISS
+
+    cache.put(('student', 1), 'новое значение', cache.generation)
+    assert cache.get(('student', 1)) == 'новое значение'
+
+
+@pytest.mark.db(cache_size=64)
+def test_rolled_back_write_does_not_stay_cached(db):
+    quiet(db.add_student, "Анна", 1)
+    assert [s.name for s in db.get_students_by_course(1)] == ["Анна"]
+
+    db.begin_transaction()
+    quiet(db.add_student, "Борис", 1)
+    # Чтение внутри транзакции видит незафиксированную строку и кладет ее в кэш
+    assert [s.name for s in db.get_students_by_course(1)] == ["Анна", "Борис"]
+    db.rollback_transaction()
+
+    assert [s.name for s in db.get_students_by_course(1)] == ["Анна"]
+
+
+@pytest.mark.db(cache_size=64)
+def test_committed_write_invalidates_cached_reads(db):
+    quiet(db.add_student, "Анна", 1)
+    [anna] = db.get_students_by_course(1)
+    assert db.get_student(anna.id).name == "Анна"
+    assert db.get_students_by_course(1) == [anna]
+    assert db.cache_stats()['hits'] == 1
+
+    with db.transaction():
+        quiet(db.add_student, "Борис", 1)
+        quiet(db.delete_student, anna.id)
+
+    assert db.get_student(anna.id) is None
+    assert [s.name for s in db.get_students_by_course(1)] == ["Борис"]
@@ -0,0 +1,39 @@
+import io
+import threading
+from contextlib import redirect_stdout
+
+import pytest
+
+THREADS = 16
+STUDENTS_PER_THREAD = 10
+
+
+@pytest.mark.db(pool_size=THREADS)
+def test_parallel_add_student_allocates_distinct_ids(db):
+    """ID выдает БД: параллельные add_student не получают одинаковых ID"""
+    barrier = threading.Barrier(THREADS)
+    results = []
+    lock = threading.Lock()
+
+    def worker(thread_number):
+        barrier.wait()
+        for i in range(STUDENTS_PER_THREAD):
+            added = db.add_student(f"Студент {thread_number}-{i}", thread_number % 8 + 1)
+            with lock:
+                results.append(added)
+
+    with redirect_stdout(io.StringIO()):
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    total = THREADS * STUDENTS_PER_THREAD
+    assert results == [True] * total
+
+    with db.pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*), COUNT(DISTINCT id), COUNT(DISTINCT name) FROM students")
+        assert cursor.fetchone() == (total, total, total)
+        cursor.close()
@@ -0,0 +1,32 @@
+import os
+
+from main import csv_fingerprint, csv_unchanged
+
+
+def test_unchanged_file_keeps_fingerprint(tmp_path):
+    path = tmp_path / 'students.csv'
+    path.write_text("1;Анна;1\n", encoding='utf-8')
+    stored = csv_fingerprint(str(path))
+    assert csv_unchanged(str(path), stored) == stored
+
+
+def test_touched_file_gets_refreshed_fingerprint(tmp_path):
+    path = tmp_path / 'students.csv'
+    path.write_text("1;Анна;1\n", encoding='utf-8')
+    stored = csv_fingerprint(str(path))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    fingerprint = csv_unchanged(str(path), stored)
+    assert fingerprint and fingerprint != stored
+    # С новым отпечатком файл узнается без хеширования
+    assert csv_fingerprint(str(path), fingerprint) is fingerprint
+
+
+def test_edited_file_is_changed(tmp_path):
+    path = tmp_path / 'students.csv'
+    path.write_text("1;Анна;1\n", encoding='utf-8')
+    stored = csv_fingerprint(str(path))
+    path.write_text("1;Вера;1\n", encoding='utf-8')
+    assert csv_unchanged(str(path), stored) is None
+    assert csv_unchanged(str(path), None) is None
@@ -0,0 +1,76 @@
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+from backends import SQLiteBackend
+from main import HOT_STATEMENTS, UniversityDB
+
+
+def query_plan(conn, name, params=()):
+    """EXPLAIN QUERY PLAN горячего запроса: строки плана через '; '"""
+    cursor = conn.cursor()
+    cursor.execute("EXPLAIN QUERY PLAN " + HOT_STATEMENTS[name], params)
+    plan = '; '.join(row[3] for row in cursor.fetchall())
+    cursor.close()
+    return plan
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteBackend(str(tmp_path / 'explain.db'))
+
+
+def test_course_queries_use_indexes_after_migration_1(backend):
+    # До миграции 1: только таблицы, без индексов
+    conn = backend.connect()
+    cursor = conn.cursor()
+    for statement in backend.create_table_statements:
+        cursor.execute(statement)
+    conn.commit()
+    before = {
+        'students_by_course': query_plan(conn, 'students_by_course', (3,)),
+        'all_disciplines': query_plan(conn, 'all_disciplines'),
+    }
+    conn.close()
+
+    db = UniversityDB()
+    with redirect_stdout(io.StringIO()):
+        assert db.connect(backend)
+        assert db.create_tables()
+        db.close_connection()
+
+    # Новое соединение: кэш запросов старого соединения хранит планы до миграции
+    conn = backend.connect()
+    after = {
+        'students_by_course': query_plan(conn, 'students_by_course', (3,)),
+        'all_disciplines': query_plan(conn, 'all_disciplines'),
+    }
+    conn.close()
+
+    print(f"\nEXPLAIN до миграции: {before}\nEXPLAIN после миграции: {after}")
+
+    assert 'SCAN students' in before['students_by_course']
+    assert 'USE TEMP B-TREE FOR ORDER BY' in before['students_by_course']
+    assert 'idx_students_course_name' not in before['students_by_course']
+
+    assert 'SEARCH students USING INDEX idx_students_course_name (course_number=?)' in after['students_by_course']
+    # Порядок по (name, id) дает индекс: без отдельной сортировки
+    assert 'TEMP B-TREE' not in after['students_by_course']
+
+    assert 'USE TEMP B-TREE FOR ORDER BY' in before['all_disciplines']
+    assert 'idx_disciplines_course_slot' in after['all_disciplines']
+
+
+@pytest.mark.db(backends=('mysql',))
+def test_mysql_students_by_course_uses_index_without_filesort(db):
+    """На MySQL выборка курса идет по idx_students_course_name без filesort"""
+    with db.pool.connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("EXPLAIN " + HOT_STATEMENTS['students_by_course'], (3,))
+        [plan] = cursor.fetchall()
+        cursor.close()
+
+    print(f"\nEXPLAIN (MySQL): {plan}")
+    assert plan['key'] == 'idx_students_course_name'
+    assert 'filesort' not in (plan['Extra'] or '')
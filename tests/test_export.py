@@ -0,0 +1,27 @@
+from conftest import quiet
+from export import ColumnarExportWriter, read_columnar
+
+
+def test_columnar_round_trip(tmp_path):
+    path = tmp_path / 'rows.col'
+    blocks = [
+        [(1, "Анна", 1), (2, None, 8)],
+        [(300, "Борис", -5), (2 ** 40, "", 1)],
+    ]
+    with open(path, 'wb') as file:
+        writer = ColumnarExportWriter(file, ['id', 'name', 'course_number'])
+        for rows in blocks:
+            writer.write_rows(rows)
+        writer.close()
+
+    assert list(read_columnar(path)) == [
+        (1, "Анна", 1), (2, "", 8), (300, "Борис", -5), (2 ** 40, "", 1),
+    ]
+
+
+def test_export_table_col_reads_back(db, tmp_path):
+    ids = quiet(db.add_students, [(f"Студент {i}", i % 8 + 1) for i in range(25)])
+    assert quiet(db.export_table, 'students', str(tmp_path / 'students.col'), fmt='col', chunk_size=10) == 25
+
+    rows = list(read_columnar(tmp_path / 'students.col'))
+    assert [row[:3] for row in rows] == [(ids[i], f"Студент {i}", i % 8 + 1) for i in range(25)]
@@ -0,0 +1,26 @@
+import pytest
+
+from main import MAX_ID_RANGE, parse_id_list
+
+
+def test_ids_and_ranges():
+    assert parse_id_list(['3', '9-11,15', '7-7']) == [3, 9, 10, 11, 15, 7]
+
+
+def test_reversed_range_is_rejected():
+    with pytest.raises(ValueError, match="обратном порядке"):
+        parse_id_list(['3', '7-6'])
+
+
+@pytest.mark.parametrize('token', ['x', '1-', '5-y'])
+def test_invalid_token(token):
+    with pytest.raises(ValueError, match="некорректный ID"):
+        parse_id_list([token])
+
+
+def test_range_length_is_capped():
+    assert len(parse_id_list([f"1-{MAX_ID_RANGE}"])) == MAX_ID_RANGE
+    with pytest.raises(ValueError, match="длиннее"):
+        parse_id_list([f"1-{MAX_ID_RANGE + 1}"])
+    with pytest.raises(ValueError, match="длиннее"):
+        parse_id_list(["0-99999999999999999999"])
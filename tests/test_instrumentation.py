@@ -0,0 +1,97 @@
+import io
+from contextlib import redirect_stdout
+
+from conftest import quiet
+from instrumentation import LATENCY_BUCKETS_MS, Instrumentation, row_bytes
+from main import execute_command
+from rows import build_rows
+
+
+def run(db, command):
+    out = io.StringIO()
+    with redirect_stdout(out):
+        ok = execute_command(db, command)
+    return ok, out.getvalue()
+
+
+def test_row_bytes_of_rows_and_scalars():
+    [student] = build_rows('students', [(7, "Анна", 2, None)])
+    # "Анна" - 8 байт в UTF-8, числа по 8 байт, None не считается
+    assert row_bytes(student) == 8 + 8 + 8
+    assert row_bytes(student.as_dict()) == row_bytes(student)
+    assert row_bytes((1, "ab")) == 8 + 2
+    assert row_bytes(42) == 8
+    assert row_bytes(None) == 0
+
+
+def test_record_sizes_lists_rows_and_scalars():
+    stats = Instrumentation()
+    [student] = build_rows('students', [(7, "Анна", 2, None)])
+    stats.record('add_students', (), 0.001, [1, 2, None])
+    stats.record('get_student', (7,), 0.001, student)
+    stats.record('get_course_stats', (2,), 0.001, {'students': 3})
+    stats.record('delete_student', (7,), 0.001, False)
+    stats.record('add_student', (), 0.001, True)
+
+    methods = stats.snapshot()['methods']
+    assert (methods['add_students']['rows'], methods['add_students']['bytes']) == (3, 16)
+    assert (methods['get_student']['rows'], methods['get_student']['bytes']) == (1, 24)
+    assert (methods['get_course_stats']['rows'], methods['get_course_stats']['bytes']) == (1, 8)
+    assert methods['delete_student']['failures'] == 1
+    assert (methods['add_student']['rows'], methods['add_student']['failures']) == (0, 0)
+
+
+def test_latency_histogram_and_slow_log(tmp_path):
+    log_path = tmp_path / 'slow.log'
+    stats = Instrumentation(slow_query_ms=50, slow_log_path=str(log_path))
+    for elapsed in (0.0002, 0.0002, 0.003, 0.2):
+        stats.record('get_student', (1,), elapsed, None)
+
+    snapshot = stats.snapshot()
+    method = snapshot['methods']['get_student']
+    assert method['calls'] == 4
+    assert method['histogram'] == {
+        **{('inf' if bound == float('inf') else f"{bound:g}"): 0 for bound in LATENCY_BUCKETS_MS},
+        '0.5': 2, '5': 1, '500': 1,
+    }
+    assert method['p50_ms'] == 0.5 and method['max_ms'] == 200.0
+    assert [entry['elapsed_ms'] for entry in snapshot['slow_queries']] == [200.0]
+    assert "get_student(1)" in log_path.read_text(encoding='utf-8')
+
+    stats.reset()
+    assert stats.snapshot()['methods'] == {} and stats.snapshot()['slow_queries'] == []
+
+
+def test_iterator_is_counted_when_consumed():
+    stats = Instrumentation()
+    rows = stats.wrap('iter_students_by_course', lambda course: iter([(1, "a"), (2, "b")]))(1)
+    assert stats.snapshot()['methods'] == {}
+    assert len(list(rows)) == 2
+    method = stats.snapshot()['methods']['iter_students_by_course']
+    assert (method['calls'], method['rows'], method['bytes']) == (1, 2, 18)
+
+
+def test_stats_command_lifecycle(db):
+    quiet(db.add_students, [("Анна", 1), ("Борис", 1)])
+
+    assert run(db, "STATS")[1].startswith("⚠️ Сбор статистики выключен")
+    assert run(db, "STATS on 0")[0]
+    quiet(db.get_students_by_course, 1)
+    quiet(db.add_student, "Вера", 2)
+
+    ok, text = run(db, "STATS")
+    assert ok and "get_students_by_course" in text and "add_student" in text
+    assert "🐢 Медленные запросы (порог 0.0 мс)" in text
+    assert db.stats_snapshot()['methods']['get_students_by_course']['rows'] == 2
+
+    assert run(db, "STATS reset")[0]
+    assert db.stats_snapshot()['methods'] == {}
+    assert run(db, "STATS off")[0]
+    assert db.instrumentation is None and 'get_student' not in db.__dict__
+
+
+def test_stats_on_rejects_non_numeric_threshold(db):
+    ok, text = run(db, "STATS on x")
+    assert not ok and text.startswith("❌")
+    assert db.instrumentation is None
+    assert not run(db, "STATS sideways")[0]
@@ -0,0 +1,48 @@
+import gc
+
+import pytest
+
+from conftest import quiet
+
+# Одно соединение в пуле: брошенный итератор, не вернувший его, заблокировал бы следующий запрос
+pytestmark = pytest.mark.db(pool_size=1)
+
+
+@pytest.fixture(autouse=True)
+def students(db):
+    quiet(db.add_students, [(f"Студент {i:02d}", 1) for i in range(25)])
+
+
+def idle_connections(db):
+    return db.pool._idle.qsize()
+
+
+def test_iterator_streams_all_rows_in_order(db):
+    names = [s.name for s in db.iter_students_by_course(1, chunk_size=4)]
+    assert names == [f"Студент {i:02d}" for i in range(25)]
+    assert idle_connections(db) == 1
+
+
+def test_closed_iterator_releases_connection(db):
+    rows = db.iter_students_by_course(1, chunk_size=4)
+    assert next(rows).name == "Студент 00"
+    assert idle_connections(db) == 0
+
+    rows.close()
+    assert idle_connections(db) == 1
+    assert len(db.get_students_by_course(1)) == 25
+
+
+def test_abandoned_iterator_releases_connection(db):
+    rows = db.iter_students_by_course(1, chunk_size=4)
+    next(rows)
+    del rows
+    gc.collect()
+
+    assert idle_connections(db) == 1
+    assert db.get_student(1) is not None
+
+
+def test_limit_stops_the_query(db):
+    assert [s.name for s in db.iter_students_by_course(1, limit=3)] == ["Студент 00", "Студент 01", "Студент 02"]
+    assert idle_connections(db) == 1
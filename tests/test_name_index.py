@@ -0,0 +1,156 @@
+import io
+from contextlib import redirect_stdout
+
+from conftest import quiet
+from main import execute_command
+from name_index import NameIndex
+
+STUDENTS = [(1, "Петрова Анна"), (2, "Иван Петров"), (3, "Пётр Сидоров"), (4, "Анна Иванова"),
+            (5, "Петрова Анна")]
+
+
+def index(rows=STUDENTS):
+    names = NameIndex()
+    names.load(rows)
+    return names
+
+
+def test_prefix_of_any_word_matches():
+    names = index()
+    # Совпадения идут в порядке хвостов имен: "петр сидоров" < "петров" < "петрова анна"
+    assert names.search("пет", 10, fuzzy=False) == [3, 2, 1, 5]
+    assert names.search("анна", 10, fuzzy=False) == [1, 5, 4]
+    assert names.search("ПЁТР СИД", 10, fuzzy=False) == [3]
+    assert names.search("  ", 10) == []
+
+
+def test_prefix_hits_come_before_fuzzy_hits():
+    names = index()
+    assert names.search("Петрова", 10, fuzzy=False) == [1, 5]
+    # "Петров" и "Пётр" похожи на "Петрова" и идут после совпадений по префиксу,
+    # по убыванию сходства
+    assert names.search("Петрова", 10) == [1, 5, 2, 3]
+    assert names.search("Сидорв", 10) == [3]
+
+
+def test_limit():
+    names = index()
+    assert names.search("пет", 2) == [3, 2]
+    assert names.search("пет", 0) == []
+
+
+def test_add_and_remove():
+    names = index()
+    names.add(6, "Петя Васечкин")
+    assert names.search("вас", 10) == [6]
+    names.add(6, "Вася Петечкин")
+    assert names.search("вася", 10) == [6] and names.search("васеч", 10, fuzzy=False) == []
+
+    names.remove(3)
+    assert names.search("сидоров", 10) == []
+    names.remove(1)
+    assert names.search("петрова", 10, fuzzy=False) == [5]
+    assert len(names) == 4
+
+
+def test_changes_during_load_are_applied():
+    names = NameIndex()
+    assert not names.add(9, "Не загружен")
+
+    generation = names.begin_load()
+    names.add(6, "Новый Студент")
+    names.remove(2)
+    names.add(1, "Анна Петрова")
+    # Выборка сделана до этих изменений
+    assert names.load(STUDENTS, generation)
+
+    assert names.search("новый", 10) == [6]
+    assert names.search("иван", 10, fuzzy=False) == [4]
+    assert names.search("анна", 10, fuzzy=False) == [5, 4, 1]
+    assert names.search("не загружен", 10) == []
+
+
+def test_load_started_before_invalidation_is_dropped():
+    names = NameIndex()
+    generation = names.begin_load()
+    names.invalidate()
+    assert not names.load(STUDENTS, generation)
+    assert not names.loaded
+
+
+def find(db, text):
+    return [student.name for student in db.find_students(text)]
+
+
+def test_find_follows_writes(db):
+    ids = quiet(db.add_students, [("Петрова Анна", 1), ("Иван Петров", 2)])
+    assert find(db, "пет") == ["Иван Петров", "Петрова Анна"]
+
+    quiet(db.add_student, "Пётр Сидоров", 3)
+    quiet(db.delete_student, ids[1])
+    assert find(db, "пет") == ["Пётр Сидоров", "Петрова Анна"]
+
+    quiet(db.delete_students, [ids[0]])
+    assert find(db, "пет") == ["Пётр Сидоров"]
+
+
+def test_find_command_limit(db):
+    quiet(db.add_students, [(f"Студент {i}", 1) for i in range(5)])
+    out = io.StringIO()
+    with redirect_stdout(out):
+        assert execute_command(db, "FIND student студ limit 2")
+    assert len(out.getvalue().splitlines()) == 2
+    with redirect_stdout(out):
+        assert not execute_command(db, "FIND student студ limit x")
+
+
+def test_import_builds_the_index(db, tmp_path):
+    quiet(db.add_student, "Старый Студент", 1)
+    assert find(db, "старый") == ["Старый Студент"]
+
+    path = tmp_path / 'students.csv'
+    path.write_text("1;Петрова Анна;1\n2;Иван Петров;2\n2;Повтор;3\n", encoding='utf-8')
+    assert quiet(db.import_students_from_csv, str(path), bulk=True)
+
+    # Индекс заменен строками импорта сразу, без повторного чтения таблицы
+    assert db.name_index.loaded and len(db.name_index) == 2
+    assert find(db, "старый") == [] and find(db, "повтор") == []
+    assert find(db, "пет") == ["Иван Петров", "Петрова Анна"]
+
+    path.write_text("1;Анна Сидорова;1\n3;Пётр Новиков;2\n", encoding='utf-8')
+    assert quiet(db.import_students_from_csv, str(path), incremental=True)
+    assert find(db, "пет") == ["Пётр Новиков"]
+    assert find(db, "сидорова") == ["Анна Сидорова"]
+
+
+def test_insert_during_lazy_load_is_indexed(db):
+    quiet(db.add_student, "Петрова Анна", 1)
+    load = db.name_index.load
+
+    def load_with_concurrent_insert(rows, generation=None):
+        # Запрос загрузки уже выполнен: эта вставка не попадет в его выборку
+        quiet(db.add_student, "Иван Петров", 2)
+        return load(rows, generation)
+
+    db.name_index.load = load_with_concurrent_insert
+    assert find(db, "пет") == ["Иван Петров", "Петрова Анна"]
+
+
+def test_rolled_back_insert_leaves_the_index(db):
+    quiet(db.add_student, "Петрова Анна", 1)
+    assert find(db, "пет") == ["Петрова Анна"]
+
+    db.begin_transaction()
+    quiet(db.add_student, "Иван Петров", 2)
+    db.rollback_transaction()
+    assert find(db, "пет") == ["Петрова Анна"]
+
+
+def test_insert_committed_in_a_transaction_is_found(db):
+    db.begin_transaction()
+    # Индекс еще не загружен: он загрузится внутри транзакции и будет сброшен при фиксации
+    quiet(db.add_student, "Иван Петров", 2)
+    assert find(db, "пет") == ["Иван Петров"]
+    quiet(db.add_student, "Петрова Анна", 1)
+    db.commit_transaction()
+    assert find(db, "пет") == ["Иван Петров", "Петрова Анна"]
@@ -0,0 +1,88 @@
+import os
+import time
+
+import pytest
+
+import main
+from backends import SQLiteBackend
+from conftest import quiet
+from main import UniversityDB
+from timetable import COURSES
+
+STUDENTS = 200
+
+
+class ConcurrentSQLiteBackend(SQLiteBackend):
+    """SQLite, для которой включен параллельный импорт: воркеры ждут блокировку записи по очереди"""
+
+    concurrent_writes = True
+
+
+def crash_after_first_chunk(backend, path, start, end, *args):
+    # Первый кусок загружается и фиксируется, остальные воркеры дожидаются этого и падают
+    if start == 0:
+        return load_csv_chunk(backend, path, start, end, *args)
+    conn = backend.connect()
+    for _ in range(500):
+        if conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]:
+            break
+        time.sleep(0.01)
+    conn.close()
+    os._exit(1)
+
+
+load_csv_chunk = main.load_csv_chunk
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = UniversityDB(cache_size=64)
+    assert quiet(db.connect, ConcurrentSQLiteBackend(str(tmp_path / 'study.db')), pool_size=2)
+    assert quiet(db.create_tables)
+    yield db
+    quiet(db.close_connection)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'students.csv'
+    lines = [f"{i};Студент {i:03d};{i % 8 + 1}" for i in range(1, STUDENTS + 1)]
+    # Повтор ID и строка с неверным курсом отклоняются
+    lines += ["5;Повтор;1", "999;Без курса;x"]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def count_students(db):
+    return sum(db.get_course_stats(course)['students'] for course in range(1, COURSES + 1))
+
+
+def test_parallel_import_loads_every_chunk(db, csv_path):
+    quiet(db.add_student, "Старый", 1)
+    assert count_students(db) == 1
+
+    assert quiet(db.import_students_parallel, csv_path, workers=2, batch_size=16)
+
+    stats = db.last_import_stats
+    assert stats['rows'] == STUDENTS and stats['workers'] == 2
+    assert sum(stats['rejected'].values()) == 2 and stats['rejected']['дубликат ID'] == 1
+    assert db.get_student(5).name == "Студент 005"
+    assert count_students(db) == STUDENTS
+    assert [s.name for s in db.find_students("Студент 01", limit=3)] == ["Студент 010", "Студент 011", "Студент 012"]
+
+
+def test_crashed_worker_reports_committed_rows(db, csv_path, monkeypatch, capsys):
+    quiet(db.add_student, "Старый", 1)
+    assert count_students(db) == 1
+    monkeypatch.setattr(main, 'load_csv_chunk', crash_after_first_chunk)
+
+    assert db.import_students_parallel(csv_path, workers=2, batch_size=16) is False
+
+    out = capsys.readouterr().out
+    assert "аварийно завершился" in out
+    committed = int(out.split("зафиксировано строк до сбоя: ")[1].split()[0])
+    assert 0 < committed < STUDENTS
+    # Кэш и счетчики сброшены: видны строки, зафиксированные до сбоя
+    assert count_students(db) == committed
+    assert quiet(db.get_student, 1) is not None
+    assert db.find_students("Старый") == []
@@ -0,0 +1,109 @@
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+
+from backends import SQLiteBackend
+from main import ConnectionPool, StatementRegistry
+
+
+@pytest.fixture
+def frequent_switches():
+    # Частое переключение потоков, чтобы гонка проявлялась за несколько прогонов
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.mark.parametrize('attempt', range(50))
+def test_pool_never_exceeds_size_under_concurrency(frequent_switches, attempt):
+    """Параллельные acquire не открывают больше size соединений"""
+    opened = []
+    lock = threading.Lock()
+
+    def connect():
+        # Медленное соединение расширяет окно гонки между проверкой и открытием
+        time.sleep(0.01)
+        conn = sqlite3.connect(':memory:', check_same_thread=False)
+        with lock:
+            opened.append(conn)
+        return conn
+
+    pool = ConnectionPool(connect, size=2, prewarm=False, checkout_timeout=5)
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        with pool.connection():
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(opened) <= 2
+    pool.close()
+
+
+def test_failed_connect_releases_reserved_slot():
+    def connect():
+        raise sqlite3.OperationalError("нет соединения")
+
+    pool = ConnectionPool(connect, size=1, prewarm=False)
+    for _ in range(3):
+        with pytest.raises(sqlite3.OperationalError):
+            pool.acquire()
+    assert pool._created == 0
+
+
+class ReconnectingConnection:
+    """Соединение, которое ping(reconnect=True) молча переподключает"""
+
+    def __init__(self):
+        self.connection_id = 1
+        self.in_transaction = False
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self.connection_id += 1
+
+    def close(self):
+        pass
+
+
+def test_silent_reconnect_resets_connection_state():
+    reset = []
+    conn = ReconnectingConnection()
+    pool = ConnectionPool(lambda: conn, size=1, prewarm=False, health_check_interval=0,
+                          on_reset=reset.append)
+    pool.release(pool.acquire())
+    assert reset == []
+
+    assert pool.acquire() is conn
+    assert reset == [conn]
+
+
+def test_registry_forgets_cursors_of_closed_connections():
+    backend = SQLiteBackend()
+
+    def connect():
+        conn = backend.connect()
+        conn.execute("CREATE TABLE students (id INTEGER PRIMARY KEY, name TEXT, course_number INT, "
+                     "created_at TIMESTAMP)")
+        return conn
+
+    statements = StatementRegistry(backend)
+    pool = ConnectionPool(connect, size=2, on_reset=statements.forget_connection)
+    for _ in range(2):
+        with pool.connection() as first, pool.connection() as second:
+            for conn in (first, second):
+                with statements.execute(conn, 'student_by_id', (1,)) as cursor:
+                    cursor.fetchall()
+    assert len(statements._cursors) == 2
+
+    pool.close()
+    assert statements._cursors == {}
@@ -0,0 +1,30 @@
+import io
+
+import render
+from render import TABLE_MAX_WIDTH, OutputRenderer
+
+
+def table(rows, columns):
+    out = io.StringIO()
+    OutputRenderer(fmt='table', pager=False, out=out).render(rows, str, columns=columns)
+    return out.getvalue().splitlines()
+
+
+def test_table_columns_stay_aligned_after_first_chunk(monkeypatch):
+    monkeypatch.setattr(render, 'RENDER_CHUNK_ROWS', 2)
+    rows = [{'name': "Анна", 'course': 1}, {'name': "Борис", 'course': 2},
+            {'name': "Виктория-Александра", 'course': 3}]
+
+    header, rule, *lines = table(rows, ['name', 'course'])
+
+    assert lines[2] == "Викт…  3"
+    assert {line.index(str(course)) for line, course in zip(lines, (1, 2, 3))} == {header.index('course')}
+    assert rule == "-----  ------"
+
+
+def test_table_width_is_capped():
+    long_name = "Ф" * (TABLE_MAX_WIDTH + 10)
+    header, rule, line = table([{'name': long_name, 'id': 1}], ['name', 'id'])
+
+    assert line == "Ф" * (TABLE_MAX_WIDTH - 1) + "…  1"
+    assert len(rule.split()[0]) == TABLE_MAX_WIDTH
@@ -0,0 +1,46 @@
+import io
+
+import pytest
+
+from conftest import quiet
+from main import execute_command
+from render import OutputRenderer
+
+# Запросы отслеживаются через sqlite3 set_trace_callback на единственном соединении пула
+pytestmark = pytest.mark.db(backends=('sqlite',), pool_size=1)
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+@pytest.fixture(autouse=True)
+def students(db):
+    quiet(db.add_students, [(f"Студент {i:02d}", 1) for i in range(20)])
+
+
+def traced_queries(db):
+    queries = []
+    with db.pool.connection() as conn:
+        conn.set_trace_callback(queries.append)
+    return queries
+
+
+def test_truncated_output_limits_query(db):
+    queries = traced_queries(db)
+    terminal = Terminal()
+    execute_command(db, "GET students 1", OutputRenderer(max_rows=5, pager=False, out=terminal))
+
+    lines = terminal.getvalue().splitlines()
+    assert len(lines) == 6 and "первые 5 строк" in lines[-1]
+    assert any(query.rstrip().endswith("LIMIT 6") for query in queries)
+
+
+def test_redirected_output_is_not_limited(db):
+    queries = traced_queries(db)
+    out = io.StringIO()
+    execute_command(db, "GET students 1", OutputRenderer(max_rows=5, pager=False, out=out))
+
+    assert len(out.getvalue().splitlines()) == 20
+    assert not any("LIMIT" in query for query in queries)
@@ -0,0 +1,45 @@
+import pickle
+
+import pytest
+
+from conftest import quiet
+from rows import DisciplineRow, StudentRow, build_rows
+
+STUDENT = (7, "Анна", 2, None)
+
+
+def test_slotted_rows():
+    [row] = build_rows('students', [STUDENT])
+    assert isinstance(row, StudentRow) and not hasattr(row, '__dict__')
+    assert (row.id, row.name, row.course_number) == (7, "Анна", 2)
+    assert row['name'] == "Анна" and row.get('missing', 0) == 0
+    assert dict(row) == {'id': 7, 'name': "Анна", 'course_number': 2, 'created_at': None}
+    assert pickle.loads(pickle.dumps(row)) == row
+    with pytest.raises(KeyError):
+        row['missing']
+
+
+def test_dict_rows_match_slotted_rows():
+    [as_dict] = build_rows('students', [STUDENT], as_dict=True)
+    [slotted] = build_rows('students', [STUDENT])
+    assert type(as_dict) is dict
+    assert as_dict == slotted.as_dict() and slotted == as_dict
+
+
+def test_discipline_columns():
+    [row] = build_rows('disciplines', [(1, "Физика", "Среда", 3, 4, None)])
+    assert isinstance(row, DisciplineRow)
+    assert (row.day_of_week, row.lesson_number, row.course_number) == ("Среда", 3, 4)
+
+
+@pytest.mark.db(dict_rows=True)
+def test_db_returns_dicts_with_dict_rows(db):
+    quiet(db.add_student, "Анна", 2)
+    [student] = db.get_students_by_course(2)
+    assert type(student) is dict and student['name'] == "Анна"
+
+
+def test_db_returns_slotted_rows_by_default(db):
+    quiet(db.add_student, "Анна", 2)
+    [student] = db.get_students_by_course(2)
+    assert type(student) is StudentRow and student.name == "Анна"
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+
+from conftest import quiet
+from main import run_script
+from render import OutputRenderer
+
+
+def run(db, lines, commit_interval=500):
+    return quiet(run_script, db, lines, commit_interval, OutputRenderer(pager=False, out=io.StringIO()))
+
+
+def names(db, course):
+    return [s.name for s in db.get_students_by_course(course)]
+
+
+def test_writes_are_committed_every_commit_interval(db):
+    stats = run(db, [f"PUT student Студент{i:02d} 1" for i in range(7)], commit_interval=3)
+
+    assert (stats['writes'], stats['failures']) == (7, 0)
+    # 3 + 3 по интервалу и хвост из одной записи в конце скрипта
+    assert stats['commits'] == 3
+    assert not db.in_transaction()
+    assert len(names(db, 1)) == 7
+
+
+def test_read_commits_pending_writes_first(db):
+    stats = run(db, [
+        "# комментарий и пустая строка пропускаются",
+        "",
+        "PUT student Анна 2",
+        "PUT student Борис 2",
+        "GET students 2",
+        "PUT student Вера 2",
+    ])
+
+    assert (stats['commands'], stats['reads'], stats['writes']) == (4, 1, 3)
+    assert stats['commits'] == 2
+    assert names(db, 2) == ["Анна", "Борис", "Вера"]
+
+
+def test_failed_commands_are_counted_and_script_goes_on(db):
+    stats = run(db, ["PUT student Анна 2", "GET nothing", "PUT student Петр x", "PUT student Борис 2", "exit",
+                     "PUT student Вера 2"])
+
+    assert (stats['commands'], stats['failures']) == (4, 2)
+    assert names(db, 2) == ["Анна", "Борис"]
+
+
+def test_interrupted_script_rolls_back_uncommitted_tail(db):
+    def lines():
+        for i in range(5):
+            yield f"PUT student Студент{i} 3"
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        run(db, lines(), commit_interval=2)
+
+    # Зафиксированные пачки по 2 записи остаются, пятая запись откатывается
+    assert not db.in_transaction()
+    assert names(db, 3) == ["Студент0", "Студент1", "Студент2", "Студент3"]
@@ -0,0 +1,64 @@
+import http.client
+import io
+import json
+import threading
+from contextlib import redirect_stdout
+
+import pytest
+
+from conftest import drop_tables
+from server import PooledHTTPServer, UniversityRequestHandler
+
+
+@pytest.fixture
+def server(db):
+    server = PooledHTTPServer(('127.0.0.1', 0), UniversityRequestHandler, db, workers=2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def request(server, method, path, body=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    try:
+        conn.request(method, path, body=None if body is None else json.dumps(body))
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_student_round_trip(server):
+    with redirect_stdout(io.StringIO()):
+        status, body = request(server, 'POST', '/students', {'name': "Анна", 'course_number': 2})
+        assert status == 201
+        status, student = request(server, 'GET', f"/students/{body['id']}")
+        assert status == 200 and (student['name'], student['course_number']) == ("Анна", 2)
+        assert request(server, 'POST', '/students', {'name': "Анна", 'course_number': 42})[0] == 400
+
+
+@pytest.mark.parametrize('path', ['/students/99999999999999999999999', '/courses/99999999999999999999/students'])
+def test_out_of_range_id_is_rejected(server, path):
+    status, body = request(server, 'GET', path)
+    assert status == 400 and 'error' in body
+
+
+def test_unexpected_error_returns_json_500(server, monkeypatch, capsys):
+    def fail(student_id):
+        raise RuntimeError("сбой")
+
+    monkeypatch.setattr(server.db, 'get_student', fail)
+    assert request(server, 'GET', '/students/1') == (500, {'error': "внутренняя ошибка сервера"})
+    assert "RuntimeError: сбой" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('path', ['/students/1', '/students?q=Ann', '/courses/1/students',
+                                  '/courses/1/students?limit=5', '/courses/1/disciplines', '/disciplines?limit=5'])
+def test_database_error_returns_json_500(server, path):
+    # Без таблиц каждый запрос к БД завершается ошибкой, а не пустым списком или 404
+    drop_tables(server.db)
+    with redirect_stdout(io.StringIO()):
+        assert request(server, 'GET', path) == (500, {'error': "ошибка базы данных"})
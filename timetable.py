@@ -0,0 +1,164 @@
+import threading
+from array import array
+from collections import Counter
+
+DAYS_OF_WEEK = ('Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота')
+COURSES = 8
+LESSONS = 8
+
+# Значения ячейки: 0 - слот свободен, RESERVED - идет вставка, иначе id занятия
+FREE = 0
+RESERVED = -1
+
+
+def slot_index(course_number, day_of_week, lesson_number):
+    """Номер ячейки слота (курс, день, пара) в плоском массиве расписания"""
+    course = int(course_number)
+    lesson = int(lesson_number)
+    if not 1 <= course <= COURSES:
+        raise ValueError(f"номер курса должен быть от 1 до {COURSES}")
+    if not 1 <= lesson <= LESSONS:
+        raise ValueError(f"номер пары должен быть от 1 до {LESSONS}")
+    if day_of_week not in DAYS_OF_WEEK:
+        raise ValueError(f"день недели должен быть одним из: {', '.join(DAYS_OF_WEEK)}")
+    day = DAYS_OF_WEEK.index(day_of_week)
+    return ((course - 1) * len(DAYS_OF_WEEK) + day) * LESSONS + (lesson - 1)
+
+
+class Timetable:
+    """Расписание в памяти: массив курс × день × пара с id занятий
+
+    Проверка слота, список свободных слотов и расписание курса не требуют
+    обращений к БД. Занятия, которые уже лежали в БД в одном слоте
+    (до появления проверки), или с некорректным слотом хранятся отдельно
+    и тоже попадают в расписание курса. Число занятий курса по дням
+    ведется счетчиками при каждом изменении.
+    """
+
+    def __init__(self):
+        self._slots = array('i', [FREE]) * (COURSES * len(DAYS_OF_WEEK) * LESSONS)
+        self._rows = {}
+        self._overflow = {}
+        self._unplaced = {}
+        self._lessons = Counter()
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def load(self, rows):
+        """Заполнение из строк таблицы disciplines; возвращает число конфликтов"""
+        with self._lock:
+            self._slots = array('i', [FREE]) * len(self._slots)
+            self._rows.clear()
+            self._overflow.clear()
+            self._unplaced.clear()
+            self._lessons.clear()
+            conflicts = 0
+            for row in rows:
+                conflicts += not self._place(row)
+            self.loaded = True
+            return conflicts
+
+    def _place(self, row):
+        """Размещение строки; False, если слот уже занят"""
+        self._rows[row['id']] = row
+        self._lessons[row['course_number'], row['day_of_week']] += 1
+        try:
+            index = slot_index(row['course_number'], row['day_of_week'], row['lesson_number'])
+        except ValueError:
+            self._unplaced[row['id']] = row
+            return True
+        if self._slots[index] == FREE:
+            self._slots[index] = row['id']
+            return True
+        self._overflow.setdefault(index, []).append(row['id'])
+        return False
+
+    def reserve(self, course_number, day_of_week, lesson_number):
+        """Резервирование свободного слота перед вставкой
+
+        Возвращает номер ячейки или None, если слот занят. Резерв нужно
+        завершить через fill() или снять через release().
+        """
+        index = slot_index(course_number, day_of_week, lesson_number)
+        with self._lock:
+            if self._slots[index] != FREE:
+                return None
+            self._slots[index] = RESERVED
+            return index
+
+    def fill(self, index, row):
+        """Запись вставленного занятия в зарезервированный слот"""
+        with self._lock:
+            self._rows[row['id']] = row
+            self._lessons[row['course_number'], row['day_of_week']] += 1
+            self._slots[index] = row['id']
+
+    def release(self, index):
+        """Снятие резерва после неудачной вставки"""
+        with self._lock:
+            if self._slots[index] == RESERVED:
+                self._slots[index] = FREE
+
+    def occupant(self, course_number, day_of_week, lesson_number):
+        """Занятие в слоте или None"""
+        index = slot_index(course_number, day_of_week, lesson_number)
+        discipline_id = self._slots[index]
+        return self._rows.get(discipline_id) if discipline_id > 0 else None
+
+    def remove(self, discipline_id):
+        """Удаление занятия; возвращает его строку или None"""
+        discipline_id = int(discipline_id)
+        with self._lock:
+            row = self._rows.pop(discipline_id, None)
+            if row is None:
+                return None
+            lessons_key = (row['course_number'], row['day_of_week'])
+            self._lessons[lessons_key] -= 1
+            if not self._lessons[lessons_key]:
+                del self._lessons[lessons_key]
+            if self._unplaced.pop(discipline_id, None) is not None:
+                return row
+
+            index = slot_index(row['course_number'], row['day_of_week'], row['lesson_number'])
+            extra = self._overflow.get(index, [])
+            if discipline_id in extra:
+                extra.remove(discipline_id)
+            elif self._slots[index] == discipline_id:
+                self._slots[index] = extra.pop(0) if extra else FREE
+            if not extra:
+                self._overflow.pop(index, None)
+            return row
+
+    def free_slots(self, course_number):
+        """Свободные слоты курса: список пар (день, номер пары)"""
+        base = slot_index(course_number, DAYS_OF_WEEK[0], 1)
+        slots = self._slots
+        return [
+            (day, lesson)
+            for d, day in enumerate(DAYS_OF_WEEK)
+            for lesson in range(1, LESSONS + 1)
+            if slots[base + d * LESSONS + lesson - 1] == FREE
+        ]
+
+    def disciplines_by_course(self, course_number):
+        """Занятия курса в хронологическом порядке (день, пара)"""
+        try:
+            base = slot_index(course_number, DAYS_OF_WEEK[0], 1)
+        except ValueError:
+            return []
+        with self._lock:
+            result = []
+            for index in range(base, base + len(DAYS_OF_WEEK) * LESSONS):
+                discipline_id = self._slots[index]
+                if discipline_id > 0:
+                    result.append(self._rows[discipline_id])
+                    result.extend(self._rows[extra_id] for extra_id in self._overflow.get(index, ()))
+            course = int(course_number)
+            result.extend(row for row in self._unplaced.values() if row['course_number'] == course)
+            return result
+
+    def lessons_by_day(self, course_number):
+        """Число занятий курса по дням недели: словарь день -> число"""
+        course = int(course_number)
+        lessons = self._lessons
+        return {day: lessons.get((course, day), 0) for day in DAYS_OF_WEEK}
@@ -1,13 +1,25 @@
 import mysql.connector
 from mysql.connector import Error
+import argparse
 import csv
 import sys
 import os
+import time
+
+# Разбор команд и режим --script общие с main.py
+from main import DEFAULT_COMMIT_INTERVAL, execute_command, run_script
+from render import OutputRenderer
+
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_FETCH_SIZE = 1000
 
 
 class UniversityDB:
     def __init__(self):
         self.connection = None
+        self.last_import_stats = None
+        self._in_transaction = False
         self.connect_to_db()
 
     def connect_to_db(self):
@@ -51,7 +63,7 @@ class UniversityDB:
             # Создание таблицы students
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS students (
-                    id INT PRIMARY KEY,
+                    id INT AUTO_INCREMENT PRIMARY KEY,
                     name VARCHAR(100) NOT NULL,
                     course_number INT NOT NULL CHECK (course_number BETWEEN 1 AND 8),
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -71,6 +83,14 @@ class UniversityDB:
                 )
             """)
 
+            # Таблица students из прежних версий - без AUTO_INCREMENT
+            cursor.execute("""
+                SELECT EXTRA FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'students' AND COLUMN_NAME = 'id'
+            """)
+            if 'auto_increment' not in (cursor.fetchone() or ('',))[0].lower():
+                cursor.execute("ALTER TABLE students MODIFY id INT NOT NULL AUTO_INCREMENT")
+
             self.connection.commit()
             print("✅ Таблицы 'students' и 'disciplines' созданы успешно")
             cursor.close()
@@ -78,8 +98,12 @@ class UniversityDB:
         except Error as e:
             print(f"❌ Ошибка при создании таблиц: {e}")
 
-    def import_students_from_csv(self, csv_file_path='students.csv'):
-        """Импорт данных о студентах из CSV файла с табуляцией как разделителем"""
+    def import_students_from_csv(self, csv_file_path='students.csv', bulk=False, batch_size=DEFAULT_BATCH_SIZE):
+        """Импорт данных о студентах из CSV файла с табуляцией как разделителем
+
+        В пакетном режиме (bulk=True) строки отправляются на сервер пачками
+        по batch_size штук через executemany вместо отдельного запроса на строку.
+        """
         try:
             if not os.path.exists(csv_file_path):
                 print(f"⚠️ Файл {csv_file_path} не найден")
@@ -89,11 +113,13 @@ class UniversityDB:
                 return False
 
             cursor = self.connection.cursor()
+            started = time.perf_counter()
 
             # Очистка таблицы перед импортом
             cursor.execute("DELETE FROM students")
 
             imported_count = 0
+            batch = []
             with open(csv_file_path, 'r', encoding='utf-8') as file:
                 # Используем табуляцию как разделитель
                 csv_reader = csv.reader(file, delimiter='\t')
@@ -110,6 +136,13 @@ class UniversityDB:
                                 print(f"⚠️ Строка {row_num}: некорректный номер курса '{course_number}'")
                                 continue
 
+                            if bulk:
+                                batch.append((row_num, student_id, name, course_number))
+                                if len(batch) >= batch_size:
+                                    imported_count += self._insert_students_batch(cursor, batch)
+                                    batch = []
+                                continue
+
                             cursor.execute(
                                 "INSERT INTO students (id, name, course_number) VALUES (%s, %s, %s)",
                                 (student_id, name, course_number)
@@ -128,8 +161,21 @@ class UniversityDB:
                     else:
                         print(f"⚠️ Строка {row_num}: неполные данные - {row}")
 
+            if batch:
+                imported_count += self._insert_students_batch(cursor, batch)
+
             self.connection.commit()
+            elapsed = time.perf_counter() - started
+            rate = imported_count / elapsed if elapsed > 0 else 0.0
+            self.last_import_stats = {
+                'rows': imported_count,
+                'seconds': elapsed,
+                'rows_per_second': rate,
+                'batch_size': batch_size if bulk else 1,
+            }
             print(f"✅ Импортировано {imported_count} студентов из файла {csv_file_path}")
+            if bulk:
+                print(f"⏱️ Время импорта: {elapsed:.2f} с, скорость: {rate:.0f} строк/с (размер пачки {batch_size})")
             cursor.close()
             return True
 
@@ -137,6 +183,35 @@ class UniversityDB:
             print(f"❌ Ошибка при импорте данных: {e}")
             return False
 
+    def _insert_students_batch(self, cursor, batch):
+        """Вставка пачки студентов одним многострочным INSERT
+
+        batch - список кортежей (номер строки, id, имя, курс). Если сервер
+        отклоняет пачку целиком, она повторяется построчно, чтобы сообщить
+        о конкретной ошибочной строке и сохранить остальные.
+        """
+        try:
+            cursor.executemany(
+                "INSERT INTO students (id, name, course_number) VALUES (%s, %s, %s)",
+                [(student_id, name, course_number) for _, student_id, name, course_number in batch]
+            )
+            return len(batch)
+        except Error:
+            inserted = 0
+            for row_num, student_id, name, course_number in batch:
+                try:
+                    cursor.execute(
+                        "INSERT INTO students (id, name, course_number) VALUES (%s, %s, %s)",
+                        (student_id, name, course_number)
+                    )
+                    inserted += 1
+                except Error as e:
+                    if "Duplicate entry" in str(e):
+                        print(f"⚠️ Строка {row_num}: студент с ID {student_id} уже существует")
+                    else:
+                        print(f"⚠️ Строка {row_num}: ошибка БД - {e}")
+            return inserted
+
     def get_student(self, student_id):
         """Получение студента по ID"""
         try:
@@ -207,21 +282,71 @@ class UniversityDB:
             print(f"❌ Ошибка при получении расписания: {e}")
             return []
 
+    def iter_students_by_course(self, course_number, chunk_size=DEFAULT_FETCH_SIZE, limit=None):
+        """Потоковое получение студентов по номеру курса в алфавитном порядке
+
+        Строки читаются небуферизованным курсором порциями по chunk_size,
+        поэтому расход памяти не зависит от размера курса.
+        limit - не больше limit первых строк.
+        """
+        return self._iter_query(
+            "SELECT * FROM students WHERE course_number = %s ORDER BY name",
+            (course_number,),
+            chunk_size,
+            "❌ Ошибка при получении студентов",
+            limit
+        )
+
+    def iter_all_disciplines(self, chunk_size=DEFAULT_FETCH_SIZE, limit=None):
+        """Потоковое получение полного расписания порциями по chunk_size строк"""
+        return self._iter_query(
+            """SELECT * FROM disciplines 
+               ORDER BY course_number, 
+                 FIELD(day_of_week, 'Понедельник', 'Вторник', 'Среда', 
+                       'Четверг', 'Пятница', 'Суббота'), 
+                 lesson_number""",
+            (),
+            chunk_size,
+            "❌ Ошибка при получении расписания",
+            limit
+        )
+
+    def _iter_query(self, query, params, chunk_size, error_message, limit=None):
+        """Генератор строк запроса через небуферизованный курсор
+
+        Пока генератор не исчерпан или не закрыт, соединение занято;
+        непрочитанный остаток результата дочитывается при закрытии.
+        """
+        if limit is not None:
+            query += " LIMIT %s"
+            params = tuple(params) + (int(limit),)
+        try:
+            cursor = self.connection.cursor(dictionary=True, buffered=False)
+            try:
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                self.connection.consume_results()
+                cursor.close()
+        except Error as e:
+            print(f"{error_message}: {e}")
+
     def add_student(self, name, course_number):
         """Добавление нового студента"""
         try:
             cursor = self.connection.cursor()
 
-            # Получаем максимальный ID для нового студента
-            cursor.execute("SELECT MAX(id) as max_id FROM students")
-            result = cursor.fetchone()
-            new_id = (result[0] or 0) + 1
-
+            # ID выдает сервер: без SELECT MAX(id) и гонок между клиентами
             cursor.execute(
-                "INSERT INTO students (id, name, course_number) VALUES (%s, %s, %s)",
-                (new_id, name, int(course_number))
+                "INSERT INTO students (name, course_number) VALUES (%s, %s)",
+                (name, int(course_number))
             )
-            self.connection.commit()
+            new_id = cursor.lastrowid
+            self._commit()
             print(f"✅ Студент '{name}' успешно добавлен на курс {course_number} (ID: {new_id})")
             cursor.close()
             return True
@@ -245,7 +370,7 @@ class UniversityDB:
                    VALUES (%s, %s, %s, %s)""",
                 (discipline_name, day_of_week, int(lesson_number), int(course_number))
             )
-            self.connection.commit()
+            self._commit()
             discipline_id = cursor.lastrowid
             print(f"✅ Дисциплина '{discipline_name}' успешно добавлена (ID: {discipline_id})")
             cursor.close()
@@ -262,7 +387,7 @@ class UniversityDB:
                 "DELETE FROM students WHERE id = %s",
                 (student_id,)
             )
-            self.connection.commit()
+            self._commit()
             if cursor.rowcount > 0:
                 print(f"✅ Студент с ID {student_id} успешно удален")
             else:
@@ -281,7 +406,7 @@ class UniversityDB:
                 "DELETE FROM disciplines WHERE id = %s",
                 (discipline_id,)
             )
-            self.connection.commit()
+            self._commit()
             if cursor.rowcount > 0:
                 print(f"✅ Занятие с ID {discipline_id} успешно удалено")
             else:
@@ -292,72 +417,40 @@ class UniversityDB:
             print(f"❌ Ошибка при удалении занятия: {e}")
             return False
 
-    def close_connection(self):
-        """Закрытие соединения с базой данных"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("🔌 Соединение с базой данных закрыто")
+    def _commit(self):
+        """Фиксация изменений, если операция не входит в общую транзакцию"""
+        if not self._in_transaction:
+            self.connection.commit()
 
+    def in_transaction(self):
+        """Открыта ли общая транзакция"""
+        return self._in_transaction
 
-def print_student(student):
-    """Вывод информации о студенте"""
-    if student:
-        print("=" * 50)
-        print(f"🎓 СТУДЕНТ")
-        print("=" * 50)
-        print(f"ID: {student['id']}")
-        print(f"Имя: {student['name']}")
-        print(f"Курс: {student['course_number']}")
-        print(f"Дата создания: {student['created_at']}")
-        print("=" * 50)
-    else:
-        print("❌ Студент не найден")
-
-
-def print_disciplines(disciplines):
-    """Вывод информации о дисциплинах"""
-    if disciplines:
-        print(f"\n📚 Найдено дисциплин: {len(disciplines)}")
-        print("=" * 60)
-        for disc in disciplines:
-            print(f"ID: {disc['id']}")
-            print(f"Дисциплина: {disc['discipline_name']}")
-            print(f"День: {disc['day_of_week']}")
-            print(f"Пара: {disc['lesson_number']}")
-            print(f"Курс: {disc['course_number']}")
-            print(f"Дата создания: {disc['created_at']}")
-            print("-" * 40)
-    else:
-        print("❌ Дисциплины не найдены")
-
-
-def print_students(students):
-    """Вывод информации о студентах"""
-    if students:
-        print(f"\n🎓 Найдено студентов: {len(students)}")
-        print("=" * 50)
-        for student in students:
-            print(f"ID: {student['id']}")
-            print(f"Имя: {student['name']}")
-            print(f"Курс: {student['course_number']}")
-            print(f"Дата создания: {student['created_at']}")
-            print("-" * 30)
-    else:
-        print("❌ Студенты не найдены")
+    def begin_transaction(self):
+        """Начало общей транзакции: операции перестают фиксироваться по отдельности"""
+        self._in_transaction = True
 
+    def commit_transaction(self):
+        """Фиксация общей транзакции"""
+        if self._in_transaction:
+            self._in_transaction = False
+            self.connection.commit()
 
-def main():
-    """Основная функция с консольным интерфейсом"""
-    db = UniversityDB()
+    def rollback_transaction(self):
+        """Откат общей транзакции"""
+        if self._in_transaction:
+            self._in_transaction = False
+            self.connection.rollback()
 
-    # Создание базы данных и таблиц при первом запуске
-    db.create_database()
-    db.connect_to_db()
-    db.create_tables()
+    def close_connection(self):
+        """Закрытие соединения с базой данных"""
+        if self.connection and self.connection.is_connected():
+            self.connection.close()
+            print("🔌 Соединение с базой данных закрыто")
 
-    # Импорт данных из CSV
-    db.import_students_from_csv('students.csv')
 
+def print_help():
+    """Вывод списка доступных команд"""
     print("\n" + "=" * 70)
     print("🎓 УНИВЕРСИТЕТСКАЯ БАЗА ДАННЫХ - КОНСОЛЬНЫЙ ИНТЕРФЕЙС")
     print("=" * 70)
@@ -373,72 +466,50 @@ def main():
     print("exit                      - выход из программы")
     print("=" * 70)
 
-    while True:
-        try:
-            command = input("\n🎯 Введите команду: ").strip()
-
-            if command.lower() == 'exit':
-                break
-
-            parts = command.split()
-            if len(parts) < 2:
-                print("❌ Неверный формат команды")
-                continue
-
-            action = parts[0].upper()
-
-            if action == 'GET':
-                if parts[1].lower() == 'student' and len(parts) == 3:
-                    student = db.get_student(parts[2])
-                    print_student(student)
 
-                elif parts[1].lower() == 'discipline' and len(parts) == 3:
-                    disciplines = db.get_disciplines_by_course(parts[2])
-                    print_disciplines(disciplines)
-
-                elif parts[1].lower() == 'students' and len(parts) == 3:
-                    students = db.get_students_by_course(parts[2])
-                    print_students(students)
-
-                elif parts[1].lower() == 'disciplines' and len(parts) == 2:
-                    disciplines = db.get_all_disciplines()
-                    print_disciplines(disciplines)
+def main():
+    """Основная функция с консольным интерфейсом"""
+    parser = argparse.ArgumentParser(description="Университетская база данных")
+    parser.add_argument('--script', metavar='FILE',
+                        help="выполнить команды из файла ('-' - из stdin) и выйти")
+    parser.add_argument('--commit-interval', type=int, default=DEFAULT_COMMIT_INTERVAL,
+                        help="сколько записей фиксировать одной транзакцией в режиме --script")
+    args = parser.parse_args()
 
-                else:
-                    print("❌ Неверный формат GET команды")
+    db = UniversityDB()
 
-            elif action == 'PUT':
-                if parts[1].lower() == 'student' and len(parts) >= 4:
-                    # Объединяем имя, если оно состоит из нескольких слов
-                    name = ' '.join(parts[2:-1])
-                    course = parts[-1]
-                    db.add_student(name, course)
+    # Создание базы данных и таблиц при первом запуске
+    db.create_database()
+    db.connect_to_db()
+    db.create_tables()
 
-                elif parts[1].lower() == 'discipline' and len(parts) >= 6:
-                    # Объединяем название дисциплины, если оно состоит из нескольких слов
-                    discipline_name = ' '.join(parts[2:-3])
-                    day = parts[-3]
-                    lesson = parts[-2]
-                    course = parts[-1]
-                    db.add_discipline(discipline_name, day, lesson, course)
+    # Импорт данных из CSV
+    db.import_students_from_csv('students.csv', bulk=True)
 
-                else:
-                    print("❌ Неверный формат PUT команды")
-                    print("Пример: PUT student 'Иван Иванов' 1")
-                    print("Пример: PUT discipline 'Высшая математика' Понедельник 1 2")
+    if args.script:
+        # Скрипт выполняется без пейджера и ограничения числа строк
+        script_output = OutputRenderer(pager=False)
+        try:
+            if args.script == '-':
+                run_script(db, sys.stdin, args.commit_interval, script_output)
+            else:
+                with open(args.script, 'r', encoding='utf-8') as script:
+                    run_script(db, script, args.commit_interval, script_output)
+        finally:
+            db.close_connection()
+        return
 
-            elif action == 'DELETE':
-                if parts[1].lower() == 'student' and len(parts) == 3:
-                    db.delete_student(parts[2])
+    output = OutputRenderer()
+    print_help()
 
-                elif parts[1].lower() == 'discipline' and len(parts) == 3:
-                    db.delete_discipline(parts[2])
+    while True:
+        try:
+            command = input("\n🎯 Введите команду: ").strip()
 
-                else:
-                    print("❌ Неверный формат DELETE команды")
+            if command.lower() == 'exit':
+                break
 
-            else:
-                print("❌ Неизвестная команда")
+            execute_command(db, command, output)
 
         except KeyboardInterrupt:
             print("\n👋 Выход из программы...")
@@ -450,4 +521,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()